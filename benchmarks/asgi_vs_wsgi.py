@@ -0,0 +1,124 @@
+"""
+Сравнение пропускной способности API чтения под WSGI и ASGI: gunicorn
+с синхронными воркерами и представлениями DRF против gunicorn с воркерами
+uvicorn и асинхронными представлениями (/api/v1/async/...). Для полноты
+замеряются и представления DRF под ASGI: синхронный код выполняется там
+в одном потоке на процесс.
+
+Серверы запускаются на временной базе данных с заказами и меню, нагрузка
+подаётся заданным числом одновременных клиентов. Запуск из корня
+репозитория:
+
+    python benchmarks/asgi_vs_wsgi.py --concurrency 1 10 50 --workers 2
+"""
+
+import argparse
+import asyncio
+import time
+
+from django.db import connection
+
+from common import (
+    SERVERS,
+    fetch,
+    get_server_env,
+    percentile,
+    seed,
+    start_server,
+    stop_server,
+    temporary_database,
+)
+
+# Адреса без префикса; для асинхронных представлений добавляется async/
+PATHS = (
+    "orders/",
+    "orders/?items=false&status=PENDING",
+    "orders/{pk}/",
+    "orders/revenue/",
+    "dishes/",
+)
+# Варианты замера: сервер и префикс адресов API
+SCENARIOS = (
+    ("WSGI, DRF", "wsgi", "/api/v1/"),
+    ("ASGI, DRF", "asgi", "/api/v1/"),
+    ("ASGI, async", "asgi", "/api/v1/async/"),
+)
+
+
+async def run_load(
+    port: int, paths: list[str], concurrency: int, duration: float
+) -> tuple[int, int, list[float]]:
+    """
+    Запросы concurrency клиентов в течение duration секунд: количество
+    ответов, количество ошибок и длительности запросов, секунд
+    """
+    latencies, errors = [], 0
+    deadline = time.perf_counter() + duration
+
+    async def client(offset: int):
+        nonlocal errors
+        index = offset
+        while time.perf_counter() < deadline:
+            path = paths[index % len(paths)]
+            index += 1
+            start = time.perf_counter()
+            try:
+                status, _ = await fetch(port, path)
+            except OSError:
+                status = 0
+            latencies.append(time.perf_counter() - start)
+            if status != 200:
+                errors += 1
+
+    await asyncio.gather(*(client(i) for i in range(concurrency)))
+    return len(latencies), errors, latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--concurrency", type=int, nargs="+", default=[1, 10, 50]
+    )
+    parser.add_argument("--duration", type=float, default=5)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--orders", type=int, default=1000)
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    with temporary_database() as database:
+        pk = seed(args.orders)[args.orders // 2]
+        connection.close()
+        env = get_server_env(database)
+        print(
+            f"{'вариант':<12} {'клиентов':>8} {'запр./с':>9} "
+            f"{'p50, мс':>9} {'p95, мс':>9} {'ошибок':>7}"
+        )
+        for kind in SERVERS:
+            process = start_server(kind, args.port, args.workers, env)
+            try:
+                for title, server, prefix in SCENARIOS:
+                    if server != kind:
+                        continue
+                    paths = [prefix + path.format(pk=pk) for path in PATHS]
+                    for concurrency in args.concurrency:
+                        count, errors, latencies = asyncio.run(
+                            run_load(
+                                args.port,
+                                paths,
+                                concurrency,
+                                args.duration,
+                            )
+                        )
+                        print(
+                            f"{title:<12} {concurrency:>8} "
+                            f"{count / args.duration:>9.1f} "
+                            f"{percentile(latencies, 50):>9.1f} "
+                            f"{percentile(latencies, 95):>9.1f} "
+                            f"{errors:>7}"
+                        )
+            finally:
+                stop_server(process)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""
+Общие части нагрузочных бенчмарков: временная база данных с заказами,
+запуск gunicorn и HTTP-запросы на asyncio без сторонних клиентов.
+"""
+
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+CAFE_DIR = Path(__file__).resolve().parent.parent / "cafe"
+sys.path.insert(0, str(CAFE_DIR))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "cafe.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.db import connection  # noqa: E402
+
+from menu.models import Dish  # noqa: E402
+from orders.models import Order  # noqa: E402
+from orders.services import create_order  # noqa: E402
+
+HOST = "127.0.0.1"
+SERVERS = {
+    "wsgi": ["cafe.wsgi"],
+    "asgi": ["--worker-class", "uvicorn_worker.UvicornWorker", "cafe.asgi"],
+}
+
+
+def seed(orders: int) -> list[int]:
+    """
+    Меню и заказы с позициями, часть заказов оплачена. Возвращает
+    идентификаторы заказов.
+    """
+    dishes = Dish.objects.bulk_create(
+        [Dish(name=f"dish_{i}", price=i * 10) for i in range(1, 31)]
+    )
+    pks = []
+    for i in range(orders):
+        items = [
+            {"dish": dishes[(i + k) % len(dishes)], "quantity": k + 1}
+            for k in range(i % 5 + 1)
+        ]
+        pks.append(create_order(Order(table_number=str(i % 20)), items).pk)
+    for pk in pks[::3]:
+        Order.transition(pk, Order.Status.PAID)
+    return pks
+
+
+@contextmanager
+def temporary_database():
+    """
+    Тестовая база данных на время замеров; возвращает имя базы для
+    серверов. В SQLite база создаётся в файле, а не в памяти процесса.
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        if connection.vendor == "sqlite":
+            test_settings = connection.settings_dict["TEST"]
+            test_settings["NAME"] = str(Path(tmp) / "benchmark.sqlite3")
+        old_name = connection.creation.create_test_db(verbosity=0)
+        try:
+            yield str(connection.settings_dict["NAME"])
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+async def fetch(
+    port: int, path: str, method: str = "GET", data=None
+) -> tuple[int, bytes]:
+    """
+    Запрос с новым соединением, data передаётся в теле как JSON.
+    Возвращает код и тело ответа.
+    """
+    body = b"" if data is None else json.dumps(data).encode()
+    reader, writer = await asyncio.open_connection(HOST, port)
+    writer.write(
+        f"{method} {path} HTTP/1.1\r\nHost: {HOST}\r\n"
+        "Content-Type: application/json\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        "Connection: close\r\n\r\n".encode() + body
+    )
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    await writer.wait_closed()
+    head, _, content = response.partition(b"\r\n\r\n")
+    return int(head.split(b" ", 2)[1]), content
+
+
+def wait_for_server(port: int, process: subprocess.Popen, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError("Сервер завершился при запуске")
+        try:
+            asyncio.run(fetch(port, "/api/v1/dishes/"))
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError("Сервер не запустился")
+
+
+def start_server(kind: str, port: int, workers: int, env: dict):
+    command = [
+        sys.executable,
+        "-m",
+        "gunicorn",
+        "--bind",
+        f"{HOST}:{port}",
+        "--workers",
+        str(workers),
+        "--log-level",
+        "warning",
+        *SERVERS[kind],
+    ]
+    process = subprocess.Popen(command, cwd=CAFE_DIR, env=env)
+    try:
+        wait_for_server(port, process)
+    except RuntimeError:
+        process.kill()
+        raise
+    return process
+
+
+def stop_server(process: subprocess.Popen):
+    process.terminate()
+    process.wait()
+
+
+def get_server_env(database: str) -> dict:
+    """
+    Окружение серверов: временная база данных, DEBUG выключен, журнал
+    запросов не выводит медленные запросы под нагрузкой
+    """
+    env = {**os.environ, "DEBUG": "False", "REQUEST_LOG_LEVEL": "ERROR"}
+    if connection.vendor == "sqlite":
+        env["SQLITE_NAME"] = database
+    else:
+        env["POSTGRES_NAME"] = database
+    return env
+
+
+def percentile(values: list[float], q: int) -> float:
+    """
+    Процентиль длительностей в секундах, миллисекунд. Значения
+    интерполируются только между замерами и не превышают максимум.
+    """
+    if len(values) < 2:
+        return values[0] * 1000 if values else 0.0
+    quantiles = statistics.quantiles(values, n=100, method="inclusive")
+    return quantiles[q - 1] * 1000
@@ -0,0 +1,288 @@
+"""
+Нагрузочный бенчмарк заказов: смешанный поток чтения и записи через HTTP
+(создание заказа, добавление позиций, смена статуса, списки заказов HTML
+и API, выручка) от заданного числа одновременных клиентов.
+
+Сервер gunicorn запускается на временной базе данных с заказами и меню.
+Результат — JSON с пропускной способностью и процентилями p50/p95/p99
+времени ответа в целом и по операциям, а также с версией кода, чтобы
+сравнивать прогоны между коммитами. Запуск из корня репозитория:
+
+    python benchmarks/http_load.py --scenario mixed read --concurrency 10 50
+"""
+
+import argparse
+import asyncio
+import json
+import platform
+import random
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from itertools import chain
+from pathlib import Path
+
+import django
+from django.db import connection
+
+from common import (
+    SERVERS,
+    fetch,
+    get_server_env,
+    percentile,
+    seed,
+    start_server,
+    stop_server,
+    temporary_database,
+)
+from menu.models import Dish
+
+ORDERS_URL = "/api/v1/orders/"
+# Вес операций в потоке запросов сценария
+SCENARIOS = {
+    "mixed": {
+        "create": 2,
+        "add_items": 2,
+        "change_status": 1,
+        "list_html": 2,
+        "list_api": 3,
+        "revenue": 2,
+    },
+    "read": {"list_html": 1, "list_api": 1, "revenue": 1},
+    "write": {"create": 1, "add_items": 1, "change_status": 1},
+}
+# Операции над открытыми заказами клиента; без них клиент создаёт заказ
+ORDER_OPERATIONS = ("add_items", "change_status")
+NEXT_STATUS = {"PENDING": "READY", "READY": "PAID"}
+
+
+@dataclass
+class Client:
+    """
+    Виртуальный клиент: создаёт заказы, дополняет их позициями и
+    переводит до оплаты. Операции возвращают, успешен ли ответ.
+    """
+
+    port: int
+    dishes: list[int]
+    random: random.Random
+    # Позиции и статус открытых заказов клиента по id
+    orders: dict[int, tuple[list[dict], str]] = field(default_factory=dict)
+
+    async def create(self) -> bool:
+        items = [
+            {"dish": dish, "quantity": self.random.randint(1, 3)}
+            for dish in self.random.sample(self.dishes, 2)
+        ]
+        table = str(self.random.randint(1, 20))
+        data = {"table_number": table, "items": items}
+        status, content = await fetch(self.port, ORDERS_URL, "POST", data)
+        if status != 201:
+            return False
+        self.orders[json.loads(content)["id"]] = (items, "PENDING")
+        return True
+
+    async def add_items(self) -> bool:
+        pk = self.random.choice(list(self.orders))
+        items, order_status = self.orders[pk]
+        used = {item["dish"] for item in items}
+        dishes = [dish for dish in self.dishes if dish not in used]
+        if dishes:
+            dish = self.random.choice(dishes)
+            items = [*items, {"dish": dish, "quantity": 1}]
+        status, _ = await fetch(
+            self.port, f"{ORDERS_URL}{pk}/", "PATCH", {"items": items}
+        )
+        self.orders[pk] = (items, order_status)
+        return status == 200
+
+    async def change_status(self) -> bool:
+        pk = self.random.choice(list(self.orders))
+        items, order_status = self.orders[pk]
+        order_status = NEXT_STATUS[order_status]
+        status, _ = await fetch(
+            self.port,
+            f"{ORDERS_URL}{pk}/change_status/",
+            "PATCH",
+            {"status": order_status},
+        )
+        if order_status == "PAID":
+            del self.orders[pk]
+        else:
+            self.orders[pk] = (items, order_status)
+        return status == 201
+
+    async def list_html(self) -> bool:
+        status, _ = await fetch(self.port, "/orders/")
+        return status == 200
+
+    async def list_api(self) -> bool:
+        status, _ = await fetch(self.port, ORDERS_URL)
+        return status == 200
+
+    async def revenue(self) -> bool:
+        status, _ = await fetch(self.port, f"{ORDERS_URL}revenue/")
+        return status == 200
+
+
+async def run_load(
+    port: int,
+    dishes: list[int],
+    weights: dict[str, int],
+    concurrency: int,
+    duration: float,
+    seed: int,
+) -> tuple[float, dict, dict]:
+    """
+    Операции concurrency клиентов в течение duration секунд, выбранные
+    по весам сценария. Возвращает фактическое время нагрузки, длительности
+    запросов и количество ошибок по операциям.
+    """
+    latencies, errors = defaultdict(list), defaultdict(int)
+    names, counts = list(weights), list(weights.values())
+    start = time.perf_counter()
+    deadline = start + duration
+
+    async def run_client(number: int):
+        client = Client(port, dishes, random.Random(f"{seed}-{number}"))
+        while time.perf_counter() < deadline:
+            name = client.random.choices(names, counts)[0]
+            if name in ORDER_OPERATIONS and not client.orders:
+                name = "create"
+            request_start = time.perf_counter()
+            try:
+                success = await getattr(client, name)()
+            except OSError:
+                success = False
+            latencies[name].append(time.perf_counter() - request_start)
+            if not success:
+                errors[name] += 1
+
+    await asyncio.gather(*(run_client(i) for i in range(concurrency)))
+    return time.perf_counter() - start, latencies, errors
+
+
+def summarize(latencies: list[float], errors: int, elapsed: float) -> dict:
+    """Пропускная способность, запросов в секунду, и процентили, мс"""
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "throughput": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 50), 2),
+        "p95_ms": round(percentile(latencies, 95), 2),
+        "p99_ms": round(percentile(latencies, 99), 2),
+        "max_ms": round(max(latencies, default=0) * 1000, 2),
+    }
+
+
+def get_commit() -> str | None:
+    """Версия кода; изменения вне коммита отмечаются суффиксом -dirty"""
+    try:
+        result = subprocess.run(
+            ["git", "describe", "--always", "--dirty"],
+            cwd=Path(__file__).resolve().parent,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return result.stdout.strip()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--scenario",
+        nargs="+",
+        choices=SCENARIOS,
+        default=["mixed"],
+    )
+    parser.add_argument("--server", choices=SERVERS, default="wsgi")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[10])
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument(
+        "--warmup",
+        type=float,
+        default=2,
+        help="секунд нагрузки перед замером, не входят в результат",
+    )
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--orders", type=int, default=1000)
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument(
+        "--output", type=Path, help="файл результата вместо stdout"
+    )
+    args = parser.parse_args()
+
+    report = {
+        "commit": get_commit(),
+        "date": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "django": django.get_version(),
+        "database": connection.vendor,
+        "server": args.server,
+        "workers": args.workers,
+        "orders": args.orders,
+        "duration": args.duration,
+        "warmup": args.warmup,
+        "seed": args.seed,
+        "runs": [],
+    }
+    with temporary_database() as database:
+        seed(args.orders)
+        dishes = list(Dish.objects.values_list("pk", flat=True))
+        connection.close()
+        env = get_server_env(database)
+        process = start_server(args.server, args.port, args.workers, env)
+        try:
+            for scenario in args.scenario:
+                weights = SCENARIOS[scenario]
+                for concurrency in args.concurrency:
+                    load = (args.port, dishes, weights, concurrency)
+                    if args.warmup:
+                        asyncio.run(run_load(*load, args.warmup, args.seed))
+                    elapsed, latencies, errors = asyncio.run(
+                        run_load(*load, args.duration, args.seed)
+                    )
+                    total = summarize(
+                        list(chain.from_iterable(latencies.values())),
+                        sum(errors.values()),
+                        elapsed,
+                    )
+                    report["runs"].append(
+                        {
+                            "scenario": scenario,
+                            "concurrency": concurrency,
+                            "total": total,
+                            "operations": {
+                                name: summarize(
+                                    latencies[name], errors[name], elapsed
+                                )
+                                for name in sorted(latencies)
+                            },
+                        }
+                    )
+                    print(
+                        f"{scenario} x{concurrency}: "
+                        f"{total['throughput']} запр./с, "
+                        f"p95 {total['p95_ms']} мс, "
+                        f"ошибок {total['errors']}",
+                        file=sys.stderr,
+                    )
+        finally:
+            stop_server(process)
+
+    content = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        args.output.write_text(content + "\n")
+    else:
+        print(content)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Сравнение обновления позиций заказа: построчное сохранение (прежняя
+реализация OrderCreateSerializer._save_items) и синхронизация
+orders.services.sync_items.
+
+Запуск из корня репозитория:
+
+    python benchmarks/order_items_sync.py --lines 10 50 200
+"""
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "cafe"))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "cafe.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.db import connection  # noqa: E402
+from django.test.utils import CaptureQueriesContext  # noqa: E402
+
+from menu.models import Dish  # noqa: E402
+from orders.models import Order, OrderItem  # noqa: E402
+from orders.services import create_order, sync_items  # noqa: E402
+
+
+def save_items_per_row(order: Order, items: list[dict]):
+    """Прежняя построчная реализация обновления позиций"""
+    items_in_db = {i.dish_id: i for i in order.items.all()}
+    for item_data in items:
+        dish_id = item_data["dish"]
+        if dish_id in items_in_db:
+            item = items_in_db.pop(dish_id)
+            item.quantity = item_data["quantity"]
+            item.save()
+        else:
+            OrderItem.objects.create(
+                order=order, dish_id=dish_id, quantity=item_data["quantity"]
+            )
+    OrderItem.objects.filter(
+        order=order, dish_id__in=items_in_db.keys()
+    ).delete()
+    order.update_totals()
+
+
+def build_payload(dishes: list[Dish], lines: int):
+    """
+    Исходные позиции заказа и новые данные: половина количеств меняется,
+    вторая половина позиций заменяется другими блюдами
+    """
+    initial = [{"dish": d.id, "quantity": 1} for d in dishes[:lines]]
+    half = lines // 2
+    updated = [{"dish": d.id, "quantity": 3} for d in dishes[:half]]
+    updated += [
+        {"dish": d.id, "quantity": 1} for d in dishes[lines : lines + half]
+    ]
+    return initial, updated
+
+
+def measure(func, dishes: list[Dish], lines: int, repeat: int):
+    queries, elapsed = 0, 0.0
+    for _ in range(repeat):
+        initial, updated = build_payload(dishes, lines)
+        order = create_order(Order(table_number="1"), initial)
+        order = Order.objects.get(pk=order.pk)
+        with CaptureQueriesContext(connection) as captured:
+            start = time.perf_counter()
+            func(order, updated)
+            elapsed += time.perf_counter() - start
+        queries = len(captured)
+    return queries, elapsed / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--lines", type=int, nargs="+", default=[10, 50, 200])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    old_name = connection.creation.create_test_db(verbosity=0)
+    try:
+        dishes = Dish.objects.bulk_create(
+            [
+                Dish(name=f"dish_{i}", price=i)
+                for i in range(1, max(args.lines) * 2 + 1)
+            ]
+        )
+        print(f"{'позиций':>8} {'построчно':>22} {'sync_items':>22}")
+        for lines in args.lines:
+            row = [f"{lines:>8}"]
+            for func in (save_items_per_row, sync_items):
+                queries, ms = measure(func, dishes, lines, args.repeat)
+                row.append(f"{queries:>6} запр. {ms:>8.2f} мс")
+            print(" ".join(row))
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+if __name__ == "__main__":
+    main()
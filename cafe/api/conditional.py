@@ -0,0 +1,81 @@
+from collections.abc import Awaitable, Callable
+from datetime import datetime
+
+from django.http import HttpRequest, HttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+from rest_framework.request import Request
+from rest_framework.response import Response
+
+from monitoring.metrics import record_cache_request
+
+
+def build_etag(request: Request | HttpRequest, *parts) -> str:
+    """
+    ETag из частей версии ресурса и формата ответа: JSON и Browsable API
+    по одному адресу отличаются. Асинхронные представления без DRF
+    отвечают только в JSON.
+    """
+    renderer = getattr(request, "accepted_renderer", None)
+    renderer_format = renderer.format if renderer else "json"
+    return '"{}"'.format("-".join(map(str, (*parts, renderer_format))))
+
+
+def set_validators(response: HttpResponse, etag: str, timestamp: int):
+    """
+    Заголовки ETag и Last-Modified. Клиенты должны перепроверять ответ
+    при каждом запросе.
+    """
+    response.headers["ETag"] = etag
+    response.headers["Last-Modified"] = http_date(timestamp)
+    patch_cache_control(response, no_cache=True)
+
+
+def conditional_response(
+    etag: str,
+    last_modified: datetime,
+    handler: Callable[..., Response],
+    request: Request,
+    *args,
+    **kwargs,
+):
+    """
+    Ответ на условный GET: при совпадении If-None-Match или
+    If-Modified-Since возвращается 304 без вызова handler, иначе ответ
+    handler дополняется заголовками ETag и Last-Modified.
+    """
+    timestamp = int(last_modified.timestamp())
+    response = get_conditional_response(
+        request, etag=etag, last_modified=timestamp
+    )
+    # Ответ 304 — попадание в кэш клиента или nginx
+    record_cache_request("http_conditional", response is not None)
+    if response is None:
+        response = handler(request, *args, **kwargs)
+        if response.status_code != 200:
+            return response
+    set_validators(response, etag, timestamp)
+    return response
+
+
+async def aconditional_response(
+    etag: str,
+    last_modified: datetime,
+    handler: Callable[..., Awaitable[HttpResponse]],
+    request: HttpRequest,
+    *args,
+    **kwargs,
+):
+    """Асинхронный вариант conditional_response"""
+    timestamp = int(last_modified.timestamp())
+    response = get_conditional_response(
+        request, etag=etag, last_modified=timestamp
+    )
+    # Ответ 304 — попадание в кэш клиента или nginx
+    record_cache_request("http_conditional", response is not None)
+    if response is None:
+        response = await handler(request, *args, **kwargs)
+        if response.status_code != 200:
+            return response
+    set_validators(response, etag, timestamp)
+    return response
@@ -0,0 +1,98 @@
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+from orders.pagination import (
+    CURSOR_FILTERS,
+    Cursor,
+    InvalidCursor,
+    paginate_by_cursor,
+)
+
+
+class OrderCursorPagination(BasePagination):
+    """
+    Постраничный вывод заказов по курсору (-created, -id) без COUNT(*)
+    и OFFSET. Параметр page включает постраничный вывод по номерам
+    страниц для небольших выборок.
+    """
+
+    page_size = api_settings.PAGE_SIZE
+    cursor_query_param = "cursor"
+    page_query_param = "page"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_number_pagination = None
+        if self.page_query_param in request.query_params:
+            self.page_number_pagination = PageNumberPagination()
+            return self.page_number_pagination.paginate_queryset(
+                queryset, request, view
+            )
+        encoded = request.query_params.get(self.cursor_query_param)
+        filters = {
+            key: request.query_params.get(key) for key in CURSOR_FILTERS
+        }
+        try:
+            cursor = Cursor.decode(encoded) if encoded else None
+            self.page = paginate_by_cursor(
+                queryset, cursor, self.page_size, filters
+            )
+        except InvalidCursor as error:
+            raise NotFound(str(error))
+        return self.page.object_list
+
+    def get_link(self, cursor: str | None) -> str | None:
+        if cursor is None:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, cursor)
+
+    def get_paginated_response(self, data):
+        if self.page_number_pagination:
+            return self.page_number_pagination.get_paginated_response(data)
+        return Response(
+            {
+                "next": self.get_link(self.page.next_cursor),
+                "previous": self.get_link(self.page.previous_cursor),
+                "results": data,
+            }
+        )
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "previous": {
+                    "type": "string",
+                    "nullable": True,
+                    "format": "uri",
+                },
+                "results": schema,
+            },
+        }
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                "name": self.cursor_query_param,
+                "required": False,
+                "in": "query",
+                "description": "Курсор страницы из ссылок next/previous.",
+                "schema": {"type": "string"},
+            },
+            {
+                "name": self.page_query_param,
+                "required": False,
+                "in": "query",
+                "description": (
+                    "Номер страницы: включает постраничный вывод с подсчётом "
+                    "общего количества заказов."
+                ),
+                "schema": {"type": "integer"},
+            },
+        ]
@@ -1,5 +1,11 @@
 from api.serializers.order_serializers import (
+    OrderBulkDeleteSerializer,
+    OrderBulkResultSerializer,
+    OrderBulkStatusSerializer,
     OrderChangeStatusSerializer,
+    RevenueCacheStatsSerializer,
+    RevenueSeriesQuerySerializer,
+    RevenueSeriesSerializer,
     RevenueSerializer,
 )
 from drf_spectacular.extensions import OpenApiViewExtension
@@ -46,11 +52,48 @@ class OrderViewExtension(OpenApiViewExtension):
                 request=OrderChangeStatusSerializer,
                 responses={201: OrderChangeStatusSerializer},
             ),
+            bulk_status=extend_schema(
+                summary="Изменение статуса нескольких заказов",
+                description=(
+                    "Меняет статус заказов из списка ids одним запросом "
+                    "и возвращает результат для каждого id: updated, "
+                    "unchanged или not_found."
+                ),
+                request=OrderBulkStatusSerializer,
+                responses={200: OrderBulkResultSerializer(many=True)},
+            ),
+            bulk_delete=extend_schema(
+                summary="Удаление нескольких заказов",
+                description=(
+                    "Удаляет заказы из списка ids порциями в одной "
+                    "транзакции и возвращает результат для каждого id: "
+                    "deleted или not_found."
+                ),
+                request=OrderBulkDeleteSerializer,
+                responses={200: OrderBulkResultSerializer(many=True)},
+            ),
             revenue=extend_schema(
                 summary="Изменение статуса заказа",
                 description="Изменение статуса заказа.",
                 responses={200: RevenueSerializer},
             ),
+            revenue_series=extend_schema(
+                summary="Ряд выручки по интервалам",
+                description=(
+                    "Выручка и количество оплаченных заказов по часам, дням "
+                    "или неделям за рабочие дни from–to в виде параллельных "
+                    "массивов. Интервалы без оплаченных заказов не выводятся."
+                ),
+                parameters=[RevenueSeriesQuerySerializer],
+                responses={200: RevenueSeriesSerializer},
+            ),
+            revenue_cache_stats=extend_schema(
+                summary="Статистика кэша выручки",
+                description=(
+                    "Количество попаданий и промахов кэша выручки за периоды."
+                ),
+                responses={200: RevenueCacheStatsSerializer},
+            ),
         )
         class Fixed(self.target_class):
             queryset = Order.objects.none()
@@ -1,6 +1,13 @@
+from datetime import timedelta
+
+from django.utils import timezone
 from rest_framework import serializers
 
+from menu.models import Dish
+from orders.export import ExportFormat
 from orders.models import Order, OrderItem
+from orders.services import BulkResult, create_order, update_order
+from orders.utils import RevenueBucket, get_business_date
 
 
 class OrderItemReadSerializer(serializers.ModelSerializer):
@@ -13,12 +20,61 @@ class OrderItemReadSerializer(serializers.ModelSerializer):
         fields = ("id", "dish", "price", "quantity")
 
 
+class DishPrimaryKeyField(serializers.PrimaryKeyRelatedField):
+    """
+    Id блюда позиции заказа. Здесь проверяется только формат id: блюда
+    всех позиций загружаются одним запросом в OrderItemListSerializer.
+    """
+
+    def to_internal_value(self, data):
+        if isinstance(data, bool):
+            self.fail("incorrect_type", data_type=type(data).__name__)
+        try:
+            return int(data)
+        except (TypeError, ValueError):
+            self.fail("incorrect_type", data_type=type(data).__name__)
+
+
+class OrderItemListSerializer(serializers.ListSerializer):
+    """
+    Список позиций заказа: блюда всех позиций загружаются одним запросом
+    in_bulk, отсутствующие и неактивные блюда отклоняются за один проход,
+    а в данные позиций подставляются загруженные объекты блюд.
+    """
+
+    def to_internal_value(self, data):
+        # Ошибки возвращаются по позициям, как ошибки полей позиций
+        attrs = super().to_internal_value(data)
+        dishes = Dish.objects.in_bulk({item["dish"] for item in attrs})
+        does_not_exist = self.child.fields["dish"].error_messages[
+            "does_not_exist"
+        ]
+        errors = []
+        for item in attrs:
+            dish = dishes.get(item["dish"])
+            if dish is None:
+                error = does_not_exist.format(pk_value=item["dish"])
+                errors.append({"dish": [error]})
+            elif not dish.is_active:
+                error = f"Блюдо «{dish}» недоступно для заказа."
+                errors.append({"dish": [error]})
+            else:
+                item["dish"] = dish
+                errors.append({})
+        if any(errors):
+            raise serializers.ValidationError(errors)
+        return attrs
+
+
 class OrderItemCreateSerializer(serializers.ModelSerializer):
     """Создание позиций заказа"""
 
+    dish = DishPrimaryKeyField(queryset=Dish.objects.filter(is_active=True))
+
     class Meta:
         model = OrderItem
         fields = ("id", "dish", "quantity")
+        list_serializer_class = OrderItemListSerializer
 
 
 class OrderBaseSerializer(serializers.ModelSerializer):
@@ -27,7 +83,6 @@ class OrderBaseSerializer(serializers.ModelSerializer):
     total_price = serializers.DecimalField(
         max_digits=8,
         decimal_places=2,
-        source="get_total_price",
         read_only=True,
     )
 
@@ -36,6 +91,13 @@ class OrderBaseSerializer(serializers.ModelSerializer):
         fields = ("id", "table_number", "status", "total_price", "items")
 
 
+class OrderSummarySerializer(OrderBaseSerializer):
+    """Просмотр заказов без позиций"""
+
+    class Meta(OrderBaseSerializer.Meta):
+        fields = ("id", "table_number", "status", "total_price", "item_count")
+
+
 class OrderReadSerializer(OrderBaseSerializer):
     """Просмотр заказов"""
 
@@ -45,32 +107,24 @@ class OrderReadSerializer(OrderBaseSerializer):
 class OrderCreateSerializer(OrderBaseSerializer):
     items = OrderItemCreateSerializer(many=True)
 
+    def validate_status(self, value: str):
+        """Изменение статуса заказа должно быть допустимым переходом"""
+        current = self.instance.status if self.instance else None
+        if current and current != value:
+            if not Order.can_transition(current, value):
+                raise serializers.ValidationError(
+                    f"Переход из статуса {current} в статус {value} "
+                    "недопустим."
+                )
+        return value
+
     def create(self, validated_data: dict):
         """
         Создаёт заказ на основе переданных данных и добавляет связанные
         позиции заказа.
         """
         items = validated_data.pop("items")
-        order = Order.objects.create(**validated_data)
-        for item in items:
-            OrderItem.objects.create(order=order, **item)
-        return order
-
-    def _save_items(self, instance: Order, items_data: list[dict]):
-        """
-        Обновляет или создаёт позиции заказа для переданного заказа,
-        удаляя отсутствующие в новых данных позиции.
-        """
-        items_in_db = {i.dish_id: i for i in instance.items.all()}
-        for item_data in items_data:
-            dish_id = item_data["dish"].id
-            if dish_id in items_in_db:
-                item = items_in_db.pop(item_data["dish"].id)
-                item.quantity = item_data["quantity"]
-                item.save()
-            else:
-                OrderItem.objects.create(order=instance, **item_data)
-        OrderItem.objects.filter(dish_id__in=items_in_db.keys()).delete()
+        return create_order(Order(**validated_data), items)
 
     def update(self, instance: Order, validated_data: dict):
         """
@@ -81,14 +135,7 @@ class OrderCreateSerializer(OrderBaseSerializer):
             "table_number", instance.table_number
         )
         instance.status = validated_data.get("status", instance.status)
-
-        if "items" in validated_data:
-            items_data = validated_data.pop("items")
-            self._save_items(instance, items_data)
-
-        instance.save()
-
-        return instance
+        return update_order(instance, validated_data.get("items"))
 
 
 class OrderChangeStatusSerializer(serializers.ModelSerializer):
@@ -99,13 +146,126 @@ class OrderChangeStatusSerializer(serializers.ModelSerializer):
         fields = ("status",)
 
 
+class OrderBulkDeleteSerializer(serializers.Serializer):
+    """Сериализатор списка id заказов для массовых операций"""
+
+    ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        allow_empty=False,
+        max_length=500,
+    )
+
+
+class OrderBulkStatusSerializer(OrderBulkDeleteSerializer):
+    """Сериализатор массовой смены статуса заказов"""
+
+    status = serializers.ChoiceField(choices=Order.Status.choices)
+
+
+class OrderBulkResultSerializer(serializers.Serializer):
+    """Сериализатор результата массовой операции по каждому заказу"""
+
+    id = serializers.IntegerField()
+    result = serializers.ChoiceField(choices=BulkResult.choices)
+
+    def to_representation(self, instance):
+        pk, result = instance
+        return super().to_representation({"id": pk, "result": result})
+
+
 class RevenueSerializer(serializers.Serializer):
     """
     Сериализатор для вывода выручки за оплаченные заказы за периоды:
     Сегодня, Неделю, Месяц, Все время
     """
 
-    today = serializers.DecimalField(max_digits=8, decimal_places=2)
-    week = serializers.DecimalField(max_digits=8, decimal_places=2)
-    month = serializers.DecimalField(max_digits=8, decimal_places=2)
-    all_time = serializers.DecimalField(max_digits=8, decimal_places=2)
+    today = serializers.DecimalField(max_digits=12, decimal_places=2)
+    week = serializers.DecimalField(max_digits=12, decimal_places=2)
+    month = serializers.DecimalField(max_digits=12, decimal_places=2)
+    all_time = serializers.DecimalField(max_digits=12, decimal_places=2)
+
+
+class RevenueCacheStatsSerializer(serializers.Serializer):
+    """Сериализатор статистики кэша выручки"""
+
+    hits = serializers.IntegerField()
+    misses = serializers.IntegerField()
+
+
+class RevenueSeriesQuerySerializer(serializers.Serializer):
+    """
+    Параметры ряда выручки: рабочие дни from и to включительно
+    (по умолчанию последние 7 дней) и интервал группировки bucket
+    """
+
+    bucket = serializers.ChoiceField(
+        choices=RevenueBucket.choices, default=RevenueBucket.DAY
+    )
+
+    def get_fields(self):
+        fields = super().get_fields()
+        fields["from"] = serializers.DateField(required=False)
+        fields["to"] = serializers.DateField(required=False)
+        return fields
+
+    def validate(self, attrs):
+        date_to = attrs.get("to") or get_business_date(timezone.now())
+        date_from = attrs.get("from") or date_to - timedelta(days=6)
+        if date_from > date_to:
+            raise serializers.ValidationError(
+                {"from": "Начало периода должно быть не позже его конца."}
+            )
+        return {"from": date_from, "to": date_to, "bucket": attrs["bucket"]}
+
+
+class RevenueSeriesSerializer(serializers.Serializer):
+    """
+    Ряд выручки в колоночном виде: параллельные массивы начала интервалов,
+    выручки и количества оплаченных заказов
+    """
+
+    bucket = serializers.CharField()
+    timestamps = serializers.ListField(child=serializers.CharField())
+    totals = serializers.ListField(
+        child=serializers.DecimalField(max_digits=12, decimal_places=2)
+    )
+    orders = serializers.ListField(child=serializers.IntegerField())
+
+    def to_representation(self, instance):
+        bucket, series = instance
+        return super().to_representation(
+            {
+                "bucket": bucket,
+                "timestamps": [row["bucket"].isoformat() for row in series],
+                "totals": [row["total"] for row in series],
+                "orders": [row["order_count"] for row in series],
+            }
+        )
+
+
+class OrderExportQuerySerializer(serializers.Serializer):
+    """
+    Параметры выгрузки заказов: формат, рабочие дни создания from и to
+    включительно и статус
+    """
+
+    format = serializers.ChoiceField(
+        choices=ExportFormat.choices, default=ExportFormat.CSV
+    )
+    status = serializers.ChoiceField(
+        choices=Order.Status.choices, required=False
+    )
+
+    def get_fields(self):
+        fields = super().get_fields()
+        fields["from"] = serializers.DateField(required=False)
+        fields["to"] = serializers.DateField(required=False)
+        return fields
+
+    def validate(self, attrs):
+        date_from, date_to = attrs.get("from"), attrs.get("to")
+        if date_from and date_to and date_from > date_to:
+            raise serializers.ValidationError(
+                {"from": "Начало периода должно быть не позже его конца."}
+            )
+        return attrs
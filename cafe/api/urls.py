@@ -1,4 +1,10 @@
-from api.views import menu_views, order_views
+from api.views import (
+    async_views,
+    event_views,
+    export_views,
+    menu_views,
+    order_views,
+)
 from django.urls import include, path
 from rest_framework.routers import DefaultRouter
 
@@ -8,7 +14,27 @@ router = DefaultRouter()
 router.register("orders", order_views.OrderViewSet, basename="orders")
 router.register("dishes", menu_views.DishReadViewSet, basename="dishes")
 
+# Асинхронные представления чтения для ASGI-сервера
+async_urlpatterns = [
+    path("orders/", async_views.order_list, name="async-orders-list"),
+    path(
+        "orders/<int:pk>/",
+        async_views.order_detail,
+        name="async-orders-detail",
+    ),
+    path(
+        "orders/revenue/", async_views.revenue, name="async-orders-revenue"
+    ),
+    path("dishes/", async_views.dish_list, name="async-dishes-list"),
+]
 
 urlpatterns = [
+    path(
+        "orders/events/", event_views.order_events, name="orders-events"
+    ),
+    path(
+        "orders/export/", export_views.order_export, name="orders-export"
+    ),
+    path("async/", include(async_urlpatterns)),
     path("", include(router.urls)),
 ]
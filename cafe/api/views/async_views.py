@@ -0,0 +1,182 @@
+"""
+Асинхронные представления чтения заказов и меню для ASGI-сервера.
+Ответы совпадают с ответами представлений DRF по тем же данным, но
+запросы к БД выполняются асинхронным ORM и не занимают поток воркера
+на время ожидания клиента. Ответы выводятся только в JSON.
+"""
+
+from django.http import HttpRequest, HttpResponse
+from django_filters.filterset import filterset_factory
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.renderers import JSONRenderer
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from api.conditional import aconditional_response, build_etag
+from api.serializers.menu_serializers import DishReadSerializer
+from api.serializers.order_serializers import (
+    OrderReadSerializer,
+    OrderSummarySerializer,
+    RevenueSerializer,
+)
+from menu.cache import aget_menu_version, get_menu_last_modified
+from menu.models import Dish
+from orders.models import Order
+from orders.pagination import (
+    CURSOR_FILTERS,
+    Cursor,
+    InvalidCursor,
+    apaginate_by_cursor,
+)
+
+OrderFilterSet = filterset_factory(Order, fields=CURSOR_FILTERS)
+# Сообщение get_object_or_404, которым отвечает OrderViewSet
+ORDER_NOT_FOUND = f"No {Order._meta.object_name} matches the given query."
+
+
+def render_json(data, status: int = 200) -> HttpResponse:
+    """Ответ в JSON, как у JSONRenderer представлений DRF"""
+    return HttpResponse(
+        JSONRenderer().render(data),
+        content_type="application/json",
+        status=status,
+    )
+
+
+def not_found(detail) -> HttpResponse:
+    return render_json({"detail": detail}, status=404)
+
+
+def with_items(request: HttpRequest) -> bool:
+    """Нужно ли выводить позиции заказов (см. OrderViewSet.with_items)"""
+    return request.GET.get("items") != "false"
+
+
+def get_order_queryset(request: HttpRequest):
+    queryset = Order.objects.all()
+    if with_items(request):
+        queryset = queryset.prefetch_related("items", "items__dish")
+    return queryset
+
+
+def get_order_serializer_class(request: HttpRequest):
+    if with_items(request):
+        return OrderReadSerializer
+    return OrderSummarySerializer
+
+
+def get_link(request: HttpRequest, param: str, value) -> str | None:
+    if value is None:
+        return None
+    return replace_query_param(request.build_absolute_uri(), param, value)
+
+
+async def order_list(request: HttpRequest) -> HttpResponse:
+    """Список заказов с фильтрами и постраничным выводом по курсору"""
+    filterset = OrderFilterSet(request.GET, get_order_queryset(request))
+    if not filterset.is_valid():
+        return render_json(filterset.errors, status=400)
+    encoded = request.GET.get("cursor")
+    filters = {key: request.GET.get(key) for key in CURSOR_FILTERS}
+    try:
+        cursor = Cursor.decode(encoded) if encoded else None
+        page = await apaginate_by_cursor(
+            filterset.qs, cursor, api_settings.PAGE_SIZE, filters
+        )
+    except InvalidCursor as error:
+        return not_found(str(error))
+    serializer_class = get_order_serializer_class(request)
+    return render_json(
+        {
+            "next": get_link(request, "cursor", page.next_cursor),
+            "previous": get_link(request, "cursor", page.previous_cursor),
+            "results": serializer_class(page.object_list, many=True).data,
+        }
+    )
+
+
+async def order_detail(request: HttpRequest, pk: int) -> HttpResponse:
+    """Заказ с поддержкой условных запросов (см. OrderViewSet.retrieve)"""
+    try:
+        updated = await Order.objects.values_list(
+            "updated", flat=True
+        ).aget(pk=pk)
+    except Order.DoesNotExist:
+        return not_found(ORDER_NOT_FOUND)
+    version = await aget_menu_version()
+    return await aconditional_response(
+        build_etag(
+            request,
+            "order",
+            pk,
+            updated.timestamp(),
+            version,
+            int(with_items(request)),
+        ),
+        max(updated, get_menu_last_modified(version)),
+        render_order,
+        request,
+        pk,
+    )
+
+
+async def render_order(request: HttpRequest, pk: int) -> HttpResponse:
+    try:
+        order = await get_order_queryset(request).aget(pk=pk)
+    except Order.DoesNotExist:
+        return not_found(ORDER_NOT_FOUND)
+    return render_json(get_order_serializer_class(request)(order).data)
+
+
+async def dish_list(request: HttpRequest) -> HttpResponse:
+    """Меню активных блюд с условными запросами по версии меню"""
+    version = await aget_menu_version()
+    return await aconditional_response(
+        build_etag(request, "menu", version),
+        get_menu_last_modified(version),
+        render_dishes,
+        request,
+    )
+
+
+async def render_dishes(request: HttpRequest) -> HttpResponse:
+    """Страница меню по номеру, как у PageNumberPagination"""
+    page_size = api_settings.PAGE_SIZE
+    queryset = Dish.objects.filter(is_active=True)
+    count = await queryset.acount()
+    try:
+        number = int(request.GET.get("page", 1))
+    except ValueError:
+        return not_found(PageNumberPagination.invalid_page_message)
+    pages = max(1, -(-count // page_size))
+    if not 1 <= number <= pages:
+        return not_found(PageNumberPagination.invalid_page_message)
+    start = (number - 1) * page_size
+    dishes = [
+        dish async for dish in queryset[start : start + page_size].aiterator()
+    ]
+    url = request.build_absolute_uri()
+    previous = None
+    if number == 2:
+        previous = remove_query_param(url, "page")
+    elif number > 2:
+        previous = replace_query_param(url, "page", number - 1)
+    return render_json(
+        {
+            "count": count,
+            "next": get_link(
+                request, "page", number + 1 if number < pages else None
+            ),
+            "previous": previous,
+            "results": DishReadSerializer(dishes, many=True).data,
+        }
+    )
+
+
+async def revenue(request: HttpRequest) -> HttpResponse:
+    """Выручка за периоды по дневным итогам"""
+    serializer = RevenueSerializer(
+        data=await Order.aget_total_revenue_for_periods()
+    )
+    serializer.is_valid(raise_exception=True)
+    return render_json(serializer.data)
@@ -0,0 +1,32 @@
+from django.core.handlers.asgi import ASGIRequest
+from django.http import HttpResponse, StreamingHttpResponse
+
+from orders.events import stream_order_events
+
+
+async def order_events(request):
+    """
+    Лента событий заказов (Server-Sent Events): создание, смена статуса,
+    изменение позиций и удаление заказов после фиксации изменений.
+    Возобновляется с события, указанного в заголовке Last-Event-ID
+    или параметре last_event_id. Доступна только под ASGI-сервером:
+    под WSGI бесконечный поток занял бы воркер целиком.
+    """
+    if not isinstance(request, ASGIRequest):
+        return HttpResponse(
+            "Лента событий доступна только под ASGI-сервером.", status=501
+        )
+    last_event_id = request.headers.get(
+        "Last-Event-ID", request.GET.get("last_event_id")
+    )
+    if last_event_id is not None:
+        try:
+            last_event_id = int(last_event_id)
+        except ValueError:
+            return HttpResponse("Некорректный Last-Event-ID.", status=400)
+    response = StreamingHttpResponse(
+        stream_order_events(last_event_id), content_type="text/event-stream"
+    )
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
@@ -0,0 +1,37 @@
+from django.http import JsonResponse, StreamingHttpResponse
+
+from api.serializers.order_serializers import OrderExportQuerySerializer
+from orders.export import (
+    EXPORT_CONTENT_TYPES,
+    export_orders,
+    get_export_queryset,
+)
+
+
+def order_export(request):
+    """
+    Выгрузка истории заказов с позициями в CSV или NDJSON. Ответ
+    передаётся частями по мере чтения заказов из БД, поэтому выгрузка
+    начинается сразу и не накапливается в памяти.
+    """
+    query = OrderExportQuerySerializer(data=request.GET)
+    if not query.is_valid():
+        return JsonResponse(
+            query.errors,
+            status=400,
+            json_dumps_params={"ensure_ascii": False},
+        )
+    params = query.validated_data
+    export_format = params["format"]
+    queryset = get_export_queryset(
+        params.get("from"), params.get("to"), params.get("status")
+    )
+    response = StreamingHttpResponse(
+        export_orders(export_format, queryset),
+        content_type=EXPORT_CONTENT_TYPES[export_format],
+    )
+    response["Content-Disposition"] = (
+        f'attachment; filename="orders.{export_format}"'
+    )
+    response["X-Accel-Buffering"] = "no"
+    return response
@@ -1,11 +1,35 @@
 from rest_framework.viewsets import ReadOnlyModelViewSet
 
+from api.conditional import build_etag, conditional_response
 from api.serializers.menu_serializers import DishReadSerializer
+from menu.cache import get_menu_last_modified, get_menu_version
 from menu.models import Dish
 
 
 class DishReadViewSet(ReadOnlyModelViewSet):
-    """Просмотр меню блюд"""
+    """
+    Просмотр меню блюд. Ответы поддерживают условные запросы по версии
+    меню: пока меню не изменилось, возвращается 304 без запросов к БД.
+    """
 
     queryset = Dish.objects.filter(is_active=True)
     serializer_class = DishReadSerializer
+
+    def get_menu_response(self, handler, request, *args, **kwargs):
+        version = get_menu_version()
+        return conditional_response(
+            build_etag(request, "menu", version),
+            get_menu_last_modified(version),
+            handler,
+            request,
+            *args,
+            **kwargs,
+        )
+
+    def list(self, request, *args, **kwargs):
+        return self.get_menu_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.get_menu_response(
+            super().retrieve, request, *args, **kwargs
+        )
@@ -1,40 +1,142 @@
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.decorators import action
+from rest_framework.exceptions import APIException
+from rest_framework.generics import get_object_or_404
 from rest_framework.response import Response
 from rest_framework.viewsets import ModelViewSet
 
+from menu.cache import get_menu_last_modified, get_menu_version
+from orders.cache import get_revenue_cache_stats
 from orders.models import Order
+from orders.services import bulk_change_status, bulk_delete_orders
+from api.conditional import build_etag, conditional_response
+from api.pagination import OrderCursorPagination
 from api.serializers.order_serializers import (
+    OrderBulkDeleteSerializer,
+    OrderBulkResultSerializer,
+    OrderBulkStatusSerializer,
     OrderChangeStatusSerializer,
     OrderCreateSerializer,
     OrderReadSerializer,
+    OrderSummarySerializer,
+    RevenueCacheStatsSerializer,
+    RevenueSeriesQuerySerializer,
+    RevenueSeriesSerializer,
     RevenueSerializer,
 )
 
 
+class Conflict(APIException):
+    """Недопустимое изменение состояния заказа"""
+
+    status_code = 409
+    default_detail = "Конфликт состояния заказа."
+    default_code = "conflict"
+
+
 class OrderViewSet(ModelViewSet):
     """Заказы"""
 
-    queryset = Order.objects.prefetch_related("items", "items__dish")
+    queryset = Order.objects.all()
+    lookup_value_regex = r"\d+"
     serializer_class = OrderReadSerializer
     filter_backends = (DjangoFilterBackend,)
     filterset_fields = ("status", "table_number")
+    pagination_class = OrderCursorPagination
+
+    def with_items(self) -> bool:
+        """
+        Нужно ли выводить позиции заказов. Параметр запроса items=false
+        отключает вывод позиций вместе с их предзагрузкой.
+        """
+        return self.request.query_params.get("items") != "false"
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        # Ответ на удаление не содержит заказа, позиции не нужны
+        if self.request.method == "DELETE":
+            return queryset
+        if self.request.method != "GET" or self.with_items():
+            queryset = queryset.prefetch_related("items", "items__dish")
+        return queryset
+
+    def retrieve(self, request, *args, **kwargs):
+        """
+        Заказ с поддержкой условных запросов по времени обновления заказа
+        и версии меню (в позициях выводятся названия блюд). Для ответа 304
+        загружается только время обновления заказа.
+        """
+        updated = get_object_or_404(
+            Order.objects.values_list("updated", flat=True),
+            pk=kwargs[self.lookup_field],
+        )
+        version = get_menu_version()
+        return conditional_response(
+            build_etag(
+                request,
+                "order",
+                kwargs[self.lookup_field],
+                updated.timestamp(),
+                version,
+                int(self.with_items()),
+            ),
+            max(updated, get_menu_last_modified(version)),
+            super().retrieve,
+            request,
+            *args,
+            **kwargs,
+        )
 
     def get_serializer_class(self):
         if self.request.method == "GET":
+            if not self.with_items():
+                return OrderSummarySerializer
             return super().get_serializer_class()
         return OrderCreateSerializer
 
     @action(methods=["PATCH"], detail=True)
     def change_status(self, request, pk=None):
-        """Смена статуса заказа"""
-        serializer = OrderChangeStatusSerializer(
-            self.get_object(), data=request.data
-        )
+        """
+        Смена статуса заказа условным UPDATE без загрузки заказа.
+        Повторная установка текущего статуса не считается ошибкой.
+        """
+        serializer = OrderChangeStatusSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
-        serializer.save()
+        status = serializer.validated_data["status"]
+        if not Order.transition(pk, status):
+            current = get_object_or_404(
+                Order.objects.values_list("status", flat=True), pk=pk
+            )
+            if current != status:
+                raise Conflict(
+                    f"Переход из статуса {current} в статус {status} "
+                    "недопустим."
+                )
         return Response(serializer.data, status=201)
 
+    @action(methods=["PATCH"], detail=False)
+    def bulk_status(self, request):
+        """Смена статуса нескольких заказов"""
+        serializer = OrderBulkStatusSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        results = bulk_change_status(
+            serializer.validated_data["ids"],
+            serializer.validated_data["status"],
+        )
+        return Response(
+            OrderBulkResultSerializer(results.items(), many=True).data
+        )
+
+    @action(methods=["POST"], detail=False)
+    def bulk_delete(self, request):
+        """Удаление нескольких заказов"""
+        serializer = OrderBulkDeleteSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        results = bulk_delete_orders(serializer.validated_data["ids"])
+        return Response(
+            OrderBulkResultSerializer(results.items(), many=True).data
+        )
+
     @action(methods=["GET"], detail=False)
     def revenue(self, request):
         """Получение выручки"""
@@ -42,3 +144,27 @@ class OrderViewSet(ModelViewSet):
         serializer = RevenueSerializer(data=revenue)
         serializer.is_valid(raise_exception=True)
         return Response(serializer.data)
+
+    @action(
+        methods=["GET"],
+        detail=False,
+        url_path="revenue/series",
+        url_name="revenue-series",
+    )
+    def revenue_series(self, request):
+        """Ряд выручки по часам, дням или неделям за период"""
+        query = RevenueSeriesQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        params = query.validated_data
+        series = Order.get_revenue_series(
+            params["from"], params["to"], params["bucket"]
+        )
+        return Response(
+            RevenueSeriesSerializer((params["bucket"], series)).data
+        )
+
+    @action(methods=["GET"], detail=False)
+    def revenue_cache_stats(self, request):
+        """Статистика попаданий и промахов кэша выручки"""
+        serializer = RevenueCacheStatsSerializer(get_revenue_cache_stats())
+        return Response(serializer.data)
@@ -1,4 +1,5 @@
 import os
+import tempfile
 from pathlib import Path
 
 from dotenv import load_dotenv
@@ -11,7 +12,10 @@ SECRET_KEY = os.getenv("SECRET_KEY", default="django default")
 
 DEBUG = os.getenv("DEBUG") == "True"
 
-ALLOWED_HOSTS = ["127.0.0.1", "localhost"]
+# Через запятую; Prometheus обращается к сервисам по их именам
+ALLOWED_HOSTS = os.getenv(
+    "ALLOWED_HOSTS", default="127.0.0.1,localhost"
+).split(",")
 
 
 INSTALLED_APPS = [
@@ -21,26 +25,38 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
-    "debug_toolbar",
     "rest_framework",
     "django_filters",
     "drf_spectacular",
     "menu.apps.MenuConfig",
     "orders.apps.OrdersConfig",
     "api.apps.ApiConfig",
+    "monitoring.apps.MonitoringConfig",
 ]
 
 MIDDLEWARE = [
+    # Первым, чтобы учитывать время всех остальных middleware
+    "monitoring.middleware.RequestTimingMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
-    "debug_toolbar.middleware.DebugToolbarMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
+    # После AuthenticationMiddleware: профилировать может только персонал
+    "monitoring.middleware.ProfilingMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
 
+# Панель отладки только для разработки: в рабочем режиме её middleware
+# лишь замедляет каждый запрос
+if DEBUG:
+    INSTALLED_APPS.append("debug_toolbar")
+    MIDDLEWARE.insert(
+        MIDDLEWARE.index("django.middleware.csrf.CsrfViewMiddleware") + 1,
+        "debug_toolbar.middleware.DebugToolbarMiddleware",
+    )
+
 ROOT_URLCONF = "cafe.urls"
 
 TEMPLATES = [
@@ -60,6 +76,7 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = "cafe.wsgi.application"
+ASGI_APPLICATION = "cafe.asgi.application"
 
 if os.getenv("DATABASE") == "postgres":
     DATABASES = {
@@ -78,10 +95,79 @@ else:
     DATABASES = {
         "default": {
             "ENGINE": "django.db.backends.sqlite3",
-            "NAME": BASE_DIR / "db.sqlite3",
+            "NAME": os.getenv(
+                "SQLITE_NAME", default=BASE_DIR / "db.sqlite3"
+            ),
         }
     }
 
+# Кэш должен быть общим для всех процессов сервера (Redis): через него
+# сбрасываются кэши выручки и меню. Кэш в памяти процесса подходит только
+# для разработки и тестов, проверка check --deploy отклоняет его
+CACHES = {
+    "default": {
+        "BACKEND": os.getenv(
+            "CACHE_BACKEND",
+            default="django.core.cache.backends.locmem.LocMemCache",
+        ),
+        "LOCATION": os.getenv("CACHE_LOCATION", default=""),
+    }
+}
+
+# Максимальное время кэширования выручки за периоды, секунд
+REVENUE_CACHE_TIMEOUT = int(os.getenv("REVENUE_CACHE_TIMEOUT", default=300))
+
+# Лента событий заказов: интервал опроса журнала событий без LISTEN/NOTIFY
+# (SQLite) или проверки при их потере (PostgreSQL), интервал комментариев
+# для поддержания соединения и размер очереди клиента, секунд / событий
+ORDER_EVENTS_POLL_INTERVAL = float(
+    os.getenv("ORDER_EVENTS_POLL_INTERVAL", default=1)
+)
+ORDER_EVENTS_LISTEN_TIMEOUT = 30
+ORDER_EVENTS_HEARTBEAT = 15
+ORDER_EVENTS_QUEUE_SIZE = 1000
+# Ожидание события с пропущенным id (зафиксированного позже события
+# с большим id) перед рассылкой следующих событий, секунд
+ORDER_EVENTS_GAP_TIMEOUT = 2
+
+# Запросы дольше порога, миллисекунд, сохраняются вместе с SQL в кольцевой
+# буфер медленных запросов размером SLOW_REQUESTS_BUFFER_SIZE
+SLOW_REQUEST_THRESHOLD = float(
+    os.getenv("SLOW_REQUEST_THRESHOLD", default=500)
+)
+SLOW_REQUESTS_BUFFER_SIZE = int(
+    os.getenv("SLOW_REQUESTS_BUFFER_SIZE", default=100)
+)
+
+# Профилирование запросов персонала по заголовку X-Profile или параметру
+# profile со значением секрета; без секрета профилирование отключено.
+# Архивы профилей хранятся в PROFILING_DIR, старые удаляются.
+PROFILING_SECRET = os.getenv("PROFILING_SECRET", default="")
+PROFILING_DIR = os.getenv(
+    "PROFILING_DIR",
+    default=os.path.join(tempfile.gettempdir(), "cafe-profiles"),
+)
+PROFILING_MAX_ARTIFACTS = int(
+    os.getenv("PROFILING_MAX_ARTIFACTS", default=50)
+)
+
+# Строки журнала запросов monitoring.requests: медленные запросы
+# с уровнем WARNING, остальные с уровнем INFO
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {
+        "console": {"class": "logging.StreamHandler"},
+    },
+    "loggers": {
+        "monitoring.requests": {
+            "handlers": ["console"],
+            "level": os.getenv("REQUEST_LOG_LEVEL", default="WARNING"),
+            "propagate": False,
+        },
+    },
+}
+
 
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -107,6 +193,11 @@ USE_I18N = True
 
 USE_TZ = True
 
+# Часовой пояс кафе и начало рабочего дня (ЧЧ:ММ) для расчёта выручки:
+# заказы, оплаченные до начала рабочего дня, относятся к предыдущему дню
+CAFE_TIME_ZONE = os.getenv("CAFE_TIME_ZONE", default=TIME_ZONE)
+CAFE_DAY_START = os.getenv("CAFE_DAY_START", default="00:00")
+
 
 STATIC_URL = "static/"
 STATICFILES_DIRS = [BASE_DIR / "static"]
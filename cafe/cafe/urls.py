@@ -8,11 +8,15 @@ from drf_spectacular.views import (
     SpectacularSwaggerView,
 )
 
+from monitoring.views import metrics
+
 urlpatterns = [
     path("admin/", admin.site.urls),
     path("", include("menu.urls", namespace="menu")),
     path("orders/", include("orders.urls", namespace="orders")),
     path("api/v1/", include("api.urls", namespace="api")),
+    path("monitoring/", include("monitoring.urls", namespace="monitoring")),
+    path("metrics", metrics, name="metrics"),
 ]
 
 # Документация
@@ -0,0 +1,14 @@
+"""
+Настройки gunicorn, загружаемые из рабочего каталога. Показатели
+Prometheus воркеров хранятся в файлах каталога PROMETHEUS_MULTIPROC_DIR.
+"""
+
+import os
+
+from prometheus_client import multiprocess
+
+
+def child_exit(server, worker):
+    """Запросы в обработке завершённого воркера больше не учитываются"""
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        multiprocess.mark_process_dead(worker.pid)
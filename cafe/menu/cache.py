@@ -0,0 +1,63 @@
+import time
+from datetime import datetime
+from datetime import timezone as dt_timezone
+
+from django.core.cache import cache
+
+from menu.models import Dish
+from monitoring.metrics import record_cache_request
+
+# Версия меню хранится в общем для всех процессов кэше (проверка
+# orders.E001): по ней процессы сбрасывают свои активные блюда
+MENU_VERSION_KEY = "menu:version"
+
+# Активные блюда текущего процесса: (версия меню, блюда по id)
+_active_dishes: tuple[int, dict[int, Dish]] | None = None
+
+
+def get_menu_version() -> int:
+    """
+    Версия меню из общего кэша: время последнего изменения меню
+    в наносекундах. Если ключ отсутствует (кэш очищен или вытеснен),
+    создаётся новая версия, не совпадающая с прежними.
+    """
+    version = cache.get(MENU_VERSION_KEY)
+    if version is None:
+        cache.add(MENU_VERSION_KEY, time.time_ns(), timeout=None)
+        version = cache.get(MENU_VERSION_KEY)
+    return version
+
+
+async def aget_menu_version() -> int:
+    """Асинхронный вариант get_menu_version"""
+    version = await cache.aget(MENU_VERSION_KEY)
+    if version is None:
+        await cache.aadd(MENU_VERSION_KEY, time.time_ns(), timeout=None)
+        version = await cache.aget(MENU_VERSION_KEY)
+    return version
+
+
+def get_menu_last_modified(version: int) -> datetime:
+    """Время последнего изменения меню по его версии"""
+    return datetime.fromtimestamp(version / 10**9, dt_timezone.utc)
+
+
+def bump_menu_version():
+    """Меняет версию меню, сбрасывая кэши меню во всех процессах"""
+    version = max(time.time_ns(), (cache.get(MENU_VERSION_KEY) or 0) + 1)
+    cache.set(MENU_VERSION_KEY, version, timeout=None)
+
+
+def get_active_dishes() -> dict[int, Dish]:
+    """
+    Активные блюда по id в порядке меню. Список загружается одним запросом
+    и хранится в памяти процесса до изменения версии меню.
+    """
+    global _active_dishes
+    version = get_menu_version()
+    hit = _active_dishes is not None and _active_dishes[0] == version
+    record_cache_request("active_dishes", hit)
+    if not hit:
+        dishes = Dish.objects.filter(is_active=True)
+        _active_dishes = (version, {dish.pk: dish for dish in dishes})
+    return _active_dishes[1]
@@ -0,0 +1,17 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from menu.cache import bump_menu_version
+from menu.models import Dish
+
+
+@receiver(post_save, sender=Dish)
+@receiver(post_delete, sender=Dish)
+def reset_menu_cache(sender, **kwargs):
+    """
+    Меняет версию меню сразу и повторно после фиксации транзакции,
+    чтобы параллельный запрос не закэшировал незафиксированное меню
+    """
+    bump_menu_version()
+    transaction.on_commit(bump_menu_version)
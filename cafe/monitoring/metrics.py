@@ -0,0 +1,118 @@
+import os
+from collections import defaultdict
+
+from prometheus_client import (
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from prometheus_client.core import GaugeMetricFamily
+
+from monitoring.timing import RequestTiming
+
+# Метка адресов, не найденных в маршрутах
+UNRESOLVED_VIEW = "<unresolved>"
+
+REQUEST_LATENCY = Histogram(
+    "cafe_http_request_duration_seconds",
+    "Время обработки запроса по имени адреса",
+    ("view", "method"),
+)
+RESPONSES = Counter(
+    "cafe_http_responses",
+    "Ответы по имени адреса и коду ответа",
+    ("view", "status"),
+)
+REQUESTS_IN_PROGRESS = Gauge(
+    "cafe_http_requests_in_progress",
+    "Запросы в обработке",
+    multiprocess_mode="livesum",
+)
+DB_QUERIES = Histogram(
+    "cafe_db_queries_per_request",
+    "Количество запросов к БД за запрос по имени адреса",
+    ("view",),
+    buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100, float("inf")),
+)
+DB_TIME = Histogram(
+    "cafe_db_time_per_request_seconds",
+    "Время запросов к БД за запрос по имени адреса",
+    ("view",),
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5),
+)
+CACHE_REQUESTS = Counter(
+    "cafe_cache_requests",
+    "Обращения к кэшам приложения: попадания (hit) и промахи (miss)",
+    ("cache", "result"),
+)
+
+
+def observe_request(
+    view: str | None, method: str, status: int, timing: RequestTiming
+):
+    """Показатели обработанного запроса"""
+    view = view or UNRESOLVED_VIEW
+    REQUEST_LATENCY.labels(view, method).observe(timing.total_time)
+    RESPONSES.labels(view, str(status)).inc()
+    DB_QUERIES.labels(view).observe(timing.queries)
+    DB_TIME.labels(view).observe(timing.db_time)
+
+
+def record_cache_request(cache: str, hit: bool):
+    """Попадание или промах кэша cache"""
+    CACHE_REQUESTS.labels(cache, "hit" if hit else "miss").inc()
+
+
+class CacheHitRatioCollector:
+    """
+    Доля попаданий каждого кэша за всё время работы, рассчитанная
+    по собранным (в многопроцессном режиме — суммарным) счётчикам
+    """
+
+    def __init__(self, registry: CollectorRegistry):
+        self.registry = registry
+
+    def collect(self):
+        counts = defaultdict(lambda: {"hit": 0.0, "miss": 0.0})
+        for family in self.registry.collect():
+            if family.name != "cafe_cache_requests":
+                continue
+            for sample in family.samples:
+                if sample.name.endswith("_total"):
+                    labels = sample.labels
+                    counts[labels["cache"]][labels["result"]] += sample.value
+        ratio = GaugeMetricFamily(
+            "cafe_cache_hit_ratio",
+            "Доля попаданий кэша",
+            labels=("cache",),
+        )
+        for cache, values in sorted(counts.items()):
+            total = values["hit"] + values["miss"]
+            if total:
+                ratio.add_metric((cache,), values["hit"] / total)
+        yield ratio
+
+
+def get_registry() -> CollectorRegistry:
+    """
+    Реестр показателей: при заданном PROMETHEUS_MULTIPROC_DIR показатели
+    всех воркеров gunicorn собираются из файлов общего каталога, иначе
+    используются показатели текущего процесса
+    """
+    if "PROMETHEUS_MULTIPROC_DIR" not in os.environ:
+        return REGISTRY
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    return registry
+
+
+def collect_metrics() -> bytes:
+    """Показатели в текстовом формате Prometheus"""
+    registry = get_registry()
+    ratios = CollectorRegistry(auto_describe=False)
+    ratios.register(CacheHitRatioCollector(registry))
+    return generate_latest(registry) + generate_latest(ratios)
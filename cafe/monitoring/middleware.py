@@ -0,0 +1,157 @@
+import json
+import logging
+from time import perf_counter
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.urls import reverse
+from django.utils import timezone
+
+from monitoring.metrics import REQUESTS_IN_PROGRESS, observe_request
+from monitoring.profiling import (
+    PROFILE_HEADER,
+    is_profiling_requested,
+    profile_request,
+    profiling_lock,
+)
+from monitoring.timing import (
+    RequestTiming,
+    aadd_slow_request,
+    add_slow_request,
+    current_timing,
+)
+
+logger = logging.getLogger("monitoring.requests")
+
+
+class RequestTimingMiddleware:
+    """
+    Учёт количества и времени запросов к БД, времени отрисовки ответа
+    (шаблонов и рендереров DRF) и общего времени обработки запроса.
+    Результат выводится в заголовок Server-Timing, строкой JSON в журнал
+    monitoring.requests и в показатели Prometheus. Запросы дольше
+    SLOW_REQUEST_THRESHOLD миллисекунд сохраняются вместе с SQL
+    в кольцевой буфер медленных запросов.
+    Для потоковых ответов учитывается время до начала передачи.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        timing = RequestTiming()
+        token = current_timing.set(timing)
+        REQUESTS_IN_PROGRESS.inc()
+        try:
+            response = self.get_response(request)
+        finally:
+            REQUESTS_IN_PROGRESS.dec()
+            current_timing.reset(token)
+        entry = self.finish(request, response, timing)
+        if entry is not None:
+            add_slow_request(entry)
+        return response
+
+    async def __acall__(self, request):
+        timing = RequestTiming()
+        token = current_timing.set(timing)
+        REQUESTS_IN_PROGRESS.inc()
+        try:
+            response = await self.get_response(request)
+        finally:
+            REQUESTS_IN_PROGRESS.dec()
+            current_timing.reset(token)
+        entry = self.finish(request, response, timing)
+        if entry is not None:
+            await aadd_slow_request(entry)
+        return response
+
+    def process_template_response(self, request, response):
+        """
+        Учёт времени отрисовки: обработчик отрисовывает ответ сразу после
+        этого метода, так как middleware стоит первым в MIDDLEWARE
+        """
+        timing = current_timing.get()
+        if timing is None:
+            return response
+        start = perf_counter()
+
+        def rendered(response):
+            timing.render_time += perf_counter() - start
+
+        response.add_post_render_callback(rendered)
+        return response
+
+    def finish(self, request, response, timing: RequestTiming) -> dict | None:
+        """
+        Заголовок Server-Timing, строка журнала и показатели. Возвращает
+        запись для буфера медленных запросов, если запрос медленный.
+        """
+        timing.finish()
+        response["Server-Timing"] = timing.get_server_timing()
+        match = request.resolver_match
+        fields = {
+            "method": request.method,
+            "path": request.path,
+            "view": match.view_name if match else None,
+            "status": response.status_code,
+            **timing.as_dict(),
+        }
+        observe_request(
+            fields["view"], request.method, response.status_code, timing
+        )
+        slow = fields["total_ms"] >= settings.SLOW_REQUEST_THRESHOLD
+        logger.log(
+            logging.WARNING if slow else logging.INFO,
+            json.dumps(fields, ensure_ascii=False),
+            extra={"timing": fields},
+        )
+        if not slow:
+            return None
+        sql = [
+            (query, round(duration * 1000, 2))
+            for query, duration in timing.sql
+        ]
+        return {**fields, "time": timezone.now(), "sql": sql}
+
+
+class ProfilingMiddleware:
+    """
+    Профилирование отдельного запроса по требованию: запрос персонала
+    с заголовком X-Profile или параметром profile, равным
+    PROFILING_SECRET, выполняется под cProfile и tracemalloc, остальные
+    запросы не затрагиваются. Ссылка на архив профиля возвращается
+    в заголовке X-Profile. Профилируются синхронные представления
+    (сервис WSGI); под ASGI запросы пропускаются без изменений.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self) or not is_profiling_requested(request):
+            return self.get_response(request)
+        if not profiling_lock.acquire(blocking=False):
+            response = self.get_response(request)
+            response[PROFILE_HEADER] = "busy"
+            return response
+        try:
+            response, name = profile_request(self.get_response, request)
+        finally:
+            profiling_lock.release()
+        response[PROFILE_HEADER] = request.build_absolute_uri(
+            reverse("monitoring:profile_download", args=[name])
+        )
+        return response
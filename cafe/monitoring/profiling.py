@@ -0,0 +1,172 @@
+import cProfile
+import io
+import marshal
+import pstats
+import re
+import threading
+import tracemalloc
+import zipfile
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from time import perf_counter
+from uuid import uuid4
+
+from django.conf import settings
+from django.utils import timezone
+from django.utils.crypto import constant_time_compare
+from django.utils.text import slugify
+
+PROFILE_HEADER = "X-Profile"
+PROFILE_PARAM = "profile"
+PROFILE_NAME_PATTERN = re.compile(r"^[\w-]+\.zip$")
+# Количество функций и мест выделения памяти в отчётах
+PROFILE_TOP = 40
+# Глубина стека, сохраняемая tracemalloc для каждого выделения памяти
+TRACEMALLOC_FRAMES = 25
+
+# tracemalloc действует на весь процесс, поэтому одновременно
+# профилируется только один запрос процесса
+profiling_lock = threading.Lock()
+
+
+@dataclass
+class ProfileArtifact:
+    """Сохранённый профиль запроса"""
+
+    name: str
+    size: int
+    created: datetime
+
+
+def get_profiles_dir() -> Path:
+    return Path(settings.PROFILING_DIR)
+
+
+def is_profiling_requested(request) -> bool:
+    """
+    Запрошено ли профилирование: заголовок X-Profile или параметр profile
+    со значением PROFILING_SECRET от пользователя из персонала. Без
+    заданного секрета профилирование отключено.
+    """
+    secret = settings.PROFILING_SECRET
+    if not secret:
+        return False
+    value = request.headers.get(PROFILE_HEADER) or request.GET.get(
+        PROFILE_PARAM
+    )
+    if not value or not constant_time_compare(value, secret):
+        return False
+    user = getattr(request, "user", None)
+    return bool(user and user.is_active and user.is_staff)
+
+
+def format_stats(profiler: cProfile.Profile) -> str:
+    """Функции с наибольшим временем выполнения и вызываемые ими функции"""
+    stream = io.StringIO()
+    stats = pstats.Stats(profiler, stream=stream)
+    stats.strip_dirs().sort_stats(pstats.SortKey.CUMULATIVE)
+    stats.print_stats(PROFILE_TOP)
+    stats.print_callees(PROFILE_TOP)
+    return stream.getvalue()
+
+
+def format_allocations(snapshot: tracemalloc.Snapshot) -> str:
+    """Места выделения памяти по строкам кода и стеки крупнейших из них"""
+    snapshot = snapshot.filter_traces(
+        (
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"),
+        )
+    )
+    lines = ["Выделение памяти по строкам кода:", ""]
+    lines += map(str, snapshot.statistics("lineno")[:PROFILE_TOP])
+    for number, stat in enumerate(snapshot.statistics("traceback")[:5], 1):
+        lines += ["", f"Стек {number}: {stat}", *stat.traceback.format()]
+    return "\n".join(lines) + "\n"
+
+
+def prune_profiles():
+    """Удаляет старые профили сверх PROFILING_MAX_ARTIFACTS"""
+    profiles = sorted(
+        get_profiles_dir().glob("*.zip"),
+        key=lambda path: path.stat().st_mtime_ns,
+        reverse=True,
+    )
+    for path in profiles[settings.PROFILING_MAX_ARTIFACTS :]:
+        path.unlink(missing_ok=True)
+
+
+def save_profile(
+    request,
+    response,
+    duration: float,
+    profiler: cProfile.Profile,
+    snapshot: tracemalloc.Snapshot,
+) -> str:
+    """
+    Сохраняет профиль запроса архивом: stats.prof для pstats, snakeviz
+    или gprof2dot (граф вызовов), report.txt с самыми долгими функциями
+    и вызываемыми ими функциями, allocations.txt с местами выделения
+    памяти. Возвращает имя архива.
+    """
+    match = request.resolver_match
+    label = slugify(match.view_name if match else request.path) or "root"
+    name = f"{timezone.now():%Y%m%d-%H%M%S}-{label}-{uuid4().hex[:8]}.zip"
+    directory = get_profiles_dir()
+    directory.mkdir(parents=True, exist_ok=True)
+    summary = (
+        f"{request.method} {request.get_full_path()}\n"
+        f"Представление: {match.view_name if match else '-'}\n"
+        f"Статус ответа: {response.status_code}\n"
+        f"Время: {duration * 1000:.1f} мс\n\n"
+    )
+    with zipfile.ZipFile(directory / name, "w", zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr(
+            "stats.prof", marshal.dumps(pstats.Stats(profiler).stats)
+        )
+        zf.writestr("report.txt", summary + format_stats(profiler))
+        zf.writestr("allocations.txt", format_allocations(snapshot))
+    prune_profiles()
+    return name
+
+
+def profile_request(get_response, request):
+    """
+    Выполняет запрос под cProfile и tracemalloc. Возвращает ответ и имя
+    архива профиля.
+    """
+    started_tracing = not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start(TRACEMALLOC_FRAMES)
+    profiler = cProfile.Profile()
+    start = perf_counter()
+    try:
+        response = profiler.runcall(get_response, request)
+    finally:
+        duration = perf_counter() - start
+        snapshot = tracemalloc.take_snapshot()
+        if started_tracing:
+            tracemalloc.stop()
+    name = save_profile(request, response, duration, profiler, snapshot)
+    return response, name
+
+
+def get_profiles() -> list[ProfileArtifact]:
+    """Сохранённые профили, начиная с последнего"""
+    profiles = []
+    for path in get_profiles_dir().glob("*.zip"):
+        stat = path.stat()
+        created = datetime.fromtimestamp(
+            stat.st_mtime, timezone.get_current_timezone()
+        )
+        profiles.append(ProfileArtifact(path.name, stat.st_size, created))
+    return sorted(profiles, key=lambda profile: profile.created, reverse=True)
+
+
+def get_profile_path(name: str) -> Path | None:
+    """Путь архива профиля по имени или None для неверного имени"""
+    if not PROFILE_NAME_PATTERN.match(name):
+        return None
+    path = get_profiles_dir() / name
+    return path if path.is_file() else None
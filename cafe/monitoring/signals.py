@@ -0,0 +1,11 @@
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+from monitoring.timing import record_query
+
+
+@receiver(connection_created)
+def install_query_recorder(sender, connection, **kwargs):
+    """Учёт запросов каждого нового соединения с БД во время запроса"""
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
@@ -0,0 +1,118 @@
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from time import perf_counter
+
+from django.conf import settings
+from django.core.cache import cache
+
+SLOW_REQUESTS_KEY = "monitoring:slow:{slot}"
+SLOW_REQUESTS_COUNTER_KEY = "monitoring:slow:counter"
+# Наибольшее количество запросов SQL, сохраняемых для одного запроса
+MAX_RECORDED_QUERIES = 100
+
+
+@dataclass
+class RequestTiming:
+    """Запросы к БД и длительности этапов обработки запроса, секунд"""
+
+    start: float = field(default_factory=perf_counter)
+    queries: int = 0
+    db_time: float = 0.0
+    render_time: float = 0.0
+    total_time: float = 0.0
+    sql: list[tuple[str, float]] = field(default_factory=list)
+
+    def add_query(self, sql: str, duration: float):
+        self.queries += 1
+        self.db_time += duration
+        if len(self.sql) < MAX_RECORDED_QUERIES:
+            self.sql.append((sql, duration))
+
+    def finish(self):
+        self.total_time = perf_counter() - self.start
+
+    def as_dict(self) -> dict:
+        """Длительности в миллисекундах для журнала"""
+        return {
+            "total_ms": round(self.total_time * 1000, 2),
+            "db_ms": round(self.db_time * 1000, 2),
+            "db_queries": self.queries,
+            "render_ms": round(self.render_time * 1000, 2),
+        }
+
+    def get_server_timing(self) -> str:
+        """Значение заголовка Server-Timing"""
+        return ", ".join(
+            (
+                f'db;desc="{self.queries} queries";'
+                f"dur={self.db_time * 1000:.1f}",
+                f"render;dur={self.render_time * 1000:.1f}",
+                f"total;dur={self.total_time * 1000:.1f}",
+            )
+        )
+
+
+# Учёт текущего запроса: переменная контекста доступна и в потоках
+# sync_to_async, в которых выполняются запросы ORM под ASGI
+current_timing: ContextVar[RequestTiming | None] = ContextVar(
+    "current_timing", default=None
+)
+
+
+def record_query(execute, sql, params, many, context):
+    """Обёртка выполнения запросов к БД: время и SQL текущего запроса"""
+    timing = current_timing.get()
+    if timing is None:
+        return execute(sql, params, many, context)
+    start = perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timing.add_query(sql, perf_counter() - start)
+
+
+def get_slow_request_key(number: int) -> str:
+    """Ключ ячейки кольцевого буфера для медленного запроса с номером"""
+    return SLOW_REQUESTS_KEY.format(
+        slot=number % settings.SLOW_REQUESTS_BUFFER_SIZE
+    )
+
+
+def add_slow_request(entry: dict):
+    """
+    Сохраняет медленный запрос в кольцевой буфер в кэше: запрос с новым
+    номером занимает ячейку самого старого. С общим кэшем (Redis,
+    Memcached) буфер общий для всех процессов.
+    """
+    number = 1
+    if not cache.add(SLOW_REQUESTS_COUNTER_KEY, number, timeout=None):
+        try:
+            number = cache.incr(SLOW_REQUESTS_COUNTER_KEY)
+        except ValueError:
+            cache.set(SLOW_REQUESTS_COUNTER_KEY, number, timeout=None)
+    cache.set(
+        get_slow_request_key(number), {**entry, "number": number}, None
+    )
+
+
+async def aadd_slow_request(entry: dict):
+    """Асинхронный вариант add_slow_request"""
+    number = 1
+    if not await cache.aadd(SLOW_REQUESTS_COUNTER_KEY, number, timeout=None):
+        try:
+            number = await cache.aincr(SLOW_REQUESTS_COUNTER_KEY)
+        except ValueError:
+            await cache.aset(SLOW_REQUESTS_COUNTER_KEY, number, timeout=None)
+    await cache.aset(
+        get_slow_request_key(number), {**entry, "number": number}, None
+    )
+
+
+def get_slow_requests() -> list[dict]:
+    """Медленные запросы из буфера, начиная с последнего"""
+    keys = [
+        SLOW_REQUESTS_KEY.format(slot=slot)
+        for slot in range(settings.SLOW_REQUESTS_BUFFER_SIZE)
+    ]
+    entries = cache.get_many(keys).values()
+    return sorted(entries, key=lambda entry: entry["number"], reverse=True)
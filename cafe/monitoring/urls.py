@@ -0,0 +1,19 @@
+from django.urls import path
+
+from monitoring import views
+
+app_name = "monitoring"
+
+urlpatterns = [
+    path(
+        "slow-requests/",
+        views.SlowRequestsView.as_view(),
+        name="slow_requests",
+    ),
+    path("profiles/", views.ProfilesView.as_view(), name="profiles"),
+    path(
+        "profiles/<str:name>",
+        views.profile_download,
+        name="profile_download",
+    ),
+]
@@ -0,0 +1,58 @@
+from django.conf import settings
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import FileResponse, Http404, HttpResponse
+from django.utils.decorators import method_decorator
+from django.views.generic import TemplateView
+from prometheus_client import CONTENT_TYPE_LATEST
+
+from monitoring.metrics import collect_metrics
+from monitoring.profiling import get_profile_path, get_profiles
+from monitoring.timing import get_slow_requests
+from orders.checks import is_process_local_cache
+
+
+@method_decorator(staff_member_required, name="dispatch")
+class SlowRequestsView(TemplateView):
+    """
+    Медленные запросы с их SQL, доступны только персоналу. Буфер общий
+    для всех воркеров только с общим кэшем; с кэшем в памяти процесса
+    видны запросы воркера, обработавшего страницу.
+    """
+
+    template_name = "monitoring/slow_requests.html"
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context["slow_requests"] = get_slow_requests()
+        context["threshold"] = settings.SLOW_REQUEST_THRESHOLD
+        context["per_process"] = is_process_local_cache()
+        return context
+
+
+@method_decorator(staff_member_required, name="dispatch")
+class ProfilesView(TemplateView):
+    """Сохранённые профили запросов, доступны только персоналу"""
+
+    template_name = "monitoring/profiles.html"
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context["profiles"] = get_profiles()
+        return context
+
+
+@staff_member_required
+def profile_download(request, name):
+    """Архив профиля запроса"""
+    path = get_profile_path(name)
+    if path is None:
+        raise Http404("Профиль не найден.")
+    return FileResponse(open(path, "rb"), as_attachment=True, filename=name)
+
+
+def metrics(request):
+    """
+    Показатели в текстовом формате Prometheus. Адрес закрыт в nginx:
+    Prometheus опрашивает сервисы приложения напрямую.
+    """
+    return HttpResponse(collect_metrics(), content_type=CONTENT_TYPE_LATEST)
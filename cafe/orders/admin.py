@@ -1,3 +1,4 @@
+from django import forms
 from django.contrib import admin
 
 from orders.models import Order, OrderItem
@@ -9,6 +10,25 @@ class OrderItemInline(admin.TabularInline):
     model = OrderItem
 
 
+class OrderAdminForm(forms.ModelForm):
+    """Форма заказа, статус меняется только допустимым переходом"""
+
+    class Meta:
+        model = Order
+        fields = "__all__"
+
+    def clean_status(self):
+        status = self.cleaned_data["status"]
+        current = self.instance.status if self.instance.pk else None
+        if current and current != status:
+            if not Order.can_transition(current, status):
+                raise forms.ValidationError(
+                    f"Переход из статуса {current} в статус {status} "
+                    "недопустим."
+                )
+        return status
+
+
 @admin.register(Order)
 class OrderAdmin(admin.ModelAdmin):
     """Представление модели Order в интерфейсе администратора"""
@@ -20,11 +40,15 @@ class OrderAdmin(admin.ModelAdmin):
         "created",
         "updated",
         "count_items",
+        "total_price",
     )
-    list_editable = ("status", "table_number")
+    # Статус в списке не редактируется: переход проверяется формой заказа
+    list_editable = ("table_number",)
+    form = OrderAdminForm
+    readonly_fields = (*Order.TOTAL_FIELDS, "paid_at")
     list_filter = ("status", "table_number", "created")
     inlines = (OrderItemInline,)
 
     @admin.display(description="Количество блюд")
     def count_items(self, obj):
-        return obj.items.count()
+        return obj.item_count
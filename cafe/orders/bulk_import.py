@@ -0,0 +1,218 @@
+import csv
+import json
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass, field
+from decimal import Decimal, InvalidOperation
+from itertools import groupby, islice
+
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from menu.models import Dish
+from orders.export import ITEM_FIELDS, ExportFormat
+from orders.models import Order, OrderItem, RevenueDaily
+
+# Количество заказов, записываемых одной транзакцией
+IMPORT_CHUNK_SIZE = 1000
+
+
+class InvalidRecord(ValueError):
+    """Запись импорта не может быть преобразована в заказ"""
+
+
+def read_ndjson(lines: Iterable[str]) -> Iterator[dict]:
+    """Заказ на строку JSON с вложенным списком позиций items"""
+    for number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            yield json.loads(line)
+        except json.JSONDecodeError as error:
+            raise InvalidRecord(f"Строка {number}: {error}") from error
+
+
+def read_csv(lines: Iterable[str]) -> Iterator[dict]:
+    """
+    Позиция на строку CSV в формате выгрузки export_orders: идущие подряд
+    строки с одинаковым id заказа образуют один заказ
+    """
+    rows = csv.DictReader(lines)
+    for _, group in groupby(rows, key=lambda row: row.get("id")):
+        group = list(group)
+        record = dict(group[0])
+        items = (
+            {key: row.get(f"item_{key}") for key in ITEM_FIELDS}
+            for row in group
+        )
+        record["items"] = [item for item in items if any(item.values())]
+        yield record
+
+
+IMPORT_READERS = {
+    ExportFormat.CSV: read_csv,
+    ExportFormat.NDJSON: read_ndjson,
+}
+
+
+@dataclass
+class DishMap:
+    """Цены блюд по id и id блюд по названию для проверки позиций"""
+
+    prices: dict[int, Decimal] = field(default_factory=dict)
+    ids: dict[str, int] = field(default_factory=dict)
+
+    @classmethod
+    def load(cls) -> "DishMap":
+        dishes = cls()
+        for pk, name, price in Dish.objects.values_list("pk", "name", "price"):
+            dishes.prices[pk] = price
+            dishes.ids[name] = pk
+        return dishes
+
+    def resolve(self, item: dict) -> int | None:
+        """Id блюда позиции по id или названию"""
+        dish_id = item.get("dish_id")
+        if dish_id not in (None, ""):
+            try:
+                dish_id = int(dish_id)
+            except (TypeError, ValueError):
+                raise InvalidRecord(f"Некорректный id блюда: {dish_id}")
+            if dish_id not in self.prices:
+                raise InvalidRecord(f"Блюдо не найдено: {dish_id}")
+            return dish_id
+        name = item.get("dish_name")
+        if name:
+            if name not in self.ids:
+                raise InvalidRecord(f"Блюдо не найдено: {name}")
+            return self.ids[name]
+        return None
+
+
+def parse_datetime_value(value, name: str):
+    if value in (None, ""):
+        return None
+    parsed = parse_datetime(str(value))
+    if parsed is None:
+        raise InvalidRecord(f"Некорректное значение {name}: {value}")
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+
+def parse_decimal(value, name: str) -> Decimal:
+    try:
+        return Decimal(str(value))
+    except InvalidOperation:
+        raise InvalidRecord(f"Некорректное значение {name}: {value}")
+
+
+def build_order(
+    record: dict, dishes: DishMap
+) -> tuple[Order, list[OrderItem]]:
+    """
+    Несохранённый заказ с позициями по записи импорта. Позиции
+    с одинаковым блюдом объединяются, цена позиции без указанной цены
+    берётся из меню, итоги заказа рассчитываются по позициям. Позиция без
+    блюда допускается только с ценой (блюдо удалено из меню).
+    """
+    table_number = str(record.get("table_number") or "")
+    if not table_number:
+        raise InvalidRecord("Не указан номер стола")
+    status = record.get("status") or Order.Status.PENDING
+    if status not in Order.Status.values:
+        raise InvalidRecord(f"Некорректный статус: {status}")
+    created = parse_datetime_value(record.get("created"), "created")
+    created = created or timezone.now()
+    paid_at = None
+    if status == Order.Status.PAID:
+        paid_at = parse_datetime_value(record.get("paid_at"), "paid_at")
+        paid_at = paid_at or created
+    updated = parse_datetime_value(record.get("updated"), "updated")
+    order = Order(
+        table_number=table_number,
+        status=status,
+        created=created,
+        updated=updated or created,
+        paid_at=paid_at,
+    )
+
+    items = {}
+    for item in record.get("items") or []:
+        dish_id = dishes.resolve(item)
+        try:
+            quantity = int(item.get("quantity") or 1)
+        except (TypeError, ValueError):
+            quantity = 0
+        if quantity < 1:
+            raise InvalidRecord(
+                f"Некорректное количество: {item.get('quantity')}"
+            )
+        price = item.get("price")
+        if price not in (None, ""):
+            price = parse_decimal(price, "price")
+        elif dish_id is None:
+            raise InvalidRecord("Позиция без блюда и цены")
+        else:
+            price = dishes.prices[dish_id]
+        key = dish_id if dish_id is not None else object()
+        if key in items:
+            items[key].quantity += quantity
+        else:
+            items[key] = OrderItem(
+                dish_id=dish_id, quantity=quantity, price=price
+            )
+    order_items = list(items.values())
+    order.total_price = sum((i.total_price for i in order_items), Decimal(0))
+    order.item_count = len(order_items)
+    return order, order_items
+
+
+@transaction.atomic
+def save_orders(built: list[tuple[Order, list[OrderItem]]]):
+    """
+    Записывает порцию заказов с позициями: заказы и позиции одним
+    bulk_create каждые, время создания из записей восстанавливается одним
+    bulk_update, оплаченные заказы переносятся в дневные итоги выручки
+    """
+    orders = [order for order, _ in built]
+    created = [(order.created, order.updated) for order in orders]
+    Order.objects.bulk_create(orders)
+    # auto_now_add и auto_now перезаписывают время при вставке
+    for order, (order_created, order_updated) in zip(orders, created):
+        order.created, order.updated = order_created, order_updated
+    Order.objects.bulk_update(orders, ["created", "updated"])
+    order_items = []
+    for order, items in built:
+        for item in items:
+            item.order = order
+            order_items.append(item)
+    OrderItem.objects.bulk_create(order_items)
+    RevenueDaily.apply_changes(
+        (None, order.get_revenue_share()) for order in orders
+    )
+
+
+def import_orders(
+    records: Iterable[dict],
+    offset: int = 0,
+    chunk_size: int = IMPORT_CHUNK_SIZE,
+) -> Iterator[int]:
+    """
+    Импорт заказов порциями по chunk_size, каждая порция в отдельной
+    транзакции. Первые offset записей пропускаются. После записи каждой
+    порции возвращается количество обработанных записей: с этого
+    значения offset импорт можно продолжить после сбоя.
+    """
+    dishes = DishMap.load()
+    records = islice(records, offset, None)
+    while chunk := list(islice(records, chunk_size)):
+        built = []
+        for number, record in enumerate(chunk, start=offset):
+            try:
+                built.append(build_order(record, dishes))
+            except (InvalidRecord, AttributeError, TypeError) as error:
+                raise InvalidRecord(f"Запись {number}: {error}") from error
+        save_orders(built)
+        offset += len(chunk)
+        yield offset
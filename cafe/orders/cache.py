@@ -0,0 +1,94 @@
+from collections.abc import Awaitable, Callable
+from datetime import timedelta
+from math import ceil
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+from monitoring.metrics import record_cache_request
+from orders.utils import get_business_date, get_day_bounds
+
+REVENUE_CACHE_KEY = "orders:revenue:{date}"
+REVENUE_STATS_KEY = "orders:revenue:stats:{name}"
+REVENUE_STATS = ("hits", "misses")
+
+
+def get_revenue_cache_key() -> str:
+    """
+    Ключ выручки за текущий рабочий день: с началом нового дня (а значит
+    и недели, и месяца) используется новый ключ
+    """
+    return REVENUE_CACHE_KEY.format(date=get_business_date(timezone.now()))
+
+
+def get_revenue_cache_timeout() -> int:
+    """
+    Время жизни кэша: не дольше REVENUE_CACHE_TIMEOUT и не дольше
+    начала следующего рабочего дня
+    """
+    now = timezone.now()
+    today = get_business_date(now)
+    _, day_end = get_day_bounds(today, today + timedelta(days=1))
+    until_day_end = ceil((day_end - now).total_seconds())
+    return max(1, min(settings.REVENUE_CACHE_TIMEOUT, until_day_end))
+
+
+def increment_revenue_stat(name: str):
+    """Увеличивает счётчик попаданий или промахов кэша выручки"""
+    record_cache_request("revenue", name == "hits")
+    key = REVENUE_STATS_KEY.format(name=name)
+    if not cache.add(key, 1, timeout=None):
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, 1, timeout=None)
+
+
+async def aincrement_revenue_stat(name: str):
+    """Асинхронный вариант increment_revenue_stat"""
+    record_cache_request("revenue", name == "hits")
+    key = REVENUE_STATS_KEY.format(name=name)
+    if not await cache.aadd(key, 1, timeout=None):
+        try:
+            await cache.aincr(key)
+        except ValueError:
+            await cache.aset(key, 1, timeout=None)
+
+
+def get_revenue_cache_stats() -> dict[str, int]:
+    """Количество попаданий и промахов кэша выручки"""
+    keys = {REVENUE_STATS_KEY.format(name=n): n for n in REVENUE_STATS}
+    values = cache.get_many(keys)
+    return {name: values.get(key, 0) for key, name in keys.items()}
+
+
+def get_cached_revenue(compute: Callable[[], dict]) -> dict:
+    """Выручка за периоды из кэша или вычисленная функцией compute"""
+    key = get_revenue_cache_key()
+    revenue = cache.get(key)
+    if revenue is not None:
+        increment_revenue_stat("hits")
+        return revenue
+    increment_revenue_stat("misses")
+    revenue = compute()
+    cache.set(key, revenue, timeout=get_revenue_cache_timeout())
+    return revenue
+
+
+async def aget_cached_revenue(compute: Callable[[], Awaitable[dict]]) -> dict:
+    """Асинхронный вариант get_cached_revenue"""
+    key = get_revenue_cache_key()
+    revenue = await cache.aget(key)
+    if revenue is not None:
+        await aincrement_revenue_stat("hits")
+        return revenue
+    await aincrement_revenue_stat("misses")
+    revenue = await compute()
+    await cache.aset(key, revenue, timeout=get_revenue_cache_timeout())
+    return revenue
+
+
+def invalidate_revenue_cache():
+    """Сбрасывает кэш выручки за текущий рабочий день"""
+    cache.delete(get_revenue_cache_key())
@@ -0,0 +1,31 @@
+from django.conf import settings
+from django.core.checks import Error, Tags, register
+
+# Кэши, которые не видны другим процессам сервера
+PROCESS_LOCAL_CACHES = ("django.core.cache.backends.locmem.LocMemCache",)
+
+
+def is_process_local_cache() -> bool:
+    """Хранится ли кэш по умолчанию в памяти процесса"""
+    return settings.CACHES["default"]["BACKEND"] in PROCESS_LOCAL_CACHES
+
+
+@register(Tags.caches, deploy=True)
+def check_shared_cache(app_configs, **kwargs):
+    """
+    Кэш выручки, версия меню и буфер медленных запросов должны быть общими
+    для всех воркеров: иначе сброс кэша при изменении видит только
+    процесс, выполнивший изменение
+    """
+    if not is_process_local_cache():
+        return []
+    return [
+        Error(
+            "Кэш по умолчанию хранится в памяти процесса, воркеры сервера "
+            "не видят сброс кэшей друг друга.",
+            hint="Укажите общий кэш, например CACHE_BACKEND="
+            "django.core.cache.backends.redis.RedisCache и "
+            "CACHE_LOCATION=redis://redis:6379/0.",
+            id="orders.E001",
+        )
+    ]
@@ -0,0 +1,228 @@
+import asyncio
+import json
+import logging
+import select
+import threading
+import time
+import weakref
+from collections.abc import AsyncIterator, Callable
+
+from django.conf import settings
+from django.db import connections
+from django.db.models import Max
+
+from orders.models import OrderEvent
+
+logger = logging.getLogger(__name__)
+
+# Количество событий, загружаемых из журнала одним запросом
+EVENTS_BATCH_SIZE = 500
+# Задержка переподключения клиента EventSource, миллисекунд
+RECONNECT_DELAY = 3000
+
+
+class PostgresListener(threading.Thread):
+    """
+    Поток с отдельным соединением PostgreSQL: выполняет LISTEN канала
+    событий заказов и вызывает wake при каждом NOTIFY
+    """
+
+    def __init__(self, wake: Callable[[], None]):
+        super().__init__(name="order-events-listener", daemon=True)
+        self.wake = wake
+        self.stopped = threading.Event()
+
+    def run(self):
+        wrapper = connections["default"]
+        try:
+            conn = wrapper.get_new_connection(wrapper.get_connection_params())
+        except Exception:
+            logger.exception("Не удалось подключиться для LISTEN")
+            return
+        try:
+            conn.autocommit = True
+            with conn.cursor() as cursor:
+                cursor.execute(f"LISTEN {OrderEvent.NOTIFY_CHANNEL}")
+            while not self.stopped.is_set():
+                if select.select([conn], [], [], 1)[0]:
+                    conn.poll()
+                    if conn.notifies:
+                        conn.notifies.clear()
+                        self.wake()
+        except Exception:
+            # Хаб продолжит работу, опрашивая журнал по таймауту
+            logger.exception("Ошибка LISTEN событий заказов")
+        finally:
+            conn.close()
+
+    def stop(self):
+        self.stopped.set()
+
+
+async def get_last_event_id() -> int:
+    """Id последнего события в журнале"""
+    result = await OrderEvent.objects.aaggregate(last=Max("id"))
+    return result["last"] or 0
+
+
+class OrderEventHub:
+    """
+    Раздача событий заказов клиентам процесса. Одно уведомление БД
+    (NOTIFY в PostgreSQL или очередной опрос журнала в SQLite) приводит
+    к одному запросу новых событий, которые рассылаются в очереди всех
+    подписчиков. Хаб работает, пока есть подписчики.
+    """
+
+    def __init__(self):
+        self.subscribers: set[asyncio.Queue] = set()
+        self.last_id = 0
+        # Пропуск в нумерации после last_id: (last_id, время обнаружения)
+        self.gap: tuple[int, float] | None = None
+        self.wakeup = asyncio.Event()
+        self.lock = asyncio.Lock()
+        self.task: asyncio.Task | None = None
+
+    async def subscribe(self) -> asyncio.Queue:
+        """
+        Новая очередь событий с id больше текущего last_id хаба.
+        Значение None в очереди означает отключение отставшего клиента.
+        """
+        async with self.lock:
+            if self.task is None or self.task.done():
+                self.last_id = await get_last_event_id()
+                self.task = asyncio.create_task(self.run())
+        queue = asyncio.Queue(maxsize=settings.ORDER_EVENTS_QUEUE_SIZE)
+        self.subscribers.add(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue):
+        self.subscribers.discard(queue)
+
+    async def run(self):
+        listener = None
+        if connections["default"].vendor == "postgresql":
+            loop = asyncio.get_running_loop()
+            listener = PostgresListener(
+                lambda: loop.call_soon_threadsafe(self.wakeup.set)
+            )
+            listener.start()
+            timeout = settings.ORDER_EVENTS_LISTEN_TIMEOUT
+        else:
+            timeout = settings.ORDER_EVENTS_POLL_INTERVAL
+        try:
+            while True:
+                # Пропуск проверяется повторно, даже если NOTIFY не придёт
+                if self.gap:
+                    wait = settings.ORDER_EVENTS_GAP_TIMEOUT
+                else:
+                    wait = timeout
+                try:
+                    await asyncio.wait_for(self.wakeup.wait(), wait)
+                except asyncio.TimeoutError:
+                    pass
+                self.wakeup.clear()
+                if not self.subscribers:
+                    break
+                await self.dispatch()
+        finally:
+            if listener:
+                listener.stop()
+
+    async def dispatch(self):
+        """
+        Рассылает подписчикам события журнала после last_id по порядку id.
+        Id события выдаётся до фиксации его вставки, поэтому событие
+        с меньшим id может появиться в журнале позже большего. На пропуске
+        в нумерации рассылка останавливается, пока пропущенное событие
+        не появится или не пройдёт ORDER_EVENTS_GAP_TIMEOUT секунд
+        (id откатанной вставки): иначе оно не дошло бы ни до подписчиков,
+        ни до клиентов, возобновляющих ленту по Last-Event-ID.
+        """
+        while True:
+            events = [
+                event
+                async for event in OrderEvent.objects.filter(
+                    id__gt=self.last_id
+                )[:EVENTS_BATCH_SIZE]
+            ]
+            for event in events:
+                if event.id != self.last_id + 1 and not self.skip_gap():
+                    return
+                self.gap = None
+                self.last_id = event.id
+                for queue in list(self.subscribers):
+                    self.put(queue, event)
+            if len(events) < EVENTS_BATCH_SIZE:
+                return
+
+    def skip_gap(self) -> bool:
+        """Истекло ли ожидание пропущенных событий после last_id"""
+        now = time.monotonic()
+        if self.gap is None or self.gap[0] != self.last_id:
+            self.gap = (self.last_id, now)
+        return now - self.gap[1] >= settings.ORDER_EVENTS_GAP_TIMEOUT
+
+    def put(self, queue: asyncio.Queue, event: OrderEvent):
+        """
+        Отставший клиент с заполненной очередью отключается: после
+        переподключения он получит пропущенные события по Last-Event-ID
+        """
+        try:
+            queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.unsubscribe(queue)
+            while not queue.empty():
+                queue.get_nowait()
+            queue.put_nowait(None)
+
+
+_hubs: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+
+
+def get_hub() -> OrderEventHub:
+    """Хаб событий текущего цикла событий процесса"""
+    loop = asyncio.get_running_loop()
+    if loop not in _hubs:
+        _hubs[loop] = OrderEventHub()
+    return _hubs[loop]
+
+
+def format_event(event: OrderEvent) -> str:
+    """Событие в формате Server-Sent Events"""
+    data = json.dumps(event.to_dict(), ensure_ascii=False)
+    return f"id: {event.id}\nevent: {event.kind}\ndata: {data}\n\n"
+
+
+async def stream_order_events(
+    last_event_id: int | None = None,
+) -> AsyncIterator[str]:
+    """
+    Поток событий заказов. При переданном last_event_id сначала выводятся
+    пропущенные события из журнала, затем новые события из хаба.
+    """
+    hub = get_hub()
+    queue = await hub.subscribe()
+    sent_id = hub.last_id
+    try:
+        yield f"retry: {RECONNECT_DELAY}\n\n"
+        if last_event_id is not None:
+            missed = OrderEvent.objects.filter(
+                id__gt=last_event_id, id__lte=sent_id
+            )
+            async for event in missed.aiterator(chunk_size=EVENTS_BATCH_SIZE):
+                yield format_event(event)
+        while True:
+            try:
+                event = await asyncio.wait_for(
+                    queue.get(), settings.ORDER_EVENTS_HEARTBEAT
+                )
+            except asyncio.TimeoutError:
+                yield ": ping\n\n"
+                continue
+            if event is None:
+                return
+            if event.id > sent_id:
+                sent_id = event.id
+                yield format_event(event)
+    finally:
+        hub.unsubscribe(queue)
@@ -0,0 +1,143 @@
+import csv
+import json
+from collections.abc import Iterable, Iterator
+from datetime import date, timedelta
+from itertools import islice
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+from django.db.models import F
+
+from orders.models import Order, OrderItem
+from orders.utils import get_day_bounds
+
+# Количество заказов, загружаемых и выводимых за один шаг выгрузки
+EXPORT_CHUNK_SIZE = 2000
+
+ORDER_FIELDS = (
+    "id",
+    "table_number",
+    "status",
+    "created",
+    "updated",
+    "paid_at",
+    "total_price",
+    "item_count",
+)
+ITEM_FIELDS = ("dish_id", "dish_name", "quantity", "price")
+
+
+class ExportFormat(models.TextChoices):
+    """Формат выгрузки заказов"""
+
+    CSV = "csv", "CSV, строка на позицию заказа"
+    NDJSON = "ndjson", "NDJSON, строка на заказ"
+
+
+EXPORT_CONTENT_TYPES = {
+    ExportFormat.CSV: "text/csv; charset=utf-8",
+    ExportFormat.NDJSON: "application/x-ndjson",
+}
+
+
+def get_export_queryset(
+    date_from: date | None = None,
+    date_to: date | None = None,
+    status: str | None = None,
+) -> models.QuerySet:
+    """
+    Заказы, созданные в рабочие дни с date_from по date_to включительно,
+    в порядке id
+    """
+    queryset = Order.objects.order_by("pk")
+    if date_from:
+        start, _ = get_day_bounds(date_from, date_from)
+        queryset = queryset.filter(created__gte=start)
+    if date_to:
+        _, end = get_day_bounds(date_to, date_to + timedelta(days=1))
+        queryset = queryset.filter(created__lt=end)
+    if status:
+        queryset = queryset.filter(status=status)
+    return queryset
+
+
+def iter_order_batches(
+    queryset: models.QuerySet, chunk_size: int = EXPORT_CHUNK_SIZE
+) -> Iterator[list[dict]]:
+    """
+    Заказы порциями по chunk_size вместе с позициями. Заказы читаются
+    одним курсором iterator(), позиции каждой порции загружаются одним
+    запросом, поэтому память не зависит от размера выгрузки.
+    """
+    orders = queryset.values(*ORDER_FIELDS).iterator(chunk_size=chunk_size)
+    while batch := list(islice(orders, chunk_size)):
+        by_id = {order["id"]: order for order in batch}
+        for order in batch:
+            order["items"] = []
+        items = (
+            OrderItem.objects.filter(order_id__in=by_id)
+            .order_by("order_id", "pk")
+            .values("order_id", "dish_id", "quantity", "price")
+            .annotate(dish_name=F("dish__name"))
+        )
+        for item in items:
+            by_id[item["order_id"]]["items"].append(
+                {field: item[field] for field in ITEM_FIELDS}
+            )
+        yield batch
+
+
+def write_ndjson(batches: Iterable[list[dict]]) -> Iterator[str]:
+    """Строка JSON на заказ с вложенными позициями"""
+    for batch in batches:
+        yield "".join(
+            json.dumps(order, cls=DjangoJSONEncoder, ensure_ascii=False)
+            + "\n"
+            for order in batch
+        )
+
+
+class Echo:
+    """Псевдофайл для csv.writer: запись возвращает строку"""
+
+    def write(self, value: str) -> str:
+        return value
+
+
+def write_csv(batches: Iterable[list[dict]]) -> Iterator[str]:
+    """
+    Строка CSV на позицию заказа с полями заказа; заказ без позиций
+    выводится одной строкой с пустыми полями позиции
+    """
+    writer = csv.writer(Echo())
+    yield writer.writerow(
+        [*ORDER_FIELDS, *(f"item_{field}" for field in ITEM_FIELDS)]
+    )
+    for batch in batches:
+        yield "".join(
+            writer.writerow(
+                [
+                    *(order[field] for field in ORDER_FIELDS),
+                    *(item.get(field) for field in ITEM_FIELDS),
+                ]
+            )
+            for order in batch
+            for item in order["items"] or [{}]
+        )
+
+
+EXPORT_WRITERS = {
+    ExportFormat.CSV: write_csv,
+    ExportFormat.NDJSON: write_ndjson,
+}
+
+
+def export_orders(
+    export_format: str,
+    queryset: models.QuerySet,
+    chunk_size: int = EXPORT_CHUNK_SIZE,
+) -> Iterator[str]:
+    """Выгрузка заказов частями по порции заказов"""
+    return EXPORT_WRITERS[export_format](
+        iter_order_batches(queryset, chunk_size)
+    )
@@ -1,6 +1,8 @@
 from django import forms
-from django.forms import inlineformset_factory
+from django.core.exceptions import ValidationError
+from django.forms import BaseInlineFormSet, inlineformset_factory
 
+from menu.cache import get_active_dishes
 from menu.models import Dish
 from orders.models import Order, OrderItem
 
@@ -21,22 +23,80 @@ class OrderForm(forms.ModelForm):
         fields = ("table_number",)
 
 
+class DishChoiceField(forms.ModelChoiceField):
+    """
+    Выбор блюда из загруженных активных блюд: варианты выбора
+    и проверка значения не обращаются к БД
+    """
+
+    def set_dishes(self, dishes: dict[int, Dish]):
+        self.dishes = dishes
+        self.choices = [
+            ("", self.empty_label),
+            *((pk, str(dish)) for pk, dish in dishes.items()),
+        ]
+
+    def to_python(self, value):
+        if value in self.empty_values:
+            return None
+        try:
+            return self.dishes[int(value)]
+        except (KeyError, TypeError, ValueError):
+            raise ValidationError(
+                self.error_messages["invalid_choice"],
+                code="invalid_choice",
+                params={"value": value},
+            )
+
+
 class OrderItemForm(forms.ModelForm):
     """Форма позиций заказа"""
 
     class Meta:
         model = OrderItem
         fields = ("dish", "quantity")
+        field_classes = {"dish": DishChoiceField}
+
+    def __init__(self, *args, dishes: dict[int, Dish] | None = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if dishes is None:
+            dishes = get_active_dishes()
+        self.fields["dish"].set_dishes(dishes)
+
+    def validate_unique(self):
+        """
+        Позиции с одинаковым блюдом объединяются при сохранении,
+        поэтому уникальность пары заказ-блюдо не проверяется.
+        """
+
+
+class BaseOrderItemFormSet(BaseInlineFormSet):
+    """
+    Formset позиций заказа с объединением одинаковых блюд. Все формы
+    используют один список активных блюд из кэша меню.
+    """
 
     def __init__(self, *args, **kwargs):
+        self.dishes = get_active_dishes()
         super().__init__(*args, **kwargs)
-        self.fields["dish"].queryset = Dish.objects.filter(is_active=True)
+
+    def get_form_kwargs(self, index):
+        kwargs = super().get_form_kwargs(index)
+        kwargs["dishes"] = self.dishes
+        return kwargs
+
+    def validate_unique(self):
+        """
+        Повторяющиеся блюда в разных формах не считаются ошибкой:
+        они объединяются в одну позицию при сохранении.
+        """
 
 
 OrderItemFormSet = inlineformset_factory(
     Order,
     OrderItem,
     OrderItemForm,
+    formset=BaseOrderItemFormSet,
     fields=("dish", "quantity"),
     extra=4,
     can_delete=True,
@@ -0,0 +1,294 @@
+import bisect
+import csv
+import io
+import random
+from collections.abc import Iterator
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from functools import cache
+from itertools import accumulate
+from statistics import NormalDist
+
+import django
+from django.db import connections, router, transaction
+from django.db.models import Model
+
+from orders.models import Order, OrderItem
+from orders.utils import get_cafe_timezone
+
+# Количество заказов, создаваемых одной транзакцией
+LOAD_CHUNK_SIZE = 10000
+# Количество заказов с общим генератором случайных чисел. Не зависит
+# от размера порции, поэтому порции любого размера дают те же данные
+RNG_BLOCK_SIZE = 1000
+
+# Относительная загрузка по дням недели, с понедельника
+WEEKDAY_WEIGHTS = (0.8, 0.85, 0.9, 1.0, 1.3, 1.4, 1.1)
+# Часы пик в часах от полуночи: (среднее, разброс, доля заказов)
+PEAK_HOURS = ((9.0, 0.7, 0.15), (13.0, 1.0, 0.45), (19.5, 1.5, 0.4))
+OPENING_HOURS = (8.0, 23.5)
+# Количество позиций в заказе: относительная частота для 1, 2, 3, ...
+ITEM_COUNT_WEIGHTS = (25, 25, 18, 12, 8, 5, 4, 3)
+QUANTITY_WEIGHTS = (80, 15, 5)
+# Время от создания до оплаты, минут: логнормальное распределение
+# с медианой около получаса
+PAYMENT_DELAY = (3.4, 0.5)
+# Статусы прошедших заказов: почти все оплачены
+STATUS_WEIGHTS = {
+    Order.Status.PAID: 95,
+    Order.Status.READY: 2,
+    Order.Status.PENDING: 3,
+}
+
+
+@dataclass(frozen=True)
+class LoadPlan:
+    """
+    Параметры генерации. Заказы пронумерованы по порядку времени
+    создания: заказ с номером n получает id start_id + n. Данные зависят
+    только от зерна, но не от размера порций, числа процессов и порядка
+    их работы.
+    """
+
+    seed: int
+    orders: int
+    days: list[tuple[date, int]]
+    dishes: list[tuple[int, Decimal]]
+    tables: int
+    start_id: int
+
+    @classmethod
+    def build(
+        cls,
+        seed: int,
+        orders: int,
+        days: int,
+        end_date: date,
+        dishes: list[tuple[int, Decimal]],
+        tables: int,
+        start_id: int,
+    ) -> "LoadPlan":
+        """
+        Распределяет заказы по дням days дней до end_date включительно
+        пропорционально загрузке дня недели
+        """
+        dates = [end_date - timedelta(days=n) for n in reversed(range(days))]
+        weights = [WEEKDAY_WEIGHTS[day.weekday()] for day in dates]
+        total = sum(weights)
+        counts = [int(orders * weight / total) for weight in weights]
+        # Остаток распределяется по дням с наибольшей дробной частью
+        remainders = sorted(
+            range(days),
+            key=lambda i: orders * weights[i] / total - counts[i],
+            reverse=True,
+        )
+        for i in remainders[: orders - sum(counts)]:
+            counts[i] += 1
+        # Популярность блюд не должна зависеть от их id
+        dishes = list(dishes)
+        get_rng(seed, "dishes").shuffle(dishes)
+        return cls(
+            seed, orders, list(zip(dates, counts)), dishes, tables, start_id
+        )
+
+    def chunks(self, chunk_size: int) -> Iterator[tuple[int, int]]:
+        """Номер первого заказа и размер каждой порции"""
+        for start in range(0, self.orders, chunk_size):
+            yield start, min(chunk_size, self.orders - start)
+
+
+def get_rng(*parts) -> random.Random:
+    """Генератор случайных чисел, определяемый зерном и частями ключа"""
+    return random.Random(":".join(map(str, parts)))
+
+
+@cache
+def get_time_of_day_cdf() -> list[float]:
+    """
+    Функция распределения времени создания заказа по минутам от открытия
+    кафе: смесь нормальных распределений часов пик, усечённая часами
+    работы
+    """
+    opening, closing = OPENING_HOURS
+    peaks = [
+        (NormalDist(mean, spread), share)
+        for mean, spread, share in PEAK_HOURS
+    ]
+    values = [
+        sum(share * peak.cdf(opening + minute / 60) for peak, share in peaks)
+        for minute in range(int((closing - opening) * 60) + 1)
+    ]
+    low, high = values[0], values[-1]
+    return [(value - low) / (high - low) for value in values]
+
+
+def get_created(day: date, quantile: float) -> datetime:
+    """Момент создания заказа дня по квантилю распределения времени"""
+    cdf = get_time_of_day_cdf()
+    minute = max(1, bisect.bisect_left(cdf, quantile))
+    low, high = cdf[minute - 1], cdf[minute]
+    minutes = minute - 1 + (quantile - low) / (high - low or 1)
+    start = datetime.combine(day, time(), get_cafe_timezone())
+    return start + timedelta(hours=OPENING_HOURS[0], minutes=minutes)
+
+
+ORDER_COLUMNS = (
+    "id",
+    "table_number",
+    "status",
+    "created",
+    "updated",
+    "paid_at",
+    "total_price",
+    "item_count",
+)
+ITEM_COLUMNS = ("order", "dish", "quantity", "price")
+
+
+def get_cum_weights(count: int, exponent: float) -> list[float]:
+    """
+    Накопленные веса популярности по закону Ципфа: первые элементы
+    популярнее
+    """
+    return list(accumulate(1 / rank**exponent for rank in range(1, count + 1)))
+
+
+def build_chunk(
+    plan: LoadPlan, start: int, size: int
+) -> tuple[list[tuple], list[tuple]]:
+    """
+    Строки заказов с номерами start..start+size-1 и их позиций
+    в порядке ORDER_COLUMNS и ITEM_COLUMNS. Случайные значения заказа
+    зависят только от зерна и его номера: генератор создаётся на каждый
+    блок RNG_BLOCK_SIZE заказов, а начало блока перед первым заказом
+    порции генерируется повторно и отбрасывается.
+    """
+    offsets = list(accumulate((count for _, count in plan.days), initial=0))
+    tables = [str(table) for table in range(1, plan.tables + 1)]
+    table_weights = get_cum_weights(plan.tables, 0.5)
+    dish_indexes = range(len(plan.dishes))
+    dish_weights = get_cum_weights(len(plan.dishes), 0.8)
+    item_counts = range(1, len(ITEM_COUNT_WEIGHTS) + 1)
+    item_count_weights = list(accumulate(ITEM_COUNT_WEIGHTS))
+    quantity_weights = list(accumulate(QUANTITY_WEIGHTS))
+    statuses = list(STATUS_WEIGHTS)
+    status_weights = list(accumulate(STATUS_WEIGHTS.values()))
+
+    orders, items = [], []
+    for number in range(start - start % RNG_BLOCK_SIZE, start + size):
+        if number % RNG_BLOCK_SIZE == 0:
+            rng = get_rng(plan.seed, "block", number // RNG_BLOCK_SIZE)
+        index = bisect.bisect_right(offsets, number) - 1
+        day, count = plan.days[index]
+        # Квантили заказов дня возрастают вместе с их номерами, поэтому
+        # время создания возрастает вместе с id
+        position = number - offsets[index] + rng.random()
+        created = get_created(day, position / count)
+        status = rng.choices(statuses, cum_weights=status_weights)[0]
+        paid_at = None
+        if status == Order.Status.PAID:
+            minutes = rng.lognormvariate(*PAYMENT_DELAY)
+            paid_at = created + timedelta(minutes=minutes)
+        table = rng.choices(tables, cum_weights=table_weights)[0]
+
+        order_id = plan.start_id + number
+        item_count = min(
+            rng.choices(item_counts, cum_weights=item_count_weights)[0],
+            len(plan.dishes),
+        )
+        dishes = set()
+        while len(dishes) < item_count:
+            dishes.update(
+                rng.choices(
+                    dish_indexes,
+                    cum_weights=dish_weights,
+                    k=item_count - len(dishes),
+                )
+            )
+        total_price = Decimal(0)
+        order_items = []
+        for dish_index in sorted(dishes):
+            dish_id, price = plan.dishes[dish_index]
+            quantity = rng.choices((1, 2, 3), cum_weights=quantity_weights)[0]
+            order_items.append((order_id, dish_id, quantity, price))
+            total_price += price * quantity
+        if number < start:
+            continue
+        items.extend(order_items)
+        orders.append(
+            (
+                order_id,
+                table,
+                status,
+                created,
+                paid_at or created,
+                paid_at,
+                total_price,
+                item_count,
+            )
+        )
+    return orders, items
+
+
+def insert_rows(model: type[Model], columns: tuple[str], rows: list[tuple]):
+    """
+    Вставка строк без создания объектов моделей и сигналов. В PostgreSQL
+    строки передаются одной командой COPY, в остальных СУБД значения
+    готовятся полями модели и вставляются executemany.
+    """
+    fields = [model._meta.get_field(name) for name in columns]
+    # Обёртка соединения вместо прокси django.db.connection: обращения
+    # к прокси на каждое значение заметно замедляют подготовку строк
+    db = connections[router.db_for_write(model)]
+    table = db.ops.quote_name(model._meta.db_table)
+    names = ", ".join(db.ops.quote_name(field.column) for field in fields)
+    with db.cursor() as cursor:
+        if db.vendor == "postgresql":
+            buffer = io.StringIO()
+            csv.writer(buffer).writerows(rows)
+            buffer.seek(0)
+            cursor.copy_expert(
+                f"COPY {table} ({names}) FROM STDIN WITH (FORMAT csv)", buffer
+            )
+            return
+        # Преобразования требуют только значения времени и сумм
+        prepared = [
+            i
+            for i, field in enumerate(fields)
+            if field.get_internal_type() in ("DateTimeField", "DecimalField")
+        ]
+        params = []
+        for row in rows:
+            row = list(row)
+            for i in prepared:
+                row[i] = fields[i].get_db_prep_save(row[i], db)
+            params.append(row)
+        placeholders = ", ".join(["%s"] * len(fields))
+        cursor.executemany(
+            f"INSERT INTO {table} ({names}) VALUES ({placeholders})", params
+        )
+
+
+def write_chunk(plan: LoadPlan, start: int, size: int) -> tuple[int, int]:
+    """
+    Создаёт порцию заказов с позициями в одной транзакции.
+    Возвращает количество созданных заказов и позиций.
+    """
+    orders, items = build_chunk(plan, start, size)
+    with transaction.atomic():
+        insert_rows(Order, ORDER_COLUMNS, orders)
+        insert_rows(OrderItem, ITEM_COLUMNS, items)
+    return len(orders), len(items)
+
+
+def init_worker():
+    """
+    Инициализация процесса генерации: при запуске процессов через spawn
+    Django настраивается заново, соединения с БД создаются в процессе
+    """
+    django.setup()
+
+
+def run_chunk(args: tuple[LoadPlan, int, int]) -> tuple[int, int]:
+    return write_chunk(*args)
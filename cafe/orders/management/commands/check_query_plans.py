@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from orders.models import Order
+from orders.query_plans import explain_queries, get_hot_queries
+
+
+class Command(BaseCommand):
+    help = (
+        "Проверяет планы основных запросов к заказам: завершается ошибкой, "
+        "если запрос выполняется полным просмотром таблицы"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--analyze",
+            action="store_true",
+            help="Обновить статистику таблицы заказов перед проверкой",
+        )
+
+    def handle(self, *args, **options):
+        if options["analyze"]:
+            with connection.cursor() as cursor:
+                cursor.execute(f"ANALYZE {Order._meta.db_table}")
+        failed = []
+        for query_plan in explain_queries(get_hot_queries()):
+            if query_plan.sequential_scan:
+                failed.append(query_plan.name)
+            if options["verbosity"] > 1 or query_plan.sequential_scan:
+                self.stdout.write(f"{query_plan.name}:\n{query_plan.plan}\n")
+        if failed:
+            raise CommandError(
+                f"Полный просмотр таблицы в запросах: {', '.join(failed)}"
+            )
+        self.stdout.write(
+            self.style.SUCCESS("Все запросы к заказам используют индексы")
+        )
@@ -0,0 +1,70 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand
+
+from orders.export import (
+    EXPORT_CHUNK_SIZE,
+    ExportFormat,
+    export_orders,
+    get_export_queryset,
+)
+from orders.models import Order
+
+
+class Command(BaseCommand):
+    help = (
+        "Выгружает историю заказов с позициями в CSV или NDJSON "
+        "(в файл или в стандартный вывод)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--format",
+            dest="export_format",
+            choices=ExportFormat.values,
+            default=ExportFormat.CSV,
+            help="Формат выгрузки (по умолчанию csv)",
+        )
+        parser.add_argument(
+            "--from",
+            dest="date_from",
+            type=date.fromisoformat,
+            help="Первый рабочий день создания заказов (ГГГГ-ММ-ДД)",
+        )
+        parser.add_argument(
+            "--to",
+            dest="date_to",
+            type=date.fromisoformat,
+            help="Последний рабочий день создания заказов (ГГГГ-ММ-ДД)",
+        )
+        parser.add_argument(
+            "--status", choices=Order.Status.values, help="Статус заказов"
+        )
+        parser.add_argument(
+            "--output", "-o", help="Файл выгрузки (по умолчанию stdout)"
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=EXPORT_CHUNK_SIZE,
+            help="Количество заказов, загружаемых за один шаг",
+        )
+
+    def handle(self, *args, **options):
+        queryset = get_export_queryset(
+            options["date_from"], options["date_to"], options["status"]
+        )
+        chunks = export_orders(
+            options["export_format"], queryset, options["chunk_size"]
+        )
+        if not options["output"]:
+            for chunk in chunks:
+                self.stdout.write(chunk, ending="")
+            return
+        with open(
+            options["output"], "w", encoding="utf-8", newline=""
+        ) as file:
+            file.writelines(chunks)
+        self.stdout.write(
+            self.style.SUCCESS(f"Заказы выгружены в {options['output']}")
+        )
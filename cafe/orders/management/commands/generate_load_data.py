@@ -0,0 +1,139 @@
+import os
+import time
+from datetime import date, timedelta
+from multiprocessing import Pool
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import connection, connections
+from django.db.models import Max
+from django.utils import timezone
+
+from menu.models import Dish
+from orders.load_data import (
+    LOAD_CHUNK_SIZE,
+    LoadPlan,
+    init_worker,
+    run_chunk,
+    write_chunk,
+)
+from orders.models import Order
+from orders.utils import get_business_date
+
+
+class Command(BaseCommand):
+    help = (
+        "Создаёт синтетические заказы с позициями по блюдам меню "
+        "для нагрузочного тестирования"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--orders", type=int, required=True, help="Количество заказов"
+        )
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=30,
+            help="Количество рабочих дней истории (по умолчанию 30)",
+        )
+        parser.add_argument(
+            "--end-date",
+            type=date.fromisoformat,
+            help="Последний день истории (по умолчанию вчерашний)",
+        )
+        parser.add_argument(
+            "--seed", type=int, default=0, help="Зерно генерации"
+        )
+        parser.add_argument(
+            "--tables",
+            type=int,
+            default=20,
+            help="Количество столиков (по умолчанию 20)",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=os.cpu_count(),
+            help="Количество процессов (для SQLite всегда 1)",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=LOAD_CHUNK_SIZE,
+            help="Количество заказов в одной транзакции",
+        )
+
+    def handle(self, *args, **options):
+        self.verbosity = options["verbosity"]
+        if options["orders"] < 1 or options["days"] < 1:
+            raise CommandError("Количество заказов и дней должно быть > 0")
+        dishes = list(
+            Dish.objects.filter(is_active=True)
+            .order_by("pk")
+            .values_list("pk", "price")
+        )
+        if not dishes:
+            raise CommandError(
+                "В меню нет активных блюд, загрузите fixtures/dishes.json"
+            )
+        end_date = options["end_date"] or get_business_date(
+            timezone.now()
+        ) - timedelta(days=1)
+        start_id = (Order.objects.aggregate(last=Max("pk"))["last"] or 0) + 1
+        plan = LoadPlan.build(
+            options["seed"],
+            options["orders"],
+            options["days"],
+            end_date,
+            dishes,
+            options["tables"],
+            start_id,
+        )
+        chunks = [
+            (plan, start, size)
+            for start, size in plan.chunks(options["chunk_size"])
+        ]
+        # SQLite допускает только одного пишущего
+        workers = 1 if connection.vendor == "sqlite" else options["workers"]
+
+        started = time.perf_counter()
+        if workers > 1:
+            # Дочерние процессы не должны наследовать открытые соединения
+            connections.close_all()
+            with Pool(workers, initializer=init_worker) as pool:
+                totals = self.report(pool.imap_unordered(run_chunk, chunks))
+        else:
+            totals = self.report(write_chunk(*chunk) for chunk in chunks)
+        self.reset_sequences()
+        call_command(
+            "rebuild_revenue",
+            date_from=plan.days[0][0],
+            date_to=end_date + timedelta(days=1),
+            stdout=self.stdout,
+        )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Создано заказов: {totals[0]}, позиций: {totals[1]} "
+                f"за {time.perf_counter() - started:.1f} с"
+            )
+        )
+
+    def report(self, results) -> tuple[int, int]:
+        """Суммирует результаты порций и выводит прогресс"""
+        orders = items = 0
+        for chunk_orders, chunk_items in results:
+            orders += chunk_orders
+            items += chunk_items
+            if self.verbosity > 1:
+                self.stdout.write(f"Создано заказов: {orders}")
+        return orders, items
+
+    def reset_sequences(self):
+        """Заказы созданы с явными id: счётчик id переносится за них"""
+        sql = connection.ops.sequence_reset_sql(no_style(), [Order])
+        if sql:
+            with connection.cursor() as cursor:
+                for statement in sql:
+                    cursor.execute(statement)
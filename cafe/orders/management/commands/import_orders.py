@@ -0,0 +1,80 @@
+import sys
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from orders.bulk_import import (
+    IMPORT_CHUNK_SIZE,
+    IMPORT_READERS,
+    import_orders,
+)
+from orders.export import ExportFormat
+
+
+class Command(BaseCommand):
+    help = (
+        "Импортирует заказы с позициями из NDJSON или CSV в формате "
+        "export_orders порциями в отдельных транзакциях"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "path", help="Файл импорта или «-» для стандартного ввода"
+        )
+        parser.add_argument(
+            "--format",
+            dest="import_format",
+            choices=ExportFormat.values,
+            help="Формат файла (по умолчанию по расширению файла)",
+        )
+        parser.add_argument(
+            "--offset",
+            type=int,
+            default=0,
+            help="Количество уже импортированных заказов, которые нужно "
+            "пропустить при продолжении импорта",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=IMPORT_CHUNK_SIZE,
+            help="Количество заказов в одной транзакции",
+        )
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        import_format = options["import_format"]
+        if import_format is None:
+            import_format = Path(path).suffix.lstrip(".").lower()
+            if import_format not in ExportFormat.values:
+                raise CommandError(
+                    "Не удалось определить формат файла, укажите --format"
+                )
+        if path == "-":
+            offset = self.run_import(sys.stdin, import_format, options)
+        else:
+            with open(path, encoding="utf-8", newline="") as file:
+                offset = self.run_import(file, import_format, options)
+        self.stdout.write(
+            self.style.SUCCESS(f"Импорт завершён, записей: {offset}")
+        )
+
+    def run_import(self, file, import_format: str, options: dict) -> int:
+        """
+        Импорт из открытого файла. При ошибке сообщает, с какого offset
+        продолжить: все порции до него уже записаны.
+        """
+        offset = options["offset"]
+        records = IMPORT_READERS[import_format](file)
+        try:
+            for offset in import_orders(
+                records, offset, options["chunk_size"]
+            ):
+                if options["verbosity"] > 1:
+                    self.stdout.write(f"Импортировано записей: {offset}")
+        except Exception as error:
+            raise CommandError(
+                f"{error}\nЗаписи до {offset} импортированы, продолжить "
+                f"импорт можно с параметром --offset {offset}"
+            ) from error
+        return offset
@@ -0,0 +1,25 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from orders.models import OrderEvent
+
+
+class Command(BaseCommand):
+    help = "Удаляет из журнала события заказов старше заданного срока"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--hours",
+            type=int,
+            default=24,
+            help="Срок хранения событий, часов (по умолчанию 24)",
+        )
+
+    def handle(self, *args, **options):
+        before = timezone.now() - timedelta(hours=options["hours"])
+        deleted, _ = OrderEvent.objects.filter(created__lt=before).delete()
+        self.stdout.write(
+            self.style.SUCCESS(f"Удалено событий заказов: {deleted}")
+        )
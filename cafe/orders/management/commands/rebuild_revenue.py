@@ -0,0 +1,64 @@
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, Sum
+
+from orders.models import Order, RevenueDaily, revenue_changed
+from orders.utils import build_business_date_expression, get_day_bounds
+
+
+class Command(BaseCommand):
+    help = (
+        "Пересоздаёт дневные итоги выручки по оплаченным заказам "
+        "(целиком или за диапазон рабочих дней)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--from",
+            dest="date_from",
+            type=date.fromisoformat,
+            help="Первый рабочий день диапазона (ГГГГ-ММ-ДД)",
+        )
+        parser.add_argument(
+            "--to",
+            dest="date_to",
+            type=date.fromisoformat,
+            help="Последний рабочий день диапазона (ГГГГ-ММ-ДД)",
+        )
+
+    @transaction.atomic
+    def handle(self, *args, **options):
+        orders = Order.objects.filter(
+            status=Order.Status.PAID, paid_at__isnull=False
+        )
+        rollups = RevenueDaily.objects.all()
+        date_from, date_to = options["date_from"], options["date_to"]
+        if date_from:
+            start, _ = get_day_bounds(date_from, date_from)
+            orders = orders.filter(paid_at__gte=start)
+            rollups = rollups.filter(date__gte=date_from)
+        if date_to:
+            _, end = get_day_bounds(date_to, date_to + timedelta(days=1))
+            orders = orders.filter(paid_at__lt=end)
+            rollups = rollups.filter(date__lte=date_to)
+        days = (
+            orders.annotate(day=build_business_date_expression("paid_at"))
+            .values("day")
+            .annotate(total=Sum("total_price"), order_count=Count("pk"))
+            .order_by("day")
+        )
+        rollups.delete()
+        created = RevenueDaily.objects.bulk_create(
+            RevenueDaily(
+                date=day["day"],
+                total=day["total"],
+                order_count=day["order_count"],
+            )
+            for day in days
+        )
+        revenue_changed.send(sender=RevenueDaily)
+        self.stdout.write(
+            self.style.SUCCESS(f"Пересчитана выручка за {len(created)} дней")
+        )
@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import F
+
+from orders.models import Order
+
+
+class Command(BaseCommand):
+    help = "Пересчитывает сохранённые общую сумму и количество позиций заказов"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--check",
+            action="store_true",
+            help="Только проверить итоги, не изменяя данные",
+        )
+
+    def handle(self, *args, **options):
+        subqueries = Order.build_totals_subqueries()
+        mismatched = (
+            Order.objects.annotate(
+                **{f"actual_{f}": expr for f, expr in subqueries.items()}
+            )
+            .exclude(
+                **{f: F(f"actual_{f}") for f in Order.TOTAL_FIELDS}
+            )
+            .values_list("pk", flat=True)
+        )
+        if options["check"]:
+            ids = list(mismatched)
+            if ids:
+                raise CommandError(
+                    f"Итоги не совпадают у {len(ids)} заказов: "
+                    f"{', '.join(map(str, ids[:20]))}"
+                )
+            self.stdout.write(self.style.SUCCESS("Итоги всех заказов верны"))
+            return
+        updated = Order.objects.update(**subqueries)
+        self.stdout.write(
+            self.style.SUCCESS(f"Пересчитаны итоги {updated} заказов")
+        )
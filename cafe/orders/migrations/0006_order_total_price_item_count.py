@@ -0,0 +1,56 @@
+# Generated by Django 5.1.5 on 2026-10-18 08:25
+
+from django.db import migrations, models
+from django.db.models import (
+    Count,
+    DecimalField,
+    F,
+    IntegerField,
+    OuterRef,
+    Subquery,
+    Sum,
+)
+from django.db.models.functions import Coalesce
+
+
+def fill_order_totals(apps, schema_editor):
+    Order = apps.get_model('orders', 'Order')
+    OrderItem = apps.get_model('orders', 'OrderItem')
+    items = OrderItem.objects.filter(order=OuterRef('pk')).values('order')
+    Order.objects.update(
+        total_price=Coalesce(
+            Subquery(
+                items.annotate(
+                    value=Sum(F('price') * F('quantity'))
+                ).values('value')
+            ),
+            0,
+            output_field=DecimalField(),
+        ),
+        item_count=Coalesce(
+            Subquery(items.annotate(value=Count('pk')).values('value')),
+            0,
+            output_field=IntegerField(),
+        ),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0005_alter_orderitem_quantity'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='order',
+            name='item_count',
+            field=models.PositiveIntegerField(default=0, verbose_name='количество позиций'),
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='total_price',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=10, verbose_name='общая стоимость'),
+        ),
+        migrations.RunPython(fill_order_totals, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,30 @@
+from django.db import migrations
+from django.db.models import Count, Min, Sum
+
+
+def merge_duplicate_items(apps, schema_editor):
+    OrderItem = apps.get_model('orders', 'OrderItem')
+    duplicates = (
+        OrderItem.objects.filter(dish__isnull=False)
+        .values('order', 'dish')
+        .annotate(count=Count('pk'), keep=Min('pk'), quantity=Sum('quantity'))
+        .filter(count__gt=1)
+    )
+    for duplicate in duplicates:
+        OrderItem.objects.filter(pk=duplicate['keep']).update(
+            quantity=duplicate['quantity']
+        )
+        OrderItem.objects.filter(
+            order=duplicate['order'], dish=duplicate['dish']
+        ).exclude(pk=duplicate['keep']).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0006_order_total_price_item_count'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicate_items, migrations.RunPython.noop),
+    ]
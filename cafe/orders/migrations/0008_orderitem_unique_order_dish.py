@@ -0,0 +1,18 @@
+# Generated by Django 5.1.5 on 2026-10-18 08:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('menu', '0001_initial'),
+        ('orders', '0007_merge_duplicate_order_items'),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name='orderitem',
+            constraint=models.UniqueConstraint(fields=('order', 'dish'), name='unique_order_dish'),
+        ),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 5.1.5 on 2026-10-18 08:31
+
+from django.db import migrations, models
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncDate
+
+
+def fill_revenue_daily(apps, schema_editor):
+    Order = apps.get_model('orders', 'Order')
+    RevenueDaily = apps.get_model('orders', 'RevenueDaily')
+    days = (
+        Order.objects.filter(status='PAID')
+        .annotate(day=TruncDate('updated'))
+        .values('day')
+        .annotate(total=Sum('total_price'), order_count=Count('pk'))
+        .order_by('day')
+    )
+    RevenueDaily.objects.bulk_create(
+        RevenueDaily(
+            date=day['day'], total=day['total'], order_count=day['order_count']
+        )
+        for day in days
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0008_orderitem_unique_order_dish'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RevenueDaily',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(unique=True, verbose_name='дата')),
+                ('total', models.DecimalField(decimal_places=2, default=0, max_digits=12, verbose_name='выручка')),
+                ('order_count', models.IntegerField(default=0, verbose_name='количество заказов')),
+            ],
+            options={
+                'verbose_name': 'Выручка за день',
+                'verbose_name_plural': 'Выручка по дням',
+                'ordering': ['-date'],
+            },
+        ),
+        migrations.RunPython(fill_revenue_daily, migrations.RunPython.noop),
+    ]
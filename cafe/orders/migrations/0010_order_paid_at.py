@@ -0,0 +1,25 @@
+# Generated by Django 5.1.5 on 2026-10-18 08:32
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def fill_paid_at(apps, schema_editor):
+    Order = apps.get_model('orders', 'Order')
+    Order.objects.filter(status='PAID').update(paid_at=F('updated'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0009_revenuedaily'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='order',
+            name='paid_at',
+            field=models.DateTimeField(blank=True, db_index=True, editable=False, null=True, verbose_name='время и дата оплаты'),
+        ),
+        migrations.RunPython(fill_paid_at, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 5.1.5 on 2026-10-18 08:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0010_order_paid_at'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='order',
+            name='paid_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True, verbose_name='время и дата оплаты'),
+        ),
+        migrations.AlterField(
+            model_name='order',
+            name='status',
+            field=models.CharField(choices=[('PENDING', 'В ожидании'), ('READY', 'Готово'), ('PAID', 'Оплачено')], default='PENDING', max_length=12, verbose_name='статус'),
+        ),
+        migrations.AlterField(
+            model_name='order',
+            name='table_number',
+            field=models.CharField(max_length=10, verbose_name='номер стола'),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['-created', '-id'], name='order_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['status', '-created', '-id'], name='order_status_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['table_number', 'status', '-created', '-id'], name='order_table_status_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(condition=models.Q(('status', 'PAID')), fields=['paid_at'], name='order_paid_at_idx'),
+        ),
+    ]
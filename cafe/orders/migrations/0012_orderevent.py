@@ -0,0 +1,29 @@
+# Generated by Django 5.1.5 on 2026-10-18 08:48
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0011_order_query_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OrderEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('created', 'Создан'), ('updated', 'Изменён'), ('status', 'Смена статуса'), ('items', 'Изменение позиций'), ('deleted', 'Удалён')], max_length=10, verbose_name='вид')),
+                ('status', models.CharField(blank=True, max_length=12, verbose_name='статус')),
+                ('created', models.DateTimeField(auto_now_add=True, db_index=True, verbose_name='время и дата события')),
+                ('order', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='orders.order', verbose_name='заказ')),
+            ],
+            options={
+                'verbose_name': 'Событие заказа',
+                'verbose_name_plural': 'События заказов',
+                'ordering': ['id'],
+            },
+        ),
+    ]
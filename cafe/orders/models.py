@@ -1,7 +1,50 @@
+from collections import defaultdict
+from collections.abc import Iterable
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
 from django.core.validators import MinValueValidator
-from django.db import models
+from django.db import IntegrityError, connection, models, transaction
+from django.db.models import (
+    Count,
+    DecimalField,
+    F,
+    OuterRef,
+    Q,
+    Subquery,
+    Sum,
+)
+from django.db.models.functions import Coalesce, TruncHour, TruncWeek
+from django.dispatch import Signal
+from django.utils import timezone
+
+from orders.cache import aget_cached_revenue, get_cached_revenue
+
+from orders.utils import (
+    RevenueBucket,
+    RevenueShare,
+    acalculate_revenue,
+    calculate_revenue,
+    get_business_date,
+    get_cafe_timezone,
+    get_day_bounds,
+)
+
+# Отправляется при любом изменении дневных итогов выручки
+revenue_changed = Signal()
 
-from orders.utils import calculate_revenue
+
+class OrderQuerySet(models.QuerySet):
+    """QuerySet заказов"""
+
+    def paid_between(self, start: datetime, end: datetime):
+        """
+        Заказы, оплаченные в полуинтервале [start, end). Условие на само
+        поле paid_at позволяет использовать индекс по времени оплаты.
+        """
+        return self.filter(
+            status=Order.Status.PAID, paid_at__gte=start, paid_at__lt=end
+        )
 
 
 class Order(models.Model):
@@ -14,39 +57,476 @@ class Order(models.Model):
         READY = "READY", "Готово"
         PAID = "PAID", "Оплачено"
 
-    table_number = models.CharField(
-        "номер стола", max_length=10, db_index=True
-    )
+    table_number = models.CharField("номер стола", max_length=10)
     status = models.CharField(
         "статус",
         choices=Status.choices,
         default=Status.PENDING,
-        db_index=True,
         max_length=12,
     )
     created = models.DateTimeField("время и дата создания", auto_now_add=True)
     updated = models.DateTimeField("время и дата обновления", auto_now=True)
+    paid_at = models.DateTimeField(
+        "время и дата оплаты",
+        null=True,
+        blank=True,
+        editable=False,
+    )
+    total_price = models.DecimalField(
+        "общая стоимость", max_digits=10, decimal_places=2, default=0
+    )
+    item_count = models.PositiveIntegerField("количество позиций", default=0)
+
+    TOTAL_FIELDS = ("total_price", "item_count")
+
+    # Допустимые переходы статусов: исходный статус -> новые статусы
+    TRANSITIONS = {
+        Status.PENDING: (Status.READY, Status.PAID),
+        Status.READY: (Status.PENDING, Status.PAID),
+        Status.PAID: (Status.READY,),
+    }
+
+    objects = OrderQuerySet.as_manager()
 
     class Meta:
         ordering = ["-created"]
         verbose_name = "Заказ"
         verbose_name_plural = "Заказы"
+        # Индексы повторяют порядок вывода списка заказов (-created, -id)
+        # и его фильтры; одиночные индексы по статусу и столику покрываются
+        # префиксами составных индексов
+        indexes = [
+            models.Index(
+                fields=["-created", "-id"], name="order_created_idx"
+            ),
+            models.Index(
+                fields=["status", "-created", "-id"],
+                name="order_status_created_idx",
+            ),
+            models.Index(
+                fields=["table_number", "status", "-created", "-id"],
+                name="order_table_status_created_idx",
+            ),
+            models.Index(
+                fields=["paid_at"],
+                condition=Q(status="PAID"),
+                name="order_paid_at_idx",
+            ),
+        ]
 
     def __str__(self):
         return f"Order({self.id}) - {self.status}"
 
-    def get_total_price(self):
-        """Получение общей суммы заказа"""
-        return sum(i.total_price for i in self.items.all())
+    def save(self, *args, **kwargs):
+        """
+        Сохранённые итоги заказа изменяются только через update_totals,
+        поэтому при обновлении существующего заказа они не перезаписываются
+        значениями из памяти. При оплате фиксируется время оплаты и итоги
+        пересчитываются по позициям, оплата и её отмена переносятся
+        в RevenueDaily.
+        """
+        adding = self._state.adding
+        if not adding and kwargs.get("update_fields") is None:
+            kwargs["update_fields"] = [
+                f.name
+                for f in self._meta.concrete_fields
+                if not f.primary_key and f.name not in self.TOTAL_FIELDS
+            ]
+        with transaction.atomic():
+            stored = None if adding else self.get_stored_revenue_values()
+            previous = self.build_revenue_share(*stored) if stored else None
+            if not self.is_paid:
+                self.paid_at = None
+            elif previous is None:
+                self.paid_at = timezone.now()
+            else:
+                self.paid_at = stored[1]
+            super().save(*args, **kwargs)
+            if not adding and previous is None and self.is_paid:
+                self._store_totals()
+            # Вклад заказа, оплаченного и до сохранения, не меняется: время
+            # оплаты сохраняется, а сумма меняется только через
+            # update_totals (в памяти она может быть устаревшей)
+            if previous is None or not self.is_paid:
+                RevenueDaily.apply_change(previous, self.get_revenue_share())
+            if adding:
+                kind = OrderEvent.Kind.CREATED
+            elif stored is not None and stored[0] != self.status:
+                kind = OrderEvent.Kind.STATUS
+            else:
+                kind = OrderEvent.Kind.UPDATED
+            OrderEvent.record(self.pk, kind, self.status)
+
+    @classmethod
+    def can_transition(cls, source: str, target: str) -> bool:
+        """Допустим ли переход заказа из статуса source в статус target"""
+        return target in cls.TRANSITIONS.get(source, ())
+
+    @classmethod
+    def get_allowed_sources(cls, status: str) -> list[str]:
+        """Статусы, из которых заказ можно перевести в статус status"""
+        return [
+            source
+            for source, targets in cls.TRANSITIONS.items()
+            if status in targets
+        ]
+
+    @classmethod
+    def build_status_fields(cls, status: str, now: datetime) -> dict:
+        """
+        Значения полей для перевода заказов в статус status одним UPDATE:
+        время оплаты, а при оплате и пересчитанные по позициям итоги
+        """
+        fields = {"status": status, "updated": now, "paid_at": None}
+        if status == cls.Status.PAID:
+            fields["paid_at"] = now
+            fields.update(cls.build_totals_subqueries())
+        return fields
+
+    @classmethod
+    def transition(cls, pk: int, status: str) -> bool:
+        """
+        Переводит заказ в статус status условным UPDATE ... WHERE id = pk
+        AND status IN (допустимые исходные статусы) без чтения заказа.
+        Возвращает, был ли применён переход. Оплата и её отмена
+        переносятся в дневную выручку в той же транзакции.
+        """
+        now = timezone.now()
+        fields = cls.build_status_fields(status, now)
+        sources = cls.get_allowed_sources(status)
+        orders = cls.objects.filter(pk=pk)
+        if status != cls.Status.PAID:
+            # Переход между неоплаченными статусами не меняет выручку
+            unpaid = [s for s in sources if s != cls.Status.PAID]
+            if orders.filter(status__in=unpaid).update(**fields):
+                OrderEvent.record(pk, OrderEvent.Kind.STATUS, status)
+                return True
+            if cls.Status.PAID not in sources:
+                return False
+        with transaction.atomic():
+            if status == cls.Status.PAID:
+                if not orders.filter(status__in=sources).update(**fields):
+                    return False
+                total = orders.values_list("total_price", flat=True).get()
+                RevenueDaily.apply_change(
+                    None, RevenueShare(get_business_date(now), total)
+                )
+                OrderEvent.record(pk, OrderEvent.Kind.STATUS, status)
+                return True
+            # Отмена оплаты: строка блокируется, чтобы исключить
+            # из выручки сохранённую сумму заказа
+            paid = orders.filter(status=cls.Status.PAID)
+            stored = (
+                paid.select_for_update()
+                .values_list("status", "paid_at", "total_price")
+                .first()
+            )
+            if stored is None:
+                return False
+            paid.update(**fields)
+            RevenueDaily.apply_change(cls.build_revenue_share(*stored), None)
+            OrderEvent.record(pk, OrderEvent.Kind.STATUS, status)
+            return True
+
+    @property
+    def is_paid(self) -> bool:
+        return self.status == self.Status.PAID
+
+    @classmethod
+    def build_revenue_share(
+        cls, status: str, paid_at, total_price
+    ) -> RevenueShare | None:
+        """
+        Вклад заказа в выручку: только оплаченные заказы, за рабочий день
+        кафе, в который заказ был оплачен
+        """
+        if status != cls.Status.PAID:
+            return None
+        return RevenueShare(get_business_date(paid_at), total_price)
+
+    def get_revenue_share(self) -> RevenueShare | None:
+        """Вклад заказа в выручку по значениям в памяти"""
+        return self.build_revenue_share(
+            self.status, self.paid_at, self.total_price
+        )
+
+    def get_stored_revenue_values(self) -> tuple | None:
+        """
+        Сохранённые в БД статус, время оплаты и сумма заказа.
+        Строка заказа блокируется до конца транзакции.
+        """
+        return (
+            Order.objects.select_for_update()
+            .filter(pk=self.pk)
+            .values_list("status", "paid_at", "total_price")
+            .first()
+        )
+
+    @staticmethod
+    def build_totals_expressions() -> dict:
+        """Выражения для подсчёта итогов заказа по его позициям"""
+        return {
+            "total_price": Coalesce(
+                Sum(F("price") * F("quantity")),
+                0,
+                output_field=DecimalField(),
+            ),
+            "item_count": Count("pk"),
+        }
+
+    @classmethod
+    def build_totals_subqueries(cls) -> dict:
+        """
+        Подзапросы для подсчёта итогов каждого заказа в одном запросе
+        (используются для пересчёта и проверки итогов всех заказов).
+        """
+        items = OrderItem.objects.filter(order=OuterRef("pk")).values("order")
+        return {
+            field: Coalesce(
+                Subquery(items.annotate(value=expr).values("value")),
+                0,
+                output_field=expr.output_field,
+            )
+            for field, expr in cls.build_totals_expressions().items()
+        }
+
+    def _store_totals(self, totals: dict | None = None):
+        """
+        Запись итогов заказа без учёта выручки. Время обновления заказа
+        меняется вместе с итогами, так как изменились его позиции.
+        """
+        if totals is None:
+            totals = self.items.aggregate(**self.build_totals_expressions())
+        self.updated = timezone.now()
+        Order.objects.filter(pk=self.pk).update(updated=self.updated, **totals)
+        self.total_price = totals["total_price"]
+        self.item_count = totals["item_count"]
+
+    @transaction.atomic
+    def update_totals(self, totals: dict | None = None):
+        """
+        Пересчёт сохранённых общей суммы и количества позиций заказа.
+        Уже посчитанные итоги можно передать в totals. Если заказ оплачен,
+        разница суммы переносится в дневную выручку.
+        """
+        stored = self.get_stored_revenue_values()
+        previous = self.build_revenue_share(*stored) if stored else None
+        self._store_totals(totals)
+        if previous:
+            RevenueDaily.apply_change(
+                previous, previous._replace(total=self.total_price)
+            )
+        if stored:
+            OrderEvent.record(self.pk, OrderEvent.Kind.ITEMS, stored[0])
 
     @classmethod
     def get_total_revenue_for_periods(cls):
         """
         Получение общей выручки за несколько периодов
-        (всё время, сегодня, неделя, месяц).
+        (всё время, сегодня, неделя, месяц) по дневным итогам выручки.
+        Результат кэшируется до изменения выручки или начала нового дня.
+        """
+        return get_cached_revenue(
+            lambda: calculate_revenue(RevenueDaily.objects.all())
+        )
+
+    @classmethod
+    async def aget_total_revenue_for_periods(cls):
+        """Асинхронный вариант get_total_revenue_for_periods"""
+        return await aget_cached_revenue(
+            lambda: acalculate_revenue(RevenueDaily.objects.all())
+        )
+
+    @classmethod
+    def get_revenue_series(
+        cls, date_from: date, date_to: date, bucket: str
+    ) -> list[dict]:
+        """
+        Выручка и количество оплаченных заказов по интервалам bucket
+        (час, день, неделя) за рабочие дни с date_from по date_to
+        включительно. Все интервалы считаются одним запросом GROUP BY:
+        почасовая выручка по заказам в диапазоне paid_at, дневная
+        и недельная по дневным итогам выручки.
+        """
+        if bucket == RevenueBucket.HOUR:
+            start, end = get_day_bounds(
+                date_from, date_to + timedelta(days=1)
+            )
+            series = (
+                cls.objects.paid_between(start, end)
+                .annotate(
+                    bucket=TruncHour("paid_at", tzinfo=get_cafe_timezone())
+                )
+                .values("bucket")
+                .annotate(total=Sum("total_price"), order_count=Count("pk"))
+            )
+        else:
+            series = RevenueDaily.objects.filter(
+                date__range=(date_from, date_to)
+            )
+            if bucket == RevenueBucket.WEEK:
+                series = (
+                    series.annotate(bucket=TruncWeek("date"))
+                    .values("bucket")
+                    .annotate(
+                        total=Sum("total"), order_count=Sum("order_count")
+                    )
+                )
+            else:
+                series = series.annotate(bucket=F("date")).values(
+                    "bucket", "total", "order_count"
+                )
+        return list(series.order_by("bucket"))
+
+
+class RevenueDaily(models.Model):
+    """
+    Дневные итоги выручки по оплаченным заказам.
+    Обновляются при оплате, отмене оплаты, удалении оплаченного заказа
+    и изменении его позиций.
+    """
+
+    date = models.DateField("дата", unique=True)
+    total = models.DecimalField(
+        "выручка", max_digits=12, decimal_places=2, default=0
+    )
+    order_count = models.IntegerField("количество заказов", default=0)
+
+    class Meta:
+        ordering = ["-date"]
+        verbose_name = "Выручка за день"
+        verbose_name_plural = "Выручка по дням"
+
+    def __str__(self):
+        return f"{self.date}: {self.total}"
+
+    @classmethod
+    def add(cls, date, total, order_count: int):
+        """Атомарно прибавляет выручку и количество заказов к дню"""
+        changes = {
+            "total": F("total") + total,
+            "order_count": F("order_count") + order_count,
+        }
+        if cls.objects.filter(date=date).update(**changes):
+            return
+        try:
+            with transaction.atomic():
+                cls.objects.create(
+                    date=date, total=total, order_count=order_count
+                )
+        except IntegrityError:
+            # День был создан параллельной транзакцией
+            cls.objects.filter(date=date).update(**changes)
+
+    @classmethod
+    def apply_change(
+        cls, previous: RevenueShare | None, current: RevenueShare | None
+    ):
+        """Переносит изменение вклада заказа в дневные итоги"""
+        cls.apply_changes([(previous, current)])
+
+    @classmethod
+    def apply_changes(
+        cls,
+        changes: Iterable[tuple[RevenueShare | None, RevenueShare | None]],
+    ):
+        """
+        Переносит изменения вкладов нескольких заказов в дневные итоги
+        одним обновлением на каждый затронутый день
+        """
+        days = defaultdict(lambda: [Decimal(0), 0])
+        for previous, current in changes:
+            if previous == current:
+                continue
+            if previous:
+                days[previous.date][0] -= previous.total
+                days[previous.date][1] -= 1
+            if current:
+                days[current.date][0] += current.total
+                days[current.date][1] += 1
+        changed = False
+        for day, (total, order_count) in days.items():
+            if total or order_count:
+                cls.add(day, total, order_count)
+                changed = True
+        if changed:
+            revenue_changed.send(sender=cls)
+
+
+class OrderEvent(models.Model):
+    """
+    Журнал изменений заказов для ленты событий. Записи добавляются после
+    фиксации транзакции, id записи служит идентификатором события
+    для возобновления ленты.
+    """
+
+    class Kind(models.TextChoices):
+        """Вид изменения заказа"""
+
+        CREATED = "created", "Создан"
+        UPDATED = "updated", "Изменён"
+        STATUS = "status", "Смена статуса"
+        ITEMS = "items", "Изменение позиций"
+        DELETED = "deleted", "Удалён"
+
+    # Канал PostgreSQL NOTIFY о новых событиях
+    NOTIFY_CHANNEL = "order_events"
+
+    order = models.ForeignKey(
+        Order,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        related_name="+",
+        verbose_name="заказ",
+    )
+    kind = models.CharField("вид", choices=Kind.choices, max_length=10)
+    status = models.CharField("статус", max_length=12, blank=True)
+    created = models.DateTimeField(
+        "время и дата события", auto_now_add=True, db_index=True
+    )
+
+    class Meta:
+        ordering = ["id"]
+        verbose_name = "Событие заказа"
+        verbose_name_plural = "События заказов"
+
+    def __str__(self):
+        return f"{self.id}: {self.kind} Order({self.order_id})"
+
+    @classmethod
+    def record(cls, order_id: int, kind: str, status: str = ""):
+        """Добавляет событие заказа после фиксации текущей транзакции"""
+        cls.record_many([cls(order_id=order_id, kind=kind, status=status)])
+
+    @classmethod
+    def record_many(cls, events: Iterable["OrderEvent"]):
+        """
+        Добавляет события одним запросом после фиксации текущей транзакции:
+        события откатанных изменений не публикуются, а id событий
+        выдаются в порядке фиксации изменений
         """
-        queryset = cls.objects.filter(status=cls.Status.PAID)
-        return calculate_revenue(queryset)
+        events = list(events)
+        if events:
+            transaction.on_commit(lambda: cls.publish(events))
+
+    @classmethod
+    def publish(cls, events: list["OrderEvent"]):
+        """Сохраняет события и уведомляет слушателей PostgreSQL"""
+        cls.objects.bulk_create(events)
+        if connection.vendor == "postgresql":
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    "SELECT pg_notify(%s, '')", [cls.NOTIFY_CHANNEL]
+                )
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "order": self.order_id,
+            "kind": self.kind,
+            "status": self.status,
+            "created": self.created.isoformat(),
+        }
 
 
 class OrderItem(models.Model):
@@ -73,24 +553,52 @@ class OrderItem(models.Model):
     class Meta:
         verbose_name = "Позиция заказа"
         verbose_name_plural = "Позиции заказа"
+        constraints = [
+            models.UniqueConstraint(
+                fields=("order", "dish"), name="unique_order_dish"
+            )
+        ]
 
     def save(self, *args, **kwargs):
         """
         Устанавливаем цену позиции, если она не задана. Если уже существует
-        позиция с тем же заказом и блюдом, обновляет её количество.
-        В противном случае сохраняет текущий объект как новый.
+        позиция с тем же заказом и блюдом, атомарно увеличивает её
+        количество, а текущая позиция (если она была сохранена) удаляется.
+        В противном случае сохраняет текущий объект.
         """
         if not self.price:
             self.price = self.dish.price
-        existing_item = OrderItem.objects.filter(
-            order=self.order, dish=self.dish
-        ).first()
-
-        if existing_item and existing_item.pk != self.pk:
-            existing_item.quantity += self.quantity
-            existing_item.save()
+        if self._merge_into_existing():
+            if self.pk:
+                OrderItem.objects.filter(pk=self.pk).delete()
         else:
-            super().save(*args, **kwargs)
+            try:
+                with transaction.atomic():
+                    super().save(*args, **kwargs)
+            except IntegrityError:
+                # Одновременно добавленная позиция с тем же блюдом
+                if self.pk or not self._merge_into_existing():
+                    raise
+        self.order.update_totals()
+
+    def _merge_into_existing(self) -> bool:
+        """
+        Увеличивает количество существующей позиции заказа с тем же блюдом
+        одним запросом UPDATE. Возвращает True, если такая позиция найдена.
+        """
+        if self.dish_id is None:
+            return False
+        return bool(
+            OrderItem.objects.filter(order=self.order, dish_id=self.dish_id)
+            .exclude(pk=self.pk)
+            .update(quantity=F("quantity") + self.quantity)
+        )
+
+    def delete(self, *args, **kwargs):
+        """Удаляет позицию и пересчитывает итоги заказа"""
+        result = super().delete(*args, **kwargs)
+        self.order.update_totals()
+        return result
 
     @property
     def total_price(self):
@@ -0,0 +1,182 @@
+import base64
+import binascii
+import json
+from dataclasses import dataclass, field
+from datetime import datetime
+
+from django.db.models import Q, QuerySet
+
+CURSOR_FILTERS = ("status", "table_number")
+# Наибольший id заказа, который можно передать в запрос к БД
+MAX_CURSOR_PK = 2**63 - 1
+
+
+class InvalidCursor(ValueError):
+    """Курсор повреждён или не соответствует фильтрам запроса"""
+
+
+@dataclass(frozen=True)
+class Cursor:
+    """
+    Позиция в списке заказов, упорядоченном по (-created, -id),
+    вместе с фильтрами, для которых она была получена
+    """
+
+    created: datetime
+    pk: int
+    reverse: bool = False
+    filters: dict[str, str] = field(default_factory=dict)
+
+    def encode(self) -> str:
+        """Непрозрачное строковое представление курсора"""
+        data = {
+            "c": self.created.isoformat(),
+            "i": self.pk,
+            "r": int(self.reverse),
+            "f": self.filters,
+        }
+        raw = json.dumps(data, separators=(",", ":")).encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+    @classmethod
+    def decode(cls, value: str) -> "Cursor":
+        try:
+            raw = base64.urlsafe_b64decode(value + "=" * (-len(value) % 4))
+            data = json.loads(raw)
+            if not isinstance(data, dict) or not isinstance(data["f"], dict):
+                raise TypeError("Неверная структура курсора.")
+            pk = data["i"]
+            if type(pk) is not int or not 0 < pk <= MAX_CURSOR_PK:
+                raise ValueError("Неверный id в курсоре.")
+            return cls(
+                created=datetime.fromisoformat(data["c"]),
+                pk=pk,
+                reverse=bool(data["r"]),
+                filters={
+                    key: str(data["f"][key])
+                    for key in CURSOR_FILTERS
+                    if data["f"].get(key)
+                },
+            )
+        except (binascii.Error, ValueError, TypeError, KeyError) as error:
+            raise InvalidCursor("Некорректный курсор.") from error
+
+
+@dataclass
+class KeysetPage:
+    """Страница списка заказов с курсорами соседних страниц"""
+
+    object_list: list
+    next_cursor: str | None = None
+    previous_cursor: str | None = None
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    @property
+    def has_next(self) -> bool:
+        return self.next_cursor is not None
+
+    @property
+    def has_previous(self) -> bool:
+        return self.previous_cursor is not None
+
+    @property
+    def has_other_pages(self) -> bool:
+        return self.has_next or self.has_previous
+
+
+@dataclass
+class KeysetQuery:
+    """Запрос страницы заказов по курсору"""
+
+    queryset: QuerySet
+    cursor: Cursor | None
+    page_size: int
+    filters: dict[str, str]
+
+    @property
+    def reverse(self) -> bool:
+        return bool(self.cursor and self.cursor.reverse)
+
+    def build_page(self, rows: list) -> KeysetPage:
+        """Страница по строкам запроса (на одну больше размера страницы)"""
+        has_more = len(rows) > self.page_size
+        rows = rows[: self.page_size]
+        if self.reverse:
+            rows.reverse()
+
+        page = KeysetPage(rows)
+        if not rows:
+            return page
+        has_next = self.cursor is not None if self.reverse else has_more
+        has_previous = has_more if self.reverse else self.cursor is not None
+        if has_next:
+            page.next_cursor = Cursor(
+                rows[-1].created, rows[-1].pk, filters=self.filters
+            ).encode()
+        if has_previous:
+            page.previous_cursor = Cursor(
+                rows[0].created, rows[0].pk, reverse=True, filters=self.filters
+            ).encode()
+        return page
+
+
+def build_keyset_query(
+    queryset: QuerySet,
+    cursor: Cursor | None,
+    page_size: int,
+    filters: dict[str, str | None],
+) -> KeysetQuery:
+    """
+    Постраничный вывод заказов по ключу (-created, -id) без COUNT(*)
+    и OFFSET: страница выбирается условием на позицию курсора.
+    Курсор несёт фильтры по статусу и столику; фильтры запроса,
+    противоречащие курсору, делают курсор недействительным.
+    """
+    filters = {key: value for key, value in filters.items() if value}
+    if cursor:
+        if any(cursor.filters.get(k) != v for k, v in filters.items()):
+            raise InvalidCursor("Курсор получен для других фильтров.")
+        filters = cursor.filters
+    queryset = queryset.filter(**filters)
+
+    query = KeysetQuery(queryset, cursor, page_size, filters)
+    if cursor:
+        if query.reverse:
+            position = Q(created__gt=cursor.created) | Q(
+                created=cursor.created, pk__gt=cursor.pk
+            )
+        else:
+            position = Q(created__lt=cursor.created) | Q(
+                created=cursor.created, pk__lt=cursor.pk
+            )
+        queryset = queryset.filter(position)
+    ordering = ("created", "pk") if query.reverse else ("-created", "-pk")
+    query.queryset = queryset.order_by(*ordering)[: page_size + 1]
+    return query
+
+
+def paginate_by_cursor(
+    queryset: QuerySet,
+    cursor: Cursor | None,
+    page_size: int,
+    filters: dict[str, str | None],
+) -> KeysetPage:
+    """Страница заказов по курсору (см. build_keyset_query)"""
+    query = build_keyset_query(queryset, cursor, page_size, filters)
+    return query.build_page(list(query.queryset))
+
+
+async def apaginate_by_cursor(
+    queryset: QuerySet,
+    cursor: Cursor | None,
+    page_size: int,
+    filters: dict[str, str | None],
+) -> KeysetPage:
+    """Асинхронный вариант paginate_by_cursor"""
+    query = build_keyset_query(queryset, cursor, page_size, filters)
+    return query.build_page([row async for row in query.queryset])
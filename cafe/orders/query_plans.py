@@ -0,0 +1,70 @@
+import re
+from datetime import timedelta
+from typing import NamedTuple
+
+from django.db import connection
+from django.db.models import QuerySet
+from django.utils import timezone
+
+from orders.models import Order
+from orders.utils import get_business_date, get_day_bounds
+
+# Строки плана, означающие полный просмотр таблицы: Seq Scan в PostgreSQL,
+# SCAN без индекса в SQLite
+SEQUENTIAL_SCAN_PATTERNS = {
+    "postgresql": r"Seq Scan on {table}\b",
+    "sqlite": r"\bSCAN {table}\b(?!.*\bUSING\b)",
+}
+
+
+class QueryPlan(NamedTuple):
+    """План выполнения запроса"""
+
+    name: str
+    sql: str
+    plan: str
+    sequential_scan: bool
+
+
+def get_hot_queries(page_size: int = 20) -> dict[str, QuerySet]:
+    """Основные запросы к заказам: фильтры списка и выручка за день"""
+    ordering = ("-created", "-pk")
+    today = get_business_date(timezone.now())
+    start, end = get_day_bounds(today, today + timedelta(days=1))
+    return {
+        "Список заказов": Order.objects.order_by(*ordering)[:page_size],
+        "Список заказов по статусу": Order.objects.filter(
+            status=Order.Status.PENDING
+        ).order_by(*ordering)[:page_size],
+        "Список заказов столика по статусу": Order.objects.filter(
+            table_number="1", status=Order.Status.READY
+        ).order_by(*ordering)[:page_size],
+        "Заказы, оплаченные за день": Order.objects.paid_between(
+            start, end
+        ).order_by("paid_at"),
+    }
+
+
+def has_sequential_scan(plan: str, table: str) -> bool:
+    """Есть ли в плане полный просмотр таблицы"""
+    pattern = SEQUENTIAL_SCAN_PATTERNS.get(connection.vendor)
+    if pattern is None:
+        return False
+    pattern = pattern.format(table=re.escape(table))
+    return any(re.search(pattern, line) for line in plan.splitlines())
+
+
+def explain_queries(queries: dict[str, QuerySet]) -> list[QueryPlan]:
+    """EXPLAIN каждого запроса с признаком полного просмотра таблицы"""
+    plans = []
+    for name, queryset in queries.items():
+        plan = queryset.explain()
+        plans.append(
+            QueryPlan(
+                name,
+                str(queryset.query),
+                plan,
+                has_sequential_scan(plan, queryset.model._meta.db_table),
+            )
+        )
+    return plans
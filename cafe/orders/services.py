@@ -0,0 +1,245 @@
+from collections.abc import Iterable
+from decimal import Decimal
+
+from django.db import models, transaction
+from django.utils import timezone
+
+from menu.models import Dish
+from orders.models import Order, OrderEvent, OrderItem, RevenueDaily
+
+# Количество заказов, удаляемых одним запросом
+BULK_DELETE_CHUNK_SIZE = 100
+
+
+class BulkResult(models.TextChoices):
+    """Результат массовой операции для отдельного заказа"""
+
+    UPDATED = "updated", "Изменён"
+    UNCHANGED = "unchanged", "Без изменений"
+    NOT_ALLOWED = "not_allowed", "Переход недопустим"
+    DELETED = "deleted", "Удалён"
+    NOT_FOUND = "not_found", "Не найден"
+
+
+def merge_items(items: Iterable[dict]) -> dict[int, dict]:
+    """
+    Объединяет позиции с одинаковыми блюдами, суммируя их количество.
+    Блюдо позиции может быть передано объектом Dish или его id.
+    """
+    merged = {}
+    for item in items:
+        dish = item["dish"]
+        dish_id = dish.pk if isinstance(dish, Dish) else dish
+        if dish_id in merged:
+            merged[dish_id]["quantity"] += item["quantity"]
+        else:
+            merged[dish_id] = {"dish": dish, "quantity": item["quantity"]}
+    return merged
+
+
+def resolve_prices(merged_items: dict[int, dict]) -> dict[int, Decimal]:
+    """
+    Получение цен блюд. Цены уже загруженных блюд берутся из объектов,
+    остальные запрашиваются одним запросом.
+    """
+    prices = {
+        dish_id: item["dish"].price
+        for dish_id, item in merged_items.items()
+        if isinstance(item["dish"], Dish)
+    }
+    missing = merged_items.keys() - prices.keys()
+    if missing:
+        prices.update(
+            Dish.objects.filter(pk__in=missing).values_list("pk", "price")
+        )
+    not_found = merged_items.keys() - prices.keys()
+    if not_found:
+        raise Dish.DoesNotExist(f"Блюда не найдены: {sorted(not_found)}")
+    return prices
+
+
+def build_items(order: Order, items: Iterable[dict]) -> list[OrderItem]:
+    """Формирует несохранённые позиции заказа с объединёнными блюдами"""
+    merged_items = merge_items(items)
+    prices = resolve_prices(merged_items)
+    order_items = []
+    for dish_id, item in merged_items.items():
+        order_item = OrderItem(
+            order=order, quantity=item["quantity"], price=prices[dish_id]
+        )
+        if isinstance(item["dish"], Dish):
+            order_item.dish = item["dish"]
+        else:
+            order_item.dish_id = dish_id
+        order_items.append(order_item)
+    return order_items
+
+
+def set_totals(order: Order, order_items: Iterable[OrderItem]):
+    """Устанавливает итоги заказа по полному списку его позиций"""
+    order_items = list(order_items)
+    order.total_price = sum((i.total_price for i in order_items), Decimal(0))
+    order.item_count = len(order_items)
+
+
+@transaction.atomic
+def create_order(order: Order, items: Iterable[dict]) -> Order:
+    """
+    Создаёт заказ вместе с позициями: одинаковые блюда объединяются,
+    цены блюд загружаются одним запросом, позиции записываются одним
+    bulk_create, итоги заказа рассчитываются без дополнительных запросов.
+    """
+    order_items = build_items(order, items)
+    set_totals(order, order_items)
+    order.save()
+    OrderItem.objects.bulk_create(order_items)
+    return order
+
+
+@transaction.atomic
+def sync_items(order: Order, items: Iterable[dict]):
+    """
+    Приводит позиции заказа к переданному списку. Количество запросов
+    не зависит от числа позиций: изменённые количества записываются одним
+    bulk_update, новые блюда одним bulk_create, отсутствующие позиции
+    удаляются одним запросом в пределах заказа.
+    """
+    merged_items = merge_items(items)
+    existing = {}
+    to_delete = []
+    for item in order.items.all():
+        if item.dish_id in merged_items and item.dish_id not in existing:
+            existing[item.dish_id] = item
+        else:
+            to_delete.append(item.pk)
+
+    to_update = []
+    for dish_id, item in existing.items():
+        quantity = merged_items.pop(dish_id)["quantity"]
+        if item.quantity != quantity:
+            item.quantity = quantity
+            to_update.append(item)
+    to_create = build_items(order, merged_items.values())
+
+    if to_delete:
+        OrderItem.objects.filter(order=order, pk__in=to_delete).delete()
+    if to_update:
+        OrderItem.objects.bulk_update(to_update, ["quantity"])
+    if to_create:
+        # Позиция с тем же блюдом могла быть добавлена параллельно:
+        # её количество заменяется переданным значением
+        OrderItem.objects.bulk_create(
+            to_create,
+            update_conflicts=True,
+            unique_fields=["order", "dish"],
+            update_fields=["quantity"],
+        )
+
+    set_totals(order, [*existing.values(), *to_create])
+    order.update_totals(
+        {field: getattr(order, field) for field in Order.TOTAL_FIELDS}
+    )
+
+
+@transaction.atomic
+def update_order(order: Order, items: Iterable[dict] | None = None) -> Order:
+    """Сохраняет заказ и, если переданы позиции, синхронизирует их"""
+    order.save()
+    if items is not None:
+        sync_items(order, items)
+    return order
+
+
+@transaction.atomic
+def bulk_change_status(pks: Iterable[int], status: str) -> dict[int, str]:
+    """
+    Меняет статус нескольких заказов одним UPDATE ... WHERE id IN (...)
+    с учётом допустимых переходов. При оплате итоги заказов пересчитываются
+    в том же запросе, изменения выручки переносятся в дневные итоги одним
+    обновлением на день. Возвращает результат для каждого переданного id.
+    """
+    pks = list(dict.fromkeys(pks))
+    stored = {
+        pk: values
+        for pk, *values in Order.objects.select_for_update()
+        .filter(pk__in=pks)
+        .values_list("pk", "status", "paid_at", "total_price")
+    }
+    sources = Order.get_allowed_sources(status)
+    changed = [pk for pk, values in stored.items() if values[0] in sources]
+    if changed:
+        now = timezone.now()
+        Order.objects.filter(pk__in=changed).update(
+            **Order.build_status_fields(status, now)
+        )
+        totals = {}
+        if status == Order.Status.PAID:
+            totals = dict(
+                Order.objects.filter(pk__in=changed).values_list(
+                    "pk", "total_price"
+                )
+            )
+        RevenueDaily.apply_changes(
+            (
+                Order.build_revenue_share(*stored[pk]),
+                Order.build_revenue_share(status, now, totals.get(pk)),
+            )
+            for pk in changed
+        )
+        OrderEvent.record_many(
+            OrderEvent(order_id=pk, kind=OrderEvent.Kind.STATUS, status=status)
+            for pk in changed
+        )
+    changed = set(changed)
+    results = {}
+    for pk in pks:
+        if pk in changed:
+            results[pk] = BulkResult.UPDATED
+        elif pk not in stored:
+            results[pk] = BulkResult.NOT_FOUND
+        elif stored[pk][0] == status:
+            results[pk] = BulkResult.UNCHANGED
+        else:
+            results[pk] = BulkResult.NOT_ALLOWED
+    return results
+
+
+@transaction.atomic
+def bulk_delete_orders(
+    pks: Iterable[int], chunk_size: int = BULK_DELETE_CHUNK_SIZE
+) -> dict[int, str]:
+    """
+    Удаляет заказы вместе с позициями порциями по chunk_size id.
+    Сигналы удаления отдельного заказа не отправляются: сохранённые
+    вклады удалённых заказов исключаются из выручки одним обновлением
+    на день, события удаления добавляются одним запросом. Возвращает
+    результат для каждого id.
+    """
+    pks = list(dict.fromkeys(pks))
+    stored = {}
+    for start in range(0, len(pks), chunk_size):
+        orders = Order.objects.filter(pk__in=pks[start : start + chunk_size])
+        chunk = {
+            pk: values
+            for pk, *values in orders.select_for_update().values_list(
+                "pk", "status", "paid_at", "total_price"
+            )
+        }
+        if chunk:
+            OrderItem.objects.filter(order_id__in=chunk).delete()
+            # Удаление без сбора экземпляров и сигналов pre/post_delete
+            orders = Order.objects.filter(pk__in=chunk)
+            orders._raw_delete(orders.db)
+            stored.update(chunk)
+    RevenueDaily.apply_changes(
+        (Order.build_revenue_share(*values), None)
+        for values in stored.values()
+    )
+    OrderEvent.record_many(
+        OrderEvent(order_id=pk, kind=OrderEvent.Kind.DELETED, status=values[0])
+        for pk, values in stored.items()
+    )
+    return {
+        pk: BulkResult.DELETED if pk in stored else BulkResult.NOT_FOUND
+        for pk in pks
+    }
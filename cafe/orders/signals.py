@@ -0,0 +1,38 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, pre_delete
+from django.dispatch import receiver
+
+from orders.cache import invalidate_revenue_cache
+from orders.models import Order, OrderEvent, RevenueDaily, revenue_changed
+
+
+@receiver(pre_delete, sender=Order)
+def lock_deleted_order(sender, instance: Order, **kwargs):
+    """
+    Запоминает сохранённые в БД итоги удаляемого заказа: значения в
+    памяти могут устареть после изменения заказа другим запросом
+    """
+    instance._stored_revenue_values = instance.get_stored_revenue_values()
+
+
+@receiver(post_delete, sender=Order)
+def remove_order_revenue(sender, instance: Order, **kwargs):
+    """
+    Удалённый оплаченный заказ исключается из дневной выручки,
+    в ленту событий добавляется удаление заказа
+    """
+    stored = getattr(instance, "_stored_revenue_values", None)
+    if stored is None:
+        return
+    RevenueDaily.apply_change(Order.build_revenue_share(*stored), None)
+    OrderEvent.record(instance.pk, OrderEvent.Kind.DELETED, stored[0])
+
+
+@receiver(revenue_changed)
+def reset_revenue_cache(sender, **kwargs):
+    """
+    Сбрасывает кэш выручки сразу и повторно после фиксации транзакции,
+    чтобы параллельный запрос не сохранил в кэш незафиксированные итоги
+    """
+    invalidate_revenue_cache()
+    transaction.on_commit(invalidate_revenue_cache)
@@ -16,6 +16,6 @@ def addclass(field: BoundField, css: str):
 def get_query(context: RequestContext):
     """Получение QueryString из запроса для корректной работы пагинации"""
     query_string: QueryDict = context["request"].GET.copy()
-    if "page" in query_string:
-        query_string.pop("page")
+    for param in ("page", "cursor"):
+        query_string.pop(param, None)
     return query_string.urlencode()
@@ -1,28 +1,110 @@
-from datetime import datetime, timedelta
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from typing import NamedTuple
+from zoneinfo import ZoneInfo
 
-from django.db.models import Case, DecimalField, F, Q, Sum, When
+from django.conf import settings
+from django.db import models
+from django.db.models import (
+    Case,
+    DateTimeField,
+    DecimalField,
+    ExpressionWrapper,
+    F,
+    Q,
+    Sum,
+    Value,
+    When,
+)
 from django.db.models.expressions import CombinedExpression
-from django.db.models.functions import Coalesce
+from django.db.models.functions import Coalesce, TruncDate
 from django.db.models.query import QuerySet
+from django.utils import timezone
 
 
-def calculate_revenue(queryset: QuerySet) -> dict[str, DecimalField]:
+class RevenueBucket(models.TextChoices):
+    """Интервал группировки выручки"""
+
+    HOUR = "hour", "Час"
+    DAY = "day", "День"
+    WEEK = "week", "Неделя"
+
+
+class RevenueShare(NamedTuple):
+    """Вклад оплаченного заказа в выручку за день"""
+
+    date: date
+    total: Decimal
+
+
+def get_cafe_timezone() -> ZoneInfo:
+    """Часовой пояс кафе, в котором считаются рабочие дни"""
+    return ZoneInfo(settings.CAFE_TIME_ZONE)
+
+
+def get_day_start() -> timedelta:
+    """Смещение начала рабочего дня кафе от полуночи"""
+    hours, minutes = map(int, settings.CAFE_DAY_START.split(":"))
+    return timedelta(hours=hours, minutes=minutes)
+
+
+def get_business_date(value: datetime) -> date:
     """
-    Вычисляет общую выручку за разные периоды времени
-    (всё время, сегодня, неделя, месяц) на основе переданного queryset.
+    Рабочий день кафе, к которому относится момент времени: заказы,
+    оплаченные после полуночи до начала рабочего дня, относятся
+    к предыдущему дню.
+    """
+    return (value.astimezone(get_cafe_timezone()) - get_day_start()).date()
+
+
+def get_day_bounds(start: date, end: date) -> tuple[datetime, datetime]:
     """
-    now = datetime.now()
-    today = now.date()
+    Границы полуинтервала [start, end) рабочих дней кафе в виде моментов
+    времени для условий вида paid_at >= начало AND paid_at < конец
+    """
+    tz, day_start = get_cafe_timezone(), get_day_start()
+    return (
+        datetime.combine(start, time(), tz) + day_start,
+        datetime.combine(end, time(), tz) + day_start,
+    )
+
+
+def build_business_date_expression(field: str) -> TruncDate:
+    """Выражение рабочего дня кафе для поля даты и времени"""
+    shifted = ExpressionWrapper(
+        F(field) - Value(get_day_start()), output_field=DateTimeField()
+    )
+    return TruncDate(shifted, tzinfo=get_cafe_timezone())
+
+
+def build_revenue_aggregates() -> dict[str, CombinedExpression]:
+    """
+    Выражения общей выручки за разные периоды времени
+    (всё время, сегодня, неделя, месяц) по дневным итогам выручки.
+    """
+    today = get_business_date(timezone.now())
     start_of_week = today - timedelta(days=today.weekday())
     start_of_month = today.replace(day=1)
+    return {
+        "all_time": build_revenue_expression(),
+        "today": build_revenue_expression(Q(date=today)),
+        "week": build_revenue_expression(Q(date__gte=start_of_week)),
+        "month": build_revenue_expression(Q(date__gte=start_of_month)),
+    }
 
-    revenue = queryset.aggregate(
-        all_time=build_revenue_expression(),
-        today=build_revenue_expression(Q(updated__date=today)),
-        week=build_revenue_expression(Q(updated__date__gte=start_of_week)),
-        month=build_revenue_expression(Q(updated__date__gte=start_of_month)),
-    )
-    return revenue
+
+def calculate_revenue(queryset: QuerySet) -> dict[str, DecimalField]:
+    """
+    Вычисляет общую выручку за разные периоды времени
+    (всё время, сегодня, неделя, месяц) на основе переданного queryset
+    дневных итогов выручки.
+    """
+    return queryset.aggregate(**build_revenue_aggregates())
+
+
+async def acalculate_revenue(queryset: QuerySet) -> dict[str, DecimalField]:
+    """Асинхронный вариант calculate_revenue"""
+    return await queryset.aaggregate(**build_revenue_aggregates())
 
 
 def build_revenue_expression(condition: Q | None = None) -> CombinedExpression:
@@ -31,10 +113,6 @@ def build_revenue_expression(condition: Q | None = None) -> CombinedExpression:
     переданного условия фильтрации.
     """
 
-    total_price_expr = F("items__price") * F("items__quantity")
-    expr = (
-        Case(When(condition, then=total_price_expr))
-        if condition
-        else total_price_expr
-    )
+    total_expr = F("total")
+    expr = Case(When(condition, then=total_expr)) if condition else total_expr
     return Coalesce(Sum(expr), 0, output_field=DecimalField())
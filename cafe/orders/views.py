@@ -1,3 +1,4 @@
+from django.http import Http404, HttpResponseRedirect
 from django.shortcuts import get_object_or_404, redirect
 from django.urls import reverse_lazy
 from django.views.generic import TemplateView, View
@@ -6,6 +7,13 @@ from django.views.generic.list import ListView
 
 from orders.forms import OrderFormChangeStatus, OrderForm, OrderItemFormSet
 from orders.models import Order
+from orders.pagination import (
+    CURSOR_FILTERS,
+    Cursor,
+    InvalidCursor,
+    paginate_by_cursor,
+)
+from orders.services import create_order
 
 
 class OrderCreateUpdateBaseView:
@@ -50,12 +58,26 @@ class OrderCreateView(OrderCreateUpdateBaseView, CreateView):
     def get_instance(self):
         return None
 
+    def form_valid(self, form):
+        """Создать заказ с позициями из formset одной транзакцией"""
+        formset = self.formset_class(self.request.POST)
+        if not formset.is_valid():
+            return self.form_invalid(form)
+        items = [
+            item_form.cleaned_data
+            for item_form in formset.forms
+            if item_form.cleaned_data
+            and item_form not in formset.deleted_forms
+        ]
+        self.object = create_order(form.save(commit=False), items)
+        return HttpResponseRedirect(self.get_success_url())
+
 
 class OrderUpdateView(OrderCreateUpdateBaseView, UpdateView):
     """Редактирование заказа"""
 
     def get_instance(self):
-        return self.get_object()
+        return self.object
 
 
 class OrderListView(ListView):
@@ -78,15 +100,36 @@ class OrderListView(ListView):
             queryset = queryset.filter(table_number=table_number)
         return queryset
 
+    def paginate_queryset(self, queryset, page_size):
+        """
+        Постраничный вывод по курсору без подсчёта общего количества
+        заказов. Параметр page включает вывод по номерам страниц.
+        """
+        if "page" in self.request.GET:
+            return super().paginate_queryset(queryset, page_size)
+        encoded = self.request.GET.get("cursor")
+        filters = {key: self.request.GET.get(key) for key in CURSOR_FILTERS}
+        try:
+            cursor = Cursor.decode(encoded) if encoded else None
+            page = paginate_by_cursor(queryset, cursor, page_size, filters)
+        except InvalidCursor as error:
+            raise Http404(str(error))
+        return None, page, page.object_list, page.has_other_pages
+
 
 class OrderChangeStatusView(View):
     """Изменить статус заказа"""
 
     def post(self, request, pk):
-        order = get_object_or_404(Order, pk=pk)
-        form = OrderFormChangeStatus(request.POST, instance=order)
-        if form.is_valid:
-            form.save()
+        """
+        Статус меняется условным UPDATE без загрузки заказа. Недопустимый
+        переход или неверный статус оставляют заказ без изменений.
+        """
+        form = OrderFormChangeStatus(request.POST)
+        if not form.is_valid() or not Order.transition(
+            pk, form.cleaned_data["status"]
+        ):
+            get_object_or_404(Order, pk=pk)
         return redirect("orders:order_list")
 
 
@@ -0,0 +1,12 @@
+from django.core.cache import cache
+
+
+class ClearCacheMixin:
+    """
+    Очищает кэш перед каждым тестом: кэш выручки, версия меню и буфер
+    медленных запросов не откатываются вместе с БД между тестами
+    """
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
@@ -0,0 +1,53 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+
+from orders.models import Order
+
+User = get_user_model()
+
+
+class TestOrderAdmin(TestCase):
+    """Тестирование заказов в интерфейсе администратора"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_superuser("admin")
+        cls.order = Order.objects.create(table_number="1")
+        Order.transition(cls.order.pk, Order.Status.PAID)
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def change_status(self, status: str):
+        url = reverse("admin:orders_order_change", args=(self.order.pk,))
+        data = {
+            "table_number": "1",
+            "status": status,
+            "items-TOTAL_FORMS": 0,
+            "items-INITIAL_FORMS": 0,
+        }
+        return self.client.post(url, data)
+
+    def test_status_change_follows_transitions(self):
+        """
+        Форма заказа не допускает недопустимый переход статуса,
+        допустимый переход сохраняется
+        """
+        response = self.change_status(Order.Status.PENDING)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("status", response.context["adminform"].form.errors)
+        self.order.refresh_from_db()
+        self.assertEqual(self.order.status, Order.Status.PAID)
+
+        response = self.change_status(Order.Status.READY)
+        self.assertEqual(response.status_code, 302)
+        self.order.refresh_from_db()
+        self.assertEqual(self.order.status, Order.Status.READY)
+
+    def test_status_is_not_editable_in_list(self):
+        """Статус заказа не редактируется в списке заказов"""
+        response = self.client.get(reverse("admin:orders_order_changelist"))
+        self.assertEqual(response.status_code, 200)
+        form = response.context["cl"].formset.forms[0]
+        self.assertNotIn("status", form.fields)
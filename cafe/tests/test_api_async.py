@@ -0,0 +1,85 @@
+import json
+
+from django.test import TestCase
+from django.urls import reverse
+
+from menu.models import Dish
+from orders.models import Order
+from orders.services import create_order
+from tests.mixins import ClearCacheMixin
+
+
+class TestAsyncReadAPI(ClearCacheMixin, TestCase):
+    """Тестирование асинхронных представлений чтения"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.dishes = Dish.objects.bulk_create(
+            [Dish(name=f"dish_{i:02}", price=i * 10) for i in range(1, 16)]
+        )
+        cls.orders = [
+            create_order(
+                Order(table_number=str(i % 3)),
+                [{"dish": dish, "quantity": 2} for dish in cls.dishes[:i]],
+            )
+            for i in range(1, 15)
+        ]
+        for order in cls.orders[:4]:
+            Order.transition(order.pk, Order.Status.PAID)
+
+    async def assert_same_response(self, name: str, *args, query=""):
+        """Асинхронное представление отвечает так же, как представление DRF"""
+        expected = await self.async_client.get(
+            reverse(f"api:{name}", args=args) + query
+        )
+        response = await self.async_client.get(
+            reverse(f"api:async-{name}", args=args) + query
+        )
+        self.assertEqual(response.status_code, expected.status_code)
+        # Ссылки на страницы отличаются только префиксом async/
+        content = response.content.decode().replace("/async/", "/")
+        self.assertEqual(json.loads(content), expected.json())
+        return response
+
+    async def test_order_list(self):
+        """Список заказов с фильтрами и переходом по курсору"""
+        for query in ("", "?items=false", "?status=PAID&table_number=1"):
+            with self.subTest(query=query):
+                await self.assert_same_response("orders-list", query=query)
+        response = await self.assert_same_response("orders-list")
+        next_url = response.json()["next"]
+        self.assertIsNotNone(next_url)
+        response = await self.async_client.get(next_url)
+        self.assertEqual(len(response.json()["results"]), 4)
+
+    async def test_order_list_invalid_params(self):
+        """Некорректные фильтр и курсор"""
+        await self.assert_same_response("orders-list", query="?status=NEW")
+        await self.assert_same_response("orders-list", query="?cursor=bad")
+
+    async def test_order_detail(self):
+        """Заказ с условными запросами"""
+        order = self.orders[5]
+        for query in ("", "?items=false"):
+            with self.subTest(query=query):
+                await self.assert_same_response(
+                    "orders-detail", order.pk, query=query
+                )
+        url = reverse("api:async-orders-detail", args=[order.pk])
+        response = await self.async_client.get(url)
+        response = await self.async_client.get(
+            url, headers={"If-None-Match": response["ETag"]}
+        )
+        self.assertEqual(response.status_code, 304)
+        await self.assert_same_response("orders-detail", 0)
+
+    async def test_dish_list(self):
+        """Меню по страницам"""
+        for query in ("", "?page=2", "?page=3", "?page=x"):
+            with self.subTest(query=query):
+                await self.assert_same_response("dishes-list", query=query)
+
+    async def test_revenue(self):
+        """Выручка за периоды"""
+        response = await self.assert_same_response("orders-revenue")
+        self.assertNotEqual(response.json()["today"], "0.00")
@@ -37,3 +37,23 @@ class TestMenuAPI(APITestCase):
         url = reverse(self.name_detail, args=[100])
         response = self.client.get(url)
         self.assertEqual(response.status_code, 404)
+
+    def test_get_dishes_not_modified(self):
+        """
+        Меню с совпадающим ETag возвращается ответом 304 без запросов к БД,
+        изменение блюда меняет ETag
+        """
+        url = reverse(self.name_list)
+        response = self.client.get(url)
+        etag = response.headers["ETag"]
+        self.assertIn("Last-Modified", response.headers)
+        with self.assertNumQueries(0):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.headers["ETag"], etag)
+
+        self.dish.price = 1
+        self.dish.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.headers["ETag"], etag)
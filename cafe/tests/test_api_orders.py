@@ -1,13 +1,20 @@
+import base64
+import json
+from datetime import timedelta
 from decimal import Decimal
 
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from django.utils import timezone
 from rest_framework.test import APITestCase
 
 from menu.models import Dish
-from orders.models import Order, OrderItem
+from orders.models import Order, OrderItem, RevenueDaily
+from tests.mixins import ClearCacheMixin
 
 
-class TestOrderAPI(APITestCase):
+class TestOrderAPI(ClearCacheMixin, APITestCase):
     """Тестирование API Order"""
 
     name_list = "api:orders-list"
@@ -49,6 +56,87 @@ class TestOrderAPI(APITestCase):
         self.assertEqual(len(content["results"]), 1)
         self.check_fields(content["results"][0], self.order)
 
+    def test_get_orders_list_without_items(self):
+        """
+        Список заказов без позиций выводит сохранённые итоги заказа
+        и не загружает позиции
+        """
+        with self.assertNumQueries(1):
+            response = self.client.get(
+                self.url_order_list, data={"items": "false"}
+            )
+        self.assertEqual(response.status_code, 200)
+        obj = response.json()["results"][0]
+        self.assertNotIn("items", obj)
+        self.assertEqual(obj["item_count"], 1)
+        self.assertEqual(Decimal(obj["total_price"]), self.dish.price)
+
+    def test_get_orders_list_by_cursor(self):
+        """
+        Список заказов выводится по курсору без подсчёта количества,
+        курсор сохраняет фильтры и позволяет вернуться назад
+        """
+        orders = [self.order]
+        orders += [Order.objects.create(table_number="1") for _ in range(14)]
+        Order.objects.create(table_number="2")
+        expected = [order.id for order in reversed(orders)]
+
+        with self.assertNumQueries(1):
+            response = self.client.get(
+                self.url_order_list,
+                data={"table_number": "1", "items": "false"},
+            )
+        first = response.json()
+        self.assertNotIn("count", first)
+        self.assertIsNone(first["previous"])
+        response = self.client.get(first["next"])
+        second = response.json()
+        ids = [obj["id"] for obj in first["results"] + second["results"]]
+        self.assertEqual(ids, expected)
+        self.assertIsNone(second["next"])
+
+        response = self.client.get(second["previous"])
+        self.assertEqual(response.json()["results"], first["results"])
+
+    def test_get_orders_list_with_invalid_cursor(self):
+        """
+        Повреждённый курсор, курсор неверной структуры или курсор других
+        фильтров дают ошибку 404 в API и в HTML-списке заказов
+        """
+        for _ in range(10):
+            Order.objects.create(table_number="1")
+        next_url = self.client.get(
+            self.url_order_list, data={"table_number": "1"}
+        ).json()["next"]
+        cursor = next_url.split("cursor=")[1].split("&")[0]
+        payloads = (
+            [1, 2],
+            {"c": timezone.now().isoformat(), "i": 1, "r": 0, "f": [1]},
+            *(
+                {"c": timezone.now().isoformat(), "i": pk, "r": 0, "f": {}}
+                for pk in (1e400, "1", 0, 2**63)
+            ),
+        )
+        invalid_data = (
+            {"cursor": "invalid"},
+            {"cursor": cursor, "table_number": "2"},
+            *(
+                {"cursor": base64.urlsafe_b64encode(json.dumps(p).encode())}
+                for p in payloads
+            ),
+        )
+        for url in (self.url_order_list, reverse("orders:order_list")):
+            for data in invalid_data:
+                with self.subTest(url=url, data=data):
+                    response = self.client.get(url, data=data)
+                    self.assertEqual(response.status_code, 404)
+
+    def test_get_orders_list_by_page_number(self):
+        """Параметр page включает постраничный вывод с количеством"""
+        response = self.client.get(self.url_order_list, data={"page": 1})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["count"], 1)
+
     def test_get_order(self):
         """Получение заказа по id"""
         response = self.client.get(self.url_order_detail)
@@ -56,6 +144,26 @@ class TestOrderAPI(APITestCase):
         content = response.json()
         self.check_fields(content, self.order)
 
+    def test_get_order_not_modified(self):
+        """
+        Заказ с совпадающим ETag возвращается ответом 304 без загрузки
+        позиций, изменение позиций заказа меняет ETag
+        """
+        response = self.client.get(self.url_order_detail)
+        etag = response.headers["ETag"]
+        with self.assertNumQueries(1):
+            response = self.client.get(
+                self.url_order_detail, HTTP_IF_NONE_MATCH=etag
+            )
+        self.assertEqual(response.status_code, 304)
+
+        OrderItem.objects.filter(order=self.order).get().delete()
+        response = self.client.get(
+            self.url_order_detail, HTTP_IF_NONE_MATCH=etag
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["items"], [])
+
     def check_fields(self, req_obj, db_obj):
         fields = ("id", "table_number", "status")
         for field in fields:
@@ -101,6 +209,57 @@ class TestOrderAPI(APITestCase):
         ).first()
         self.assertEqual(order.items.count(), 1)
         self.assertEqual(order.items.first().quantity, 2)
+        self.assertEqual(
+            Decimal(response.json()["total_price"]), self.dish.price * 2
+        )
+
+    def test_create_order_dishes_are_loaded_once(self):
+        """
+        Блюда всех позиций заказа загружаются одним запросом: количество
+        запросов не зависит от числа позиций
+        """
+        dishes = Dish.objects.bulk_create(
+            [Dish(name=f"dish_{i}", price=i) for i in range(1, 31)]
+        )
+
+        def count_queries(size: int) -> int:
+            data = {
+                "table_number": "3",
+                "items": [
+                    {"dish": dish.id, "quantity": 1} for dish in dishes[:size]
+                ],
+            }
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.post(
+                    self.url_order_list, data=data, format="json"
+                )
+            self.assertEqual(response.status_code, 201)
+            return len(queries)
+
+        self.assertEqual(count_queries(2), count_queries(30))
+
+    def test_create_order_with_unavailable_dishes(self):
+        """Отсутствующие и неактивные блюда отклоняются для каждой позиции"""
+        inactive = Dish.objects.create(
+            name="inactive", price=1, is_active=False
+        )
+        data = {
+            "table_number": "3",
+            "items": [
+                {"dish": self.dish.id, "quantity": 1},
+                {"dish": inactive.id, "quantity": 1},
+                {"dish": 999, "quantity": 1},
+            ],
+        }
+        response = self.client.post(
+            self.url_order_list, data=data, format="json"
+        )
+        self.assertEqual(response.status_code, 400)
+        errors = response.json()["items"]
+        self.assertEqual(errors[0], {})
+        self.assertIn("dish", errors[1])
+        self.assertIn("dish", errors[2])
+        self.assertEqual(Order.objects.count(), 1)
 
     def test_create_order_with_invalid_data(self):
         """Создание заказа с невалидными данными"""
@@ -173,6 +332,85 @@ class TestOrderAPI(APITestCase):
                 self.order.refresh_from_db()
                 self.assertEqual(self.order.status, exp)
 
+    def test_change_status_with_invalid_transition(self):
+        """
+        Недопустимый переход статуса возвращает ошибку 409, в том числе
+        при полном обновлении заказа
+        """
+        self.order.status = Order.Status.PAID
+        self.order.save()
+        response = self.client.patch(
+            self.url_change_status, data={"status": "PENDING"}, format="json"
+        )
+        self.assertEqual(response.status_code, 409)
+        response = self.client.put(
+            self.url_order_detail,
+            data={**self.new_data, "status": "PENDING"},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 400)
+        self.order.refresh_from_db()
+        self.assertEqual(self.order.status, Order.Status.PAID)
+        url = reverse(self.name_change_status, args=[999])
+        response = self.client.patch(url, data={"status": "READY"})
+        self.assertEqual(response.status_code, 404)
+
+    def test_bulk_status_and_delete(self):
+        """
+        Массовые смена статуса и удаление возвращают результат
+        для каждого id
+        """
+        order = Order.objects.create(table_number="2")
+        url_status = reverse("api:orders-bulk-status")
+        url_delete = reverse("api:orders-bulk-delete")
+        response = self.client.patch(
+            url_status,
+            data={"ids": [self.order.id, order.id, 999], "status": "PAID"},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.json(),
+            [
+                {"id": self.order.id, "result": "updated"},
+                {"id": order.id, "result": "updated"},
+                {"id": 999, "result": "not_found"},
+            ],
+        )
+        self.assertEqual(
+            Order.objects.filter(status=Order.Status.PAID).count(), 2
+        )
+        response = self.client.get(self.url_revenue)
+        self.assertEqual(Decimal(response.json()["today"]), self.dish.price)
+
+        response = self.client.post(
+            url_delete, data={"ids": [order.id, order.id]}, format="json"
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.json(), [{"id": order.id, "result": "deleted"}]
+        )
+        self.assertFalse(Order.objects.filter(pk=order.id).exists())
+
+    def test_bulk_operations_with_invalid_data(self):
+        """Массовые операции без id или с неверным статусом дают ошибку 400"""
+        invalid_requests = (
+            ("api:orders-bulk-status", "patch", {"ids": [], "status": "PAID"}),
+            (
+                "api:orders-bulk-status",
+                "patch",
+                {"ids": [self.order.id], "status": "NON_EXISTS"},
+            ),
+            ("api:orders-bulk-delete", "post", {"ids": ["one"]}),
+        )
+        for name, method, data in invalid_requests:
+            with self.subTest(name=name, data=data):
+                response = getattr(self.client, method)(
+                    reverse(name), data=data, format="json"
+                )
+                self.assertEqual(response.status_code, 400)
+        self.assertTrue(Order.objects.filter(pk=self.order.id).exists())
+
     def test_get_revenue(self):
         """Корректно возвращается расчет выручки"""
         for status in Order.Status:
@@ -209,3 +447,82 @@ class TestOrderAPI(APITestCase):
         data = {"status": "NON_EXISTS"}
         response = self.client.get(self.url_order_list, data=data)
         self.assertEqual(response.status_code, 400)
+
+    def test_revenue_above_million(self):
+        """Выручка за всё время больше миллиона выводится без ошибок"""
+        today = timezone.localdate()
+        RevenueDaily.objects.bulk_create(
+            RevenueDaily(
+                date=today - timedelta(days=100 + i),
+                total=Decimal("900000.50"),
+                order_count=1000,
+            )
+            for i in range(3)
+        )
+        response = self.client.get(self.url_revenue)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            Decimal(response.json()["all_time"]), Decimal("2700001.50")
+        )
+
+    def test_revenue_is_cached_until_changed(self):
+        """
+        Повторный запрос выручки берётся из кэша, оплата заказа сбрасывает
+        кэш; статистика кэша учитывает попадания и промахи
+        """
+        url_stats = reverse("api:orders-revenue-cache-stats")
+        for _ in range(2):
+            self.client.get(self.url_revenue)
+        self.order.status = Order.Status.PAID
+        self.order.save()
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url_revenue)
+        self.assertEqual(Decimal(response.json()["today"]), self.dish.price)
+        with self.assertNumQueries(0):
+            self.client.get(self.url_revenue)
+        response = self.client.get(url_stats)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {"hits": 2, "misses": 2})
+
+    def test_get_revenue_series(self):
+        """
+        Ряд выручки возвращается параллельными массивами для каждого
+        интервала одним запросом
+        """
+        self.order.status = Order.Status.PAID
+        self.order.save()
+        url = reverse("api:orders-revenue-series")
+        paid_at = timezone.localtime(self.order.paid_at)
+        today = timezone.localdate(self.order.paid_at)
+        expected_timestamps = {
+            "hour": paid_at.replace(minute=0, second=0, microsecond=0),
+            "day": today,
+            "week": today - timedelta(days=today.weekday()),
+        }
+        for bucket, timestamp in expected_timestamps.items():
+            with self.subTest(bucket=bucket):
+                with self.assertNumQueries(1):
+                    response = self.client.get(url, data={"bucket": bucket})
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(
+                    response.json(),
+                    {
+                        "bucket": bucket,
+                        "timestamps": [timestamp.isoformat()],
+                        "totals": [f"{self.dish.price:.2f}"],
+                        "orders": [1],
+                    },
+                )
+
+    def test_get_revenue_series_with_invalid_params(self):
+        """Некорректные параметры ряда выручки возвращают ошибку 400"""
+        url = reverse("api:orders-revenue-series")
+        invalid_params = (
+            {"bucket": "month"},
+            {"from": "2025-01-10", "to": "2025-01-01"},
+            {"from": "not a date"},
+        )
+        for params in invalid_params:
+            with self.subTest(params=params):
+                response = self.client.get(url, data=params)
+                self.assertEqual(response.status_code, 400)
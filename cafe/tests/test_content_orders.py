@@ -1,11 +1,14 @@
+from django.core.cache import cache
 from django.test import TestCase
 from django.urls import reverse
 
+from menu.cache import MENU_VERSION_KEY, get_menu_version
 from menu.models import Dish
 from orders.models import Order, OrderItem
+from tests.mixins import ClearCacheMixin
 
 
-class TestOrderContent(TestCase):
+class TestOrderContent(ClearCacheMixin, TestCase):
     """Тестирование контента приложения orders"""
 
     name_list = "orders:order_list"
@@ -35,6 +38,25 @@ class TestOrderContent(TestCase):
         self.assertEqual(len(object_list), 1)
         self.assertEqual(object_list[0].id, self.order.id)
 
+    def test_order_list_cursor_pagination(self):
+        """
+        Список заказов листается по курсору, параметр page включает
+        вывод по номерам страниц
+        """
+        for _ in range(20):
+            Order.objects.create(table_number="1")
+        url = reverse(self.name_list)
+        response = self.client.get(url)
+        self.assertIsNone(response.context["paginator"])
+        page = response.context["page_obj"]
+        self.assertEqual(len(page), 20)
+        response = self.client.get(url, data={"cursor": page.next_cursor})
+        object_list = response.context["object_list"]
+        self.assertEqual([obj.id for obj in object_list], [self.order.id])
+
+        response = self.client.get(url, data={"page": 2})
+        self.assertEqual(response.context["paginator"].count, 21)
+
     def test_form_in_page(self):
         """Формы присутствуют на страницах создания и обновления заказов"""
         urls = (
@@ -48,6 +70,41 @@ class TestOrderContent(TestCase):
                 self.assertIn("form", response.context)
                 self.assertIn("formset", response.context)
 
+    def test_order_form_uses_cached_menu(self):
+        """
+        Формы позиций используют общий кэш активных блюд: страница
+        создания заказа не запрашивает меню до изменения блюда
+        """
+        url = reverse(self.name_create)
+        self.client.get(url)
+        with self.assertNumQueries(0):
+            response = self.client.get(url)
+        self.assertContains(response, self.dish.name)
+
+        dish = Dish.objects.create(name="new dish", description="", price=1)
+        with self.assertNumQueries(1):
+            response = self.client.get(url)
+        self.assertContains(response, dish.name)
+
+    def test_order_form_menu_follows_shared_version(self):
+        """
+        Активные блюда процесса сверяются с версией меню в общем кэше:
+        блюдо, снятое с продажи в другом процессе, исключается из выбора
+        после смены версии этим процессом или очистки кэша
+        """
+        url = reverse(self.name_create)
+        dishes = Dish.objects.filter(pk=self.dish.pk)
+        self.assertContains(self.client.get(url), self.dish.name)
+        # Изменение без сигналов этого процесса, версия меню прежняя
+        dishes.update(is_active=False)
+        self.assertContains(self.client.get(url), self.dish.name)
+        cache.set(MENU_VERSION_KEY, get_menu_version() + 1, timeout=None)
+        self.assertNotContains(self.client.get(url), self.dish.name)
+
+        dishes.update(is_active=True)
+        cache.clear()
+        self.assertContains(self.client.get(url), self.dish.name)
+
     def test_content_revenue_render_is_correct(self):
         """Проверка отображения страницы расчета выручки"""
         variables = ("all_time", "today", "week", "month")
@@ -0,0 +1,99 @@
+import asyncio
+
+from asgiref.sync import sync_to_async
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from orders.events import OrderEventHub
+from orders.models import Order, OrderEvent
+
+
+@override_settings(ORDER_EVENTS_POLL_INTERVAL=0.01)
+class TestOrderEvents(TestCase):
+    """Тестирование ленты событий заказов"""
+
+    url = reverse("api:orders-events")
+
+    def setUp(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.order = Order.objects.create(table_number="1")
+        with self.captureOnCommitCallbacks(execute=True):
+            Order.transition(self.order.pk, Order.Status.READY)
+
+    async def read_event(self, stream) -> str:
+        return await asyncio.wait_for(anext(stream), timeout=5)
+
+    def test_events_are_recorded_on_commit(self):
+        """Изменения заказа попадают в журнал после фиксации транзакции"""
+        self.assertEqual(
+            list(OrderEvent.objects.values_list("order", "kind", "status")),
+            [
+                (self.order.pk, "created", "PENDING"),
+                (self.order.pk, "status", "READY"),
+            ],
+        )
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.order.delete()
+        self.assertEqual(OrderEvent.objects.count(), 2)
+        callbacks[0]()
+        self.assertEqual(OrderEvent.objects.last().kind, "deleted")
+
+    def test_events_require_asgi(self):
+        """Под WSGI лента событий недоступна"""
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 501)
+
+    async def test_resume_from_last_event_id(self):
+        """С Last-Event-ID выводятся пропущенные события, затем новые"""
+        first, second = [e async for e in OrderEvent.objects.all()]
+        response = await self.async_client.get(
+            self.url, headers={"Last-Event-ID": str(first.id)}
+        )
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        stream = aiter(response.streaming_content)
+        try:
+            chunk = await self.read_event(stream)
+            self.assertTrue(chunk.startswith(b"retry"))
+            chunk = await self.read_event(stream)
+            self.assertTrue(chunk.startswith(f"id: {second.id}\n".encode()))
+            self.assertIn(b"event: status", chunk)
+
+            await sync_to_async(OrderEvent.publish)(
+                [OrderEvent(order_id=self.order.pk, kind="items")]
+            )
+            chunk = await self.read_event(stream)
+            self.assertIn(b"event: items", chunk)
+        finally:
+            await response.streaming_content.aclose()
+
+    async def dispatch(self, hub: OrderEventHub, *ids: int) -> list[int]:
+        """Добавляет события с заданными id и возвращает разосланные id"""
+        queue = asyncio.Queue()
+        hub.subscribers.add(queue)
+        await OrderEvent.objects.abulk_create(
+            OrderEvent(id=pk, order_id=self.order.pk, kind="items")
+            for pk in ids
+        )
+        await hub.dispatch()
+        return [queue.get_nowait().id for _ in range(queue.qsize())]
+
+    @override_settings(ORDER_EVENTS_GAP_TIMEOUT=60)
+    async def test_late_event_with_lower_id_is_dispatched(self):
+        """
+        Событие, зафиксированное позже события с большим id, рассылается
+        первым: рассылка ждёт заполнения пропуска в нумерации
+        """
+        hub = OrderEventHub()
+        hub.last_id = last_id = (await OrderEvent.objects.alast()).id
+        self.assertEqual(await self.dispatch(hub, last_id + 2), [])
+        self.assertEqual(hub.last_id, last_id)
+        self.assertEqual(
+            await self.dispatch(hub, last_id + 1), [last_id + 1, last_id + 2]
+        )
+
+    @override_settings(ORDER_EVENTS_GAP_TIMEOUT=0)
+    async def test_gap_is_skipped_after_timeout(self):
+        """Пропуск id откатанной вставки не останавливает рассылку"""
+        hub = OrderEventHub()
+        hub.last_id = last_id = (await OrderEvent.objects.alast()).id
+        self.assertEqual(await self.dispatch(hub, last_id + 2), [last_id + 2])
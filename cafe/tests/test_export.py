@@ -0,0 +1,120 @@
+import csv
+import io
+import json
+from datetime import timedelta
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from menu.models import Dish
+from orders.export import export_orders, get_export_queryset
+from orders.models import Order
+from orders.services import create_order
+from orders.utils import get_business_date
+
+
+class TestOrderExport(TestCase):
+    """Тестирование выгрузки заказов"""
+
+    url = reverse("api:orders-export")
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.dishes = Dish.objects.bulk_create(
+            [Dish(name=f"блюдо {i}", price=i * 10) for i in range(1, 4)]
+        )
+        cls.orders = [
+            create_order(
+                Order(table_number=str(i)),
+                [{"dish": dish, "quantity": i} for dish in cls.dishes[:i]],
+            )
+            for i in range(4)
+        ]
+        Order.transition(cls.orders[1].pk, Order.Status.PAID)
+
+    def get_content(self, query: str = "") -> str:
+        response = self.client.get(self.url + query)
+        self.assertEqual(response.status_code, 200)
+        return b"".join(response.streaming_content).decode()
+
+    def test_export_ndjson(self):
+        """Строка NDJSON на заказ с позициями"""
+        lines = self.get_content("?format=ndjson").splitlines()
+        orders = [json.loads(line) for line in lines]
+        self.assertEqual(
+            [order["id"] for order in orders], [o.pk for o in self.orders]
+        )
+        self.assertEqual(orders[0]["items"], [])
+        self.assertEqual(
+            orders[2]["items"],
+            [
+                {
+                    "dish_id": dish.pk,
+                    "dish_name": dish.name,
+                    "quantity": 2,
+                    "price": str(dish.price) + ".00",
+                }
+                for dish in self.dishes[:2]
+            ],
+        )
+        self.assertEqual(orders[1]["status"], Order.Status.PAID)
+
+    def test_export_csv(self):
+        """Строка CSV на позицию, заказ без позиций одной строкой"""
+        rows = list(csv.DictReader(io.StringIO(self.get_content())))
+        self.assertEqual(len(rows), 1 + 1 + 2 + 3)
+        self.assertEqual(rows[0]["item_dish_id"], "")
+        self.assertEqual(rows[-1]["id"], str(self.orders[3].pk))
+        self.assertEqual(rows[-1]["item_dish_name"], self.dishes[2].name)
+
+    def test_export_filters(self):
+        """Фильтры по статусу и рабочим дням создания"""
+        lines = self.get_content("?format=ndjson&status=PAID").splitlines()
+        self.assertEqual(len(lines), 1)
+        today = get_business_date(timezone.now())
+        tomorrow = today + timedelta(days=1)
+        self.assertEqual(
+            self.get_content(f"?format=ndjson&from={tomorrow}"), ""
+        )
+        lines = self.get_content(f"?format=ndjson&to={today}").splitlines()
+        self.assertEqual(len(lines), len(self.orders))
+
+    def test_export_invalid_params(self):
+        """Некорректные параметры выгрузки"""
+        for query in (
+            "?format=xml",
+            "?status=NEW",
+            "?from=2025-02-02&to=2025-02-01",
+        ):
+            with self.subTest(query=query):
+                response = self.client.get(self.url + query)
+                self.assertEqual(response.status_code, 400)
+
+    def test_export_queries_per_chunk(self):
+        """Позиции загружаются одним запросом на порцию заказов"""
+        with CaptureQueriesContext(connection) as queries:
+            list(export_orders("ndjson", get_export_queryset(), chunk_size=2))
+        # Курсор заказов и запрос позиций для каждой из двух порций
+        self.assertEqual(len(queries), 3)
+
+    def test_export_command(self):
+        """Команда выгрузки пишет в файл и в стандартный вывод"""
+        stdout = io.StringIO()
+        call_command("export_orders", format="ndjson", stdout=stdout)
+        self.assertEqual(
+            stdout.getvalue(), self.get_content("?format=ndjson")
+        )
+        with TemporaryDirectory() as tmp:
+            path = Path(tmp) / "orders.csv"
+            call_command(
+                "export_orders", output=str(path), stdout=io.StringIO()
+            )
+            self.assertEqual(
+                path.read_bytes().decode(), self.get_content()
+            )
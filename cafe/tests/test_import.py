@@ -0,0 +1,129 @@
+import io
+import json
+from datetime import datetime
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from menu.models import Dish
+from orders.bulk_import import import_orders, read_ndjson
+from orders.export import export_orders, get_export_queryset
+from orders.models import Order, OrderItem, RevenueDaily
+from orders.services import create_order
+from orders.utils import get_business_date
+
+
+class TestOrderImport(TestCase):
+    """Тестирование импорта заказов"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.dishes = Dish.objects.bulk_create(
+            [Dish(name=f"блюдо {i}", price=i * 10) for i in range(1, 4)]
+        )
+
+    def make_record(self, i: int) -> dict:
+        return {
+            "table_number": str(i),
+            "status": "PAID" if i % 2 else "PENDING",
+            "created": f"2025-01-{i % 28 + 1:02}T12:00:00+00:00",
+            "items": [
+                {"dish_id": self.dishes[0].pk, "quantity": 2},
+                {"dish_name": self.dishes[1].name, "price": "5.50"},
+            ],
+        }
+
+    def write_file(self, tmp: str, name: str, records: list[dict]) -> str:
+        path = Path(tmp) / name
+        path.write_text("".join(json.dumps(r) + "\n" for r in records))
+        return str(path)
+
+    def export(self, export_format: str) -> str:
+        return "".join(export_orders(export_format, get_export_queryset()))
+
+    def test_import_order_totals_and_revenue(self):
+        """Итоги заказов, время создания и выручка по импортированным"""
+        list(import_orders([self.make_record(1)]))
+        order = Order.objects.get()
+        self.assertEqual(
+            order.created.isoformat(), "2025-01-02T12:00:00+00:00"
+        )
+        self.assertEqual(order.paid_at, order.created)
+        self.assertEqual(order.item_count, 2)
+        self.assertEqual(order.total_price, self.dishes[0].price * 2 + 5.5)
+        revenue = RevenueDaily.objects.get()
+        self.assertEqual(revenue.total, order.total_price)
+
+    def test_round_trip(self):
+        """Выгрузка импортированных заказов совпадает с исходной"""
+        for i in range(3):
+            create_order(
+                Order(table_number=str(i)),
+                [{"dish": dish, "quantity": 1} for dish in self.dishes[:i]],
+            )
+        for export_format in ("ndjson", "csv"):
+            with self.subTest(export_format=export_format):
+                original = self.read_export()
+                exported = self.export(export_format)
+                Order.objects.all().delete()
+                with TemporaryDirectory() as tmp:
+                    path = Path(tmp) / f"orders.{export_format}"
+                    path.write_bytes(exported.encode())
+                    call_command(
+                        "import_orders", str(path), stdout=io.StringIO()
+                    )
+                self.assertEqual(self.read_export(), original)
+
+    def read_export(self) -> list[dict]:
+        """Выгруженные заказы без id"""
+        records = list(read_ndjson(self.export("ndjson").splitlines()))
+        for record in records:
+            del record["id"]
+        return records
+
+    def test_query_count_does_not_grow(self):
+        """Количество запросов на порцию не зависит от числа заказов"""
+        counts = []
+        # День выручки создаётся заранее, чтобы оба замера его обновляли
+        created = "2025-01-01T12:00:00+00:00"
+        day = get_business_date(datetime.fromisoformat(created))
+        RevenueDaily.add(day, 0, 0)
+        for size in (5, 50):
+            records = [self.make_record(i) for i in range(size)]
+            # Дневные итоги выручки обновляются одним запросом на день
+            for record in records:
+                record["created"] = created
+            with CaptureQueriesContext(connection) as queries:
+                list(import_orders(records, chunk_size=size))
+            counts.append(len(queries))
+        self.assertEqual(counts[0], counts[1])
+        self.assertEqual(OrderItem.objects.count(), 55 * 2)
+
+    def test_resume_after_failure(self):
+        """После ошибки импорт продолжается с сообщённого offset"""
+        records = [self.make_record(i) for i in range(5)]
+        records[3]["items"][0]["dish_id"] = 0
+        with TemporaryDirectory() as tmp:
+            path = self.write_file(tmp, "orders.ndjson", records)
+            with self.assertRaisesMessage(CommandError, "--offset 2"):
+                call_command(
+                    "import_orders", path, chunk_size=2, stdout=io.StringIO()
+                )
+            self.assertEqual(Order.objects.count(), 2)
+            records[3]["items"][0]["dish_id"] = self.dishes[2].pk
+            path = self.write_file(tmp, "orders.ndjson", records)
+            call_command(
+                "import_orders", path, offset=2, stdout=io.StringIO()
+            )
+        self.assertEqual(
+            list(
+                Order.objects.order_by("pk").values_list(
+                    "table_number", flat=True
+                )
+            ),
+            ["0", "1", "2", "3", "4"],
+        )
@@ -0,0 +1,100 @@
+from datetime import date, timedelta
+from io import StringIO
+from unittest import mock
+
+from django.core.management import CommandError, call_command
+from django.db.models import Count, F, Sum
+from django.test import TestCase
+
+from menu.models import Dish
+from orders.models import Order, OrderItem, RevenueDaily
+from orders.utils import get_business_date
+
+
+class TestGenerateLoadData(TestCase):
+    """Тестирование генерации синтетических заказов"""
+
+    end_date = date(2025, 3, 9)
+
+    @classmethod
+    def setUpTestData(cls):
+        Dish.objects.bulk_create(
+            [Dish(name=f"dish_{i}", price=i * 10) for i in range(1, 16)]
+        )
+
+    def generate(self, seed: int = 1, chunk_size: int = 150) -> list[tuple]:
+        call_command(
+            "generate_load_data",
+            orders=500,
+            days=7,
+            seed=seed,
+            end_date=self.end_date,
+            chunk_size=chunk_size,
+            stdout=StringIO(),
+        )
+        return list(
+            Order.objects.order_by("pk").values_list(
+                "table_number", "status", "created", "paid_at", "total_price"
+            )
+        )
+
+    def get_items(self) -> list[tuple]:
+        return list(
+            OrderItem.objects.order_by("pk").values_list("dish", "quantity")
+        )
+
+    def test_generated_orders_are_consistent(self):
+        """Итоги заказов, время создания и выручка согласованы"""
+        self.generate()
+        self.assertEqual(Order.objects.count(), 500)
+        mismatched = Order.objects.annotate(
+            items_total=Sum(F("items__price") * F("items__quantity")),
+            items_count=Count("items"),
+        ).exclude(total_price=F("items_total"), item_count=F("items_count"))
+        self.assertFalse(mismatched.exists())
+
+        created = list(
+            Order.objects.order_by("pk").values_list("created", flat=True)
+        )
+        self.assertEqual(created, sorted(created))
+        days = {get_business_date(value) for value in created}
+        self.assertEqual(
+            days, {self.end_date - timedelta(days=n) for n in range(7)}
+        )
+
+        paid = Order.objects.filter(status=Order.Status.PAID)
+        self.assertGreater(paid.count(), 400)
+        self.assertEqual(
+            RevenueDaily.objects.aggregate(total=Sum("total"))["total"],
+            paid.aggregate(total=Sum("total_price"))["total"],
+        )
+
+    def test_generation_is_deterministic(self):
+        """Одно зерно даёт те же заказы, другое зерно другие"""
+        first = self.generate()
+        items = self.get_items()
+        Order.objects.all().delete()
+        self.assertEqual(self.generate(), first)
+        self.assertEqual(self.get_items(), items)
+        Order.objects.all().delete()
+        self.assertNotEqual(self.generate(seed=2), first)
+
+    @mock.patch("orders.load_data.RNG_BLOCK_SIZE", 100)
+    def test_generation_does_not_depend_on_chunk_size(self):
+        """
+        Порции, начинающиеся внутри блока генератора случайных чисел
+        и на его границе, дают те же заказы
+        """
+        first = self.generate(chunk_size=500)
+        items = self.get_items()
+        for chunk_size in (70, 100, 150):
+            with self.subTest(chunk_size=chunk_size):
+                Order.objects.all().delete()
+                self.assertEqual(self.generate(chunk_size=chunk_size), first)
+                self.assertEqual(self.get_items(), items)
+
+    def test_requires_active_dishes(self):
+        """Без активных блюд генерация невозможна"""
+        Dish.objects.update(is_active=False)
+        with self.assertRaises(CommandError):
+            call_command("generate_load_data", orders=10, stdout=StringIO())
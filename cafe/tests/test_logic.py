@@ -1,11 +1,14 @@
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
 from menu.models import Dish
 from orders.models import Order, OrderItem
+from tests.mixins import ClearCacheMixin
 
 
-class TestOrderLogic(TestCase):
+class TestOrderLogic(ClearCacheMixin, TestCase):
     """Тестирования логики приложения orders"""
 
     name_list = "orders:order_list"
@@ -44,6 +47,38 @@ class TestOrderLogic(TestCase):
         self.assertEqual(Order.objects.count(), count_orders + 1)
         self.assertEqual(OrderItem.objects.count(), count_orderitem + 1)
 
+    def test_order_create_merges_same_dishes(self):
+        """
+        Одинаковые блюда объединяются в одну позицию, позиции записываются
+        одним запросом, итоги заказа рассчитываются при создании
+        """
+        data = {
+            "table_number": 1,
+            "items-TOTAL_FORMS": ["2"],
+            "items-INITIAL_FORMS": ["0"],
+            "items-0-id": [""],
+            "items-0-dish": [f"{self.dish.id}"],
+            "items-0-quantity": ["2"],
+            "items-1-id": [""],
+            "items-1-dish": [f"{self.dish.id}"],
+            "items-1-quantity": ["3"],
+        }
+        url = reverse(self.name_create)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(url, data=data)
+        item_inserts = [
+            q["sql"]
+            for q in queries.captured_queries
+            if q["sql"].startswith('INSERT INTO "orders_orderitem"')
+        ]
+        self.assertRedirects(response, reverse(self.name_list))
+        self.assertEqual(len(item_inserts), 1)
+        order = Order.objects.first()
+        self.assertEqual(order.items.count(), 1)
+        self.assertEqual(order.items.get().quantity, 5)
+        self.assertEqual(order.item_count, 1)
+        self.assertEqual(order.total_price, order.items.get().total_price)
+
     def test_create_order_without_dish(self):
         """Заказ не создается без указания хотя бы одной позиции блюда"""
         data = {"table_number": 1}
@@ -104,11 +139,19 @@ class TestOrderLogic(TestCase):
         self.assertEqual(self.order.status, data["status"])
 
     def test_update_order_status_invalid_data(self):
-        """При указании некорректного статусы вызывается исключение"""
+        """
+        Некорректный статус или недопустимый переход не меняют
+        статус заказа
+        """
         url = reverse(self.name_update_status, args=[self.order.id])
-        data = {"status": "NOT EXISTS"}
-        with self.assertRaises(ValueError):
-            self.client.post(url, data=data)
+        self.order.status = Order.Status.PAID
+        self.order.save()
+        for status in ("NOT EXISTS", Order.Status.PENDING):
+            with self.subTest(status=status):
+                response = self.client.post(url, data={"status": status})
+                self.assertRedirects(response, reverse(self.name_list))
+                self.order.refresh_from_db()
+                self.assertEqual(self.order.status, Order.Status.PAID)
 
     def test_delete_order_is_correct(self):
         """Заказ корректно удаляется"""
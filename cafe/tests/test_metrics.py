@@ -0,0 +1,176 @@
+import os
+import subprocess
+import sys
+import tempfile
+from unittest import mock
+
+from django.conf import settings
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from prometheus_client import REGISTRY, multiprocess
+from prometheus_client.parser import text_string_to_metric_families
+
+from monitoring.metrics import collect_metrics
+from tests.mixins import ClearCacheMixin
+
+# Показатели процесса-воркера: запрос к списку заказов и обращение к кэшу
+WORKER_SCRIPT = """
+import django
+django.setup()
+from monitoring.metrics import (
+    REQUESTS_IN_PROGRESS, observe_request, record_cache_request
+)
+from monitoring.timing import RequestTiming
+timing = RequestTiming(queries=3, db_time=0.01, total_time=0.05)
+observe_request("api:orders-list", "GET", 200, timing)
+record_cache_request("revenue", {hit})
+REQUESTS_IN_PROGRESS.inc()
+"""
+
+
+def parse_samples(content: bytes) -> dict:
+    """Значения показателей по имени и меткам"""
+    return {
+        (sample.name, tuple(sorted(sample.labels.items()))): sample.value
+        for family in text_string_to_metric_families(content.decode())
+        for sample in family.samples
+    }
+
+
+def get_value(name: str, **labels) -> float:
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+class TestMetrics(ClearCacheMixin, TestCase):
+    """Тестирование показателей Prometheus"""
+
+    def test_metrics_endpoint(self):
+        """Показатели в текстовом формате Prometheus"""
+        response = self.client.get(reverse("metrics"))
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response["Content-Type"].startswith("text/plain"))
+        families = {
+            family.name
+            for family in text_string_to_metric_families(
+                response.content.decode()
+            )
+        }
+        self.assertLessEqual(
+            {
+                "cafe_http_request_duration_seconds",
+                "cafe_http_responses",
+                "cafe_http_requests_in_progress",
+                "cafe_db_queries_per_request",
+                "cafe_db_time_per_request_seconds",
+                "cafe_cache_requests",
+                "cafe_cache_hit_ratio",
+            },
+            families,
+        )
+
+    def test_request_metrics(self):
+        """Время запроса и запросы к БД по имени адреса"""
+        view = "api:orders-list"
+        count = get_value(
+            "cafe_http_request_duration_seconds_count",
+            view=view,
+            method="GET",
+        )
+        queries = get_value("cafe_db_queries_per_request_sum", view=view)
+        with CaptureQueriesContext(connection) as captured:
+            self.client.get(reverse(view))
+        self.assertEqual(
+            get_value(
+                "cafe_http_request_duration_seconds_count",
+                view=view,
+                method="GET",
+            ),
+            count + 1,
+        )
+        self.assertEqual(
+            get_value("cafe_db_queries_per_request_sum", view=view),
+            queries + len(captured),
+        )
+        self.assertEqual(get_value("cafe_http_requests_in_progress"), 0)
+
+    def test_unresolved_view(self):
+        """Адреса вне маршрутов учитываются под одной меткой"""
+        before = get_value(
+            "cafe_http_responses_total", view="<unresolved>", status="404"
+        )
+        self.client.get("/no-such-page/")
+        self.assertEqual(
+            get_value(
+                "cafe_http_responses_total", view="<unresolved>", status="404"
+            ),
+            before + 1,
+        )
+
+    def test_cache_hit_ratio(self):
+        """Попадания и промахи кэшей и доля попаданий"""
+        url = reverse("api:orders-revenue")
+        self.client.get(url)
+        self.client.get(url)
+        response = self.client.get(reverse("api:dishes-list"))
+        self.client.get(
+            reverse("api:dishes-list"),
+            headers={"If-None-Match": response["ETag"]},
+        )
+        samples = parse_samples(collect_metrics())
+        for name in ("revenue", "http_conditional"):
+            with self.subTest(cache=name):
+                hits = get_value(
+                    "cafe_cache_requests_total", cache=name, result="hit"
+                )
+                misses = get_value(
+                    "cafe_cache_requests_total", cache=name, result="miss"
+                )
+                self.assertGreater(hits, 0)
+                self.assertAlmostEqual(
+                    samples[("cafe_cache_hit_ratio", (("cache", name),))],
+                    hits / (hits + misses),
+                )
+
+    def test_multiprocess_aggregation(self):
+        """Показатели воркеров складываются из файлов общего каталога"""
+        with tempfile.TemporaryDirectory() as directory:
+            env = {
+                **os.environ,
+                "PROMETHEUS_MULTIPROC_DIR": directory,
+                "DJANGO_SETTINGS_MODULE": "cafe.settings",
+            }
+            workers = [
+                subprocess.Popen(
+                    [sys.executable, "-c", WORKER_SCRIPT.format(hit=hit)],
+                    cwd=settings.BASE_DIR,
+                    env=env,
+                )
+                for hit in (True, True, False)
+            ]
+            for worker in workers:
+                self.assertEqual(worker.wait(timeout=60), 0)
+            # Так gunicorn.conf.py отмечает завершённый воркер
+            multiprocess.mark_process_dead(workers[0].pid, directory)
+            with mock.patch.dict(
+                os.environ, {"PROMETHEUS_MULTIPROC_DIR": directory}
+            ):
+                samples = parse_samples(collect_metrics())
+        view = (("method", "GET"), ("view", "api:orders-list"))
+        self.assertEqual(
+            samples[("cafe_http_request_duration_seconds_count", view)], 3
+        )
+        self.assertEqual(
+            samples[
+                (
+                    "cafe_db_queries_per_request_sum",
+                    (("view", "api:orders-list"),),
+                )
+            ],
+            9,
+        )
+        self.assertEqual(samples[("cafe_http_requests_in_progress", ())], 2)
+        self.assertAlmostEqual(
+            samples[("cafe_cache_hit_ratio", (("cache", "revenue"),))], 2 / 3
+        )
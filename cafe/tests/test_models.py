@@ -1,10 +1,22 @@
-from django.test import TestCase
+from datetime import date, datetime
+from datetime import timezone as dt_timezone
+from io import StringIO
+from zoneinfo import ZoneInfo
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import IntegrityError
+from django.test import TestCase, override_settings
+from django.utils import timezone
 
 from menu.models import Dish
-from orders.models import Order, OrderItem
+from orders.checks import check_shared_cache
+from orders.models import Order, OrderEvent, OrderItem, RevenueDaily
+from orders.utils import get_business_date, get_day_bounds
+from tests.mixins import ClearCacheMixin
 
 
-class TestOrderModel(TestCase):
+class TestOrderModel(ClearCacheMixin, TestCase):
     """Тестирование моделей Order & OrderItem"""
 
     periods = ("all_time", "month", "week", "today")
@@ -55,3 +67,259 @@ class TestOrderModel(TestCase):
             with self.subTest(period=period):
                 self.assertIn(period, revenue)
                 self.assertEqual(revenue[period], expected)
+
+    def test_order_totals_are_maintained(self):
+        """
+        Общая сумма и количество позиций заказа обновляются при добавлении,
+        объединении, изменении и удалении позиций
+        """
+        dish_1, dish_2 = self.dishes
+        order = Order.objects.create(table_number="2")
+        item = OrderItem.objects.create(order=order, dish=dish_1, quantity=2)
+        OrderItem.objects.create(order=order, dish=dish_1, quantity=1)
+        OrderItem.objects.create(order=order, dish=dish_2, quantity=1)
+        cases = (
+            (dish_1.price * 3 + dish_2.price, 2),
+            (dish_1.price * 5 + dish_2.price, 2),
+            (dish_2.price, 1),
+        )
+        for step, (total_price, item_count) in enumerate(cases):
+            if step == 1:
+                item.refresh_from_db()
+                item.quantity = 5
+                item.save()
+            elif step == 2:
+                item.delete()
+            with self.subTest(step=step):
+                order.refresh_from_db()
+                self.assertEqual(order.total_price, total_price)
+                self.assertEqual(order.item_count, item_count)
+
+    def test_order_save_does_not_overwrite_totals(self):
+        """Сохранение заказа не перезаписывает итоги устаревшими значениями"""
+        order = Order.objects.create(table_number="2")
+        stale_order = Order.objects.get(pk=order.pk)
+        OrderItem.objects.create(order=order, dish=self.dishes[0])
+        stale_order.status = Order.Status.READY
+        stale_order.save()
+        order.refresh_from_db()
+        self.assertEqual(order.total_price, self.dishes[0].price)
+        self.assertEqual(order.item_count, 1)
+
+    def test_recalculate_order_totals_command(self):
+        """Команда recalculate_order_totals находит и исправляет итоги"""
+        command = "recalculate_order_totals"
+        with self.assertRaises(CommandError):
+            call_command(command, "--check", stdout=StringIO())
+        call_command(command, stdout=StringIO())
+        call_command(command, "--check", stdout=StringIO())
+        self.order.refresh_from_db()
+        self.assertEqual(
+            self.order.total_price, sum(i.price for i in self.dishes)
+        )
+        self.assertEqual(self.order.item_count, len(self.dishes))
+
+    def test_saving_same_dish_increments_existing_item(self):
+        """
+        Сохранение позиции с уже добавленным блюдом увеличивает количество
+        существующей позиции без чтения и создания дубликата
+        """
+        dish = self.dishes[0]
+        item = OrderItem.objects.get(order=self.order, dish=dish)
+        with self.assertNumQueries(6):
+            OrderItem(order=self.order, dish=dish, quantity=2).save()
+        item.refresh_from_db()
+        self.assertEqual(item.quantity, 3)
+        self.assertEqual(self.order.items.filter(dish=dish).count(), 1)
+
+    def test_changing_dish_to_existing_merges_items(self):
+        """
+        Замена блюда позиции на уже добавленное в заказ объединяет позиции
+        """
+        dish_1, dish_2 = self.dishes
+        item = OrderItem.objects.get(order=self.order, dish=dish_1)
+        item.dish = dish_2
+        item.save()
+        self.assertEqual(
+            list(self.order.items.values_list("dish", "quantity")),
+            [(dish_2.id, 2)],
+        )
+
+    def test_duplicate_dish_is_rejected_by_database(self):
+        """БД не допускает двух позиций заказа с одним блюдом"""
+        with self.assertRaises(IntegrityError):
+            OrderItem.objects.bulk_create(
+                [OrderItem(order=self.order, dish=self.dishes[0], price=1)]
+            )
+
+
+class TestRevenueDaily(ClearCacheMixin, TestCase):
+    """Тестирование дневных итогов выручки"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.dish = Dish.objects.create(name="dish", price=100)
+        cls.order = Order.objects.create(table_number="1")
+        OrderItem.objects.create(order=cls.order, dish=cls.dish, quantity=2)
+
+    def assert_revenue(self, total, order_count):
+        today = RevenueDaily.objects.filter(date=timezone.localdate())
+        self.assertEqual(
+            list(today.values_list("total", "order_count")),
+            [(total, order_count)],
+        )
+        self.assertEqual(
+            Order.get_total_revenue_for_periods()["today"], total
+        )
+
+    def test_revenue_follows_status_changes(self):
+        """Выручка учитывает заказ при оплате и исключает при её отмене"""
+        self.order.status = Order.Status.PAID
+        self.order.save()
+        self.assert_revenue(200, 1)
+        self.order.save()
+        self.assert_revenue(200, 1)
+        self.order.status = Order.Status.READY
+        self.order.save()
+        self.assert_revenue(0, 0)
+
+    def test_status_transitions(self):
+        """
+        Переход статуса выполняется одним условным UPDATE, недопустимый
+        переход не применяется, оплата и её отмена меняют выручку
+        """
+        pk = self.order.pk
+        with self.assertNumQueries(1):
+            self.assertTrue(Order.transition(pk, Order.Status.READY))
+        self.assertFalse(Order.transition(pk, Order.Status.READY))
+        self.assertTrue(Order.transition(pk, Order.Status.PAID))
+        self.assert_revenue(200, 1)
+        self.assertIsNotNone(Order.objects.get(pk=pk).paid_at)
+        self.assertFalse(Order.transition(pk, Order.Status.PENDING))
+        self.assertTrue(Order.transition(pk, Order.Status.READY))
+        self.assert_revenue(0, 0)
+        self.assertIsNone(Order.objects.get(pk=pk).paid_at)
+        self.assertFalse(Order.transition(0, Order.Status.PAID))
+
+    def test_revenue_follows_paid_order_items(self):
+        """Изменение позиций и удаление оплаченного заказа меняют выручку"""
+        self.order.status = Order.Status.PAID
+        self.order.save()
+        OrderItem.objects.create(order=self.order, dish=self.dish)
+        self.assert_revenue(300, 1)
+        self.order.delete()
+        self.assert_revenue(0, 0)
+
+    def test_stale_paid_order_save_keeps_revenue(self):
+        """
+        Сохранение устаревшего экземпляра оплаченного заказа не меняет
+        выручку по сумме заказа из памяти
+        """
+        self.order.status = Order.Status.PAID
+        self.order.save()
+        stale = Order.objects.get(pk=self.order.pk)
+        OrderItem.objects.create(order=self.order, dish=self.dish)
+        self.assert_revenue(300, 1)
+        stale.table_number = "2"
+        stale.save()
+        self.assert_revenue(300, 1)
+        self.assertEqual(Order.objects.get(pk=stale.pk).total_price, 300)
+        stale.status = Order.Status.READY
+        stale.save()
+        self.assert_revenue(0, 0)
+
+    def test_stale_paid_order_delete_uses_stored_totals(self):
+        """
+        Удаление устаревшего экземпляра оплаченного заказа исключает из
+        выручки сохранённую сумму, а после отмены оплаты не меняет её
+        """
+        self.order.status = Order.Status.PAID
+        self.order.save()
+        stale = Order.objects.get(pk=self.order.pk)
+        OrderItem.objects.create(order=self.order, dish=self.dish)
+        self.assert_revenue(300, 1)
+        stale.delete()
+        self.assert_revenue(0, 0)
+
+        order = Order.objects.create(table_number="2")
+        OrderItem.objects.create(order=order, dish=self.dish)
+        order.status = Order.Status.PAID
+        order.save()
+        stale = Order.objects.get(pk=order.pk)
+        Order.transition(order.pk, Order.Status.READY)
+        with self.captureOnCommitCallbacks(execute=True):
+            stale.delete()
+        self.assert_revenue(0, 0)
+        event = OrderEvent.objects.get(
+            order_id=order.pk, kind=OrderEvent.Kind.DELETED
+        )
+        self.assertEqual(event.status, Order.Status.READY)
+
+    def test_rebuild_revenue_command(self):
+        """Пересоздание итогов совпадает с накопленными итогами"""
+        self.order.status = Order.Status.PAID
+        self.order.save()
+        today = timezone.localdate().isoformat()
+        expected = list(RevenueDaily.objects.values("date", "total"))
+        for args in ((), ("--from", today, "--to", today)):
+            with self.subTest(args=args):
+                RevenueDaily.objects.all().delete()
+                call_command("rebuild_revenue", *args, stdout=StringIO())
+                self.assertEqual(
+                    list(RevenueDaily.objects.values("date", "total")),
+                    expected,
+                )
+
+    def test_paid_at_is_fixed_at_payment(self):
+        """
+        Время оплаты устанавливается при оплате, не меняется при изменении
+        оплаченного заказа и сбрасывается при отмене оплаты
+        """
+        self.order.status = Order.Status.PAID
+        self.order.save()
+        paid_at = self.order.paid_at
+        self.assertIsNotNone(paid_at)
+        order = Order.objects.get(pk=self.order.pk)
+        order.table_number = "2"
+        order.save()
+        self.assertEqual(order.paid_at, paid_at)
+        order.status = Order.Status.READY
+        order.save()
+        order.refresh_from_db()
+        self.assertIsNone(order.paid_at)
+
+    @override_settings(CAFE_TIME_ZONE="Europe/Moscow", CAFE_DAY_START="06:00")
+    def test_business_day_boundaries(self):
+        """
+        Рабочий день считается в часовом поясе кафе с учётом начала дня,
+        границы периода образуют полуинтервал
+        """
+        tz, utc = ZoneInfo("Europe/Moscow"), dt_timezone.utc
+        cases = (
+            (datetime(2025, 1, 10, 5, 59, tzinfo=tz), date(2025, 1, 9)),
+            (datetime(2025, 1, 10, 6, 0, tzinfo=tz), date(2025, 1, 10)),
+            (datetime(2025, 1, 10, 2, 0, tzinfo=utc), date(2025, 1, 9)),
+        )
+        for value, expected in cases:
+            with self.subTest(value=value):
+                self.assertEqual(get_business_date(value), expected)
+        start, end = get_day_bounds(date(2025, 1, 10), date(2025, 1, 11))
+        self.assertEqual(start, datetime(2025, 1, 10, 6, 0, tzinfo=tz))
+        self.assertEqual(end, datetime(2025, 1, 11, 6, 0, tzinfo=tz))
+
+
+class TestSharedCacheCheck(TestCase):
+    """Тестирование проверки общего кэша для развёртывания"""
+
+    def test_process_local_cache_is_rejected(self):
+        """Кэш в памяти процесса отклоняется, общий кэш допускается"""
+        locmem = "django.core.cache.backends.locmem.LocMemCache"
+        redis = "django.core.cache.backends.redis.RedisCache"
+        for backend, errors in ((locmem, ["orders.E001"]), (redis, [])):
+            caches = {"default": {"BACKEND": backend}}
+            with self.subTest(backend=backend), override_settings(
+                CACHES=caches
+            ):
+                self.assertEqual(
+                    [error.id for error in check_shared_cache(None)], errors
+                )
@@ -0,0 +1,115 @@
+import json
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from menu.models import Dish
+from monitoring.timing import get_slow_requests
+from orders.models import Order
+from orders.services import create_order
+from tests.mixins import ClearCacheMixin
+
+User = get_user_model()
+
+
+def parse_server_timing(header: str) -> dict[str, dict[str, str]]:
+    """Метрики заголовка Server-Timing: имя и параметры"""
+    metrics = {}
+    for metric in header.split(", "):
+        name, *params = metric.split(";")
+        metrics[name] = dict(param.split("=", 1) for param in params)
+    return metrics
+
+
+class TestRequestTiming(ClearCacheMixin, TestCase):
+    """Тестирование учёта времени обработки запросов"""
+
+    @classmethod
+    def setUpTestData(cls):
+        dishes = Dish.objects.bulk_create(
+            [Dish(name=f"dish_{i}", price=i * 10) for i in range(1, 4)]
+        )
+        create_order(
+            Order(table_number="1"),
+            [{"dish": dish, "quantity": 1} for dish in dishes],
+        )
+        cls.staff = User.objects.create_user("staff", is_staff=True)
+        cls.user = User.objects.create_user("user")
+
+    def test_server_timing(self):
+        """Заголовок Server-Timing с количеством запросов к БД"""
+        for name in ("menu:dish_list", "api:orders-list"):
+            with self.subTest(name=name):
+                with CaptureQueriesContext(connection) as queries:
+                    response = self.client.get(reverse(name))
+                metrics = parse_server_timing(response["Server-Timing"])
+                self.assertEqual(set(metrics), {"db", "render", "total"})
+                self.assertEqual(
+                    metrics["db"]["desc"], f'"{len(queries)} queries"'
+                )
+                self.assertGreater(float(metrics["render"]["dur"]), 0)
+                self.assertGreaterEqual(
+                    float(metrics["total"]["dur"]),
+                    float(metrics["db"]["dur"]),
+                )
+
+    async def test_server_timing_async(self):
+        """Запросы ORM асинхронного представления тоже учитываются"""
+        response = await self.async_client.get(
+            reverse("api:async-orders-list")
+        )
+        metrics = parse_server_timing(response["Server-Timing"])
+        self.assertRegex(metrics["db"]["desc"], r'^"[1-9]\d* queries"$')
+
+    def test_log_line(self):
+        """Строка журнала в формате JSON на каждый запрос"""
+        with self.assertLogs("monitoring.requests", "INFO") as logs:
+            self.client.get(reverse("menu:dish_list"))
+        (record,) = logs.records
+        fields = json.loads(record.getMessage())
+        self.assertEqual(fields, record.timing)
+        self.assertEqual(fields["path"], reverse("menu:dish_list"))
+        self.assertEqual(fields["view"], "menu:dish_list")
+        self.assertEqual(fields["status"], 200)
+        self.assertEqual(
+            set(fields) - {"method", "path", "view", "status"},
+            {"total_ms", "db_ms", "db_queries", "render_ms"},
+        )
+
+    @override_settings(SLOW_REQUEST_THRESHOLD=10**6)
+    def test_fast_request_is_not_saved(self):
+        """Быстрые запросы не попадают в буфер медленных"""
+        self.client.get(reverse("menu:dish_list"))
+        self.assertEqual(get_slow_requests(), [])
+
+    @override_settings(SLOW_REQUEST_THRESHOLD=0, SLOW_REQUESTS_BUFFER_SIZE=3)
+    def test_slow_requests_buffer(self):
+        """Буфер хранит последние медленные запросы вместе с SQL"""
+        url = reverse("api:orders-list")
+        with self.assertLogs("monitoring.requests", "WARNING"):
+            for table_number in range(5):
+                self.client.get(url, {"table_number": table_number})
+        entries = get_slow_requests()
+        self.assertEqual([entry["number"] for entry in entries], [5, 4, 3])
+        self.assertEqual(entries[0]["view"], "api:orders-list")
+        self.assertEqual(len(entries[0]["sql"]), entries[0]["db_queries"])
+        self.assertIn("orders_order", entries[0]["sql"][0][0])
+
+    @override_settings(SLOW_REQUEST_THRESHOLD=0)
+    def test_slow_requests_page(self):
+        """Страница медленных запросов доступна только персоналу"""
+        url = reverse("monitoring:slow_requests")
+        with self.assertLogs("monitoring.requests", "WARNING"):
+            self.client.get(reverse("api:orders-list"))
+            self.assertEqual(self.client.get(url).status_code, 302)
+            self.client.force_login(self.user)
+            self.assertEqual(self.client.get(url).status_code, 302)
+            self.client.force_login(self.staff)
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, reverse("api:orders-list"))
+        self.assertContains(response, "orders_order")
+        self.assertContains(response, "показаны только запросы воркера")
@@ -0,0 +1,139 @@
+import io
+import marshal
+import shutil
+import tempfile
+import zipfile
+from pathlib import Path
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from menu.models import Dish
+from orders.models import Order
+from orders.services import create_order
+
+User = get_user_model()
+SECRET = "profile-secret"
+
+
+class TestProfiling(TestCase):
+    """Тестирование профилирования запросов по требованию"""
+
+    @classmethod
+    def setUpTestData(cls):
+        dishes = Dish.objects.bulk_create(
+            [Dish(name=f"dish_{i}", price=i * 10) for i in range(1, 4)]
+        )
+        for i in range(3):
+            create_order(
+                Order(table_number=str(i)),
+                [{"dish": dish, "quantity": 1} for dish in dishes],
+            )
+        cls.staff = User.objects.create_user("staff", is_staff=True)
+        cls.user = User.objects.create_user("user")
+
+    def setUp(self):
+        self.directory = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.directory)
+        settings = override_settings(
+            PROFILING_SECRET=SECRET, PROFILING_DIR=self.directory
+        )
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+    def download(self, url: str) -> zipfile.ZipFile:
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        content = b"".join(response.streaming_content)
+        return zipfile.ZipFile(io.BytesIO(content))
+
+    def test_profile_by_header(self):
+        """Профиль списка заказов по заголовку X-Profile"""
+        self.client.force_login(self.staff)
+        response = self.client.get(
+            reverse("orders:order_list"), headers={"X-Profile": SECRET}
+        )
+        self.assertEqual(response.status_code, 200)
+        archive = self.download(response["X-Profile"])
+        self.assertEqual(
+            set(archive.namelist()),
+            {"stats.prof", "report.txt", "allocations.txt"},
+        )
+        stats = marshal.loads(archive.read("stats.prof"))
+        functions = {function for _, _, function in stats}
+        self.assertIn("get_queryset", functions)
+        report = archive.read("report.txt").decode()
+        self.assertIn("orders:order_list", report)
+        self.assertIn("called...", report)
+        allocations = archive.read("allocations.txt").decode()
+        self.assertIn("Выделение памяти по строкам кода", allocations)
+
+    def test_profile_by_query_param(self):
+        """Профиль API списка заказов по параметру profile"""
+        self.client.force_login(self.staff)
+        response = self.client.get(
+            reverse("api:orders-list"), {"profile": SECRET}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()["results"]), 3)
+        archive = self.download(response["X-Profile"])
+        self.assertIn("api:orders-list", archive.read("report.txt").decode())
+
+    def test_profiling_is_restricted(self):
+        """Без секрета или прав персонала запрос не профилируется"""
+        url = reverse("api:orders-list")
+        cases = (
+            (None, SECRET, None),
+            (self.user, SECRET, None),
+            (self.staff, "wrong", None),
+            (self.staff, SECRET, ""),
+        )
+        for user, value, secret in cases:
+            with self.subTest(user=user, value=value, secret=secret):
+                self.client.logout()
+                if user:
+                    self.client.force_login(user)
+                with override_settings(
+                    PROFILING_SECRET=SECRET if secret is None else secret
+                ):
+                    response = self.client.get(
+                        url, headers={"X-Profile": value}
+                    )
+                self.assertEqual(response.status_code, 200)
+                self.assertNotIn("X-Profile", response)
+        self.assertEqual(list(self.directory.iterdir()), [])
+
+    @override_settings(PROFILING_MAX_ARTIFACTS=2)
+    def test_profiles_page_and_pruning(self):
+        """Список профилей хранит только последние архивы"""
+        self.client.force_login(self.staff)
+        names = []
+        for _ in range(3):
+            response = self.client.get(
+                reverse("api:orders-revenue"), headers={"X-Profile": SECRET}
+            )
+            names.append(response["X-Profile"].rsplit("/", 1)[1])
+        self.assertEqual(
+            {path.name for path in self.directory.iterdir()}, set(names[1:])
+        )
+        response = self.client.get(reverse("monitoring:profiles"))
+        self.assertContains(response, names[2])
+        self.assertNotContains(response, names[0])
+
+    def test_download_is_restricted(self):
+        """Архивы профилей доступны только персоналу"""
+        self.client.force_login(self.staff)
+        response = self.client.get(
+            reverse("api:orders-list"), headers={"X-Profile": SECRET}
+        )
+        url = response["X-Profile"]
+        self.client.force_login(self.user)
+        self.assertEqual(self.client.get(url).status_code, 302)
+        self.client.force_login(self.staff)
+        for name in ("missing.zip", "..%2Fsettings.py"):
+            with self.subTest(name=name):
+                response = self.client.get(
+                    reverse("monitoring:profile_download", args=[name])
+                )
+                self.assertEqual(response.status_code, 404)
@@ -0,0 +1,284 @@
+import re
+from collections import Counter
+from collections.abc import Callable
+from datetime import timedelta
+from importlib import import_module
+from typing import NamedTuple
+
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLResolver, reverse
+from django.utils import timezone
+
+from menu.models import Dish
+from orders.load_data import LoadPlan, write_chunk
+from orders.models import Order
+from orders.services import create_order
+from orders.utils import get_business_date
+
+# Модули маршрутов, каждый адрес которых должен иметь бюджет запросов
+URLCONFS = {"menu": "menu.urls", "orders": "orders.urls", "api": "api.urls"}
+SMALL_DATASET = 10
+# Точки сохранения появляются из-за транзакции теста и не учитываются
+SAVEPOINT_PATTERN = re.compile(r"^(RELEASE |ROLLBACK TO )?SAVEPOINT\b")
+LARGE_DATASET = 1000
+
+
+class Endpoint(NamedTuple):
+    """
+    Запрос к адресу и его бюджет: наибольшее количество запросов к БД.
+    Параметр pk подставляет в адрес id заказа ("order") или блюда ("dish"),
+    data строит тело запроса по заказу и блюду.
+    """
+
+    name: str
+    budget: int
+    method: str = "get"
+    pk: str | None = None
+    query: str = ""
+    data: Callable[[Order, Dish], dict] | None = None
+    status: int = 200
+
+
+ENDPOINTS = (
+    # Страницы приложения menu
+    Endpoint("menu:dish_list", 2),
+    Endpoint("menu:dish_detail", 1, pk="dish"),
+    # Страницы приложения orders
+    Endpoint("orders:order_list", 3),
+    Endpoint("orders:order_list", 4, query="?page=1"),
+    Endpoint("orders:order_create", 1),
+    Endpoint("orders:order_edit", 3, pk="order"),
+    Endpoint(
+        "orders:order_update_status",
+        1,
+        method="post",
+        pk="order",
+        data=lambda order, dish: {"status": Order.Status.READY},
+        status=302,
+    ),
+    Endpoint("orders:order_delete", 4, method="post", pk="order", status=302),
+    Endpoint("orders:revenue", 1),
+    # API
+    Endpoint("api:api-root", 0),
+    Endpoint("api:orders-list", 3),
+    Endpoint("api:orders-list", 1, query="?items=false"),
+    Endpoint("api:orders-list", 3, query="?status=PAID&table_number=1"),
+    Endpoint(
+        "api:orders-list",
+        4,
+        method="post",
+        data=lambda order, dish: {
+            "table_number": "5",
+            "items": [{"dish": dish.pk, "quantity": 2}],
+        },
+        status=201,
+    ),
+    Endpoint("api:orders-detail", 4, pk="order"),
+    Endpoint("api:orders-detail", 2, pk="order", query="?items=false"),
+    Endpoint(
+        "api:orders-detail",
+        6,
+        method="patch",
+        pk="order",
+        data=lambda order, dish: {"table_number": "7"},
+    ),
+    Endpoint(
+        "api:orders-detail", 4, method="delete", pk="order", status=204
+    ),
+    Endpoint(
+        "api:orders-change-status",
+        1,
+        method="patch",
+        pk="order",
+        data=lambda order, dish: {"status": Order.Status.READY},
+        status=201,
+    ),
+    Endpoint(
+        "api:orders-bulk-status",
+        2,
+        method="patch",
+        data=lambda order, dish: {
+            "ids": [order.pk],
+            "status": Order.Status.READY,
+        },
+    ),
+    Endpoint(
+        "api:orders-bulk-delete",
+        3,
+        method="post",
+        data=lambda order, dish: {"ids": [order.pk]},
+    ),
+    Endpoint("api:orders-revenue", 1),
+    Endpoint("api:orders-revenue-series", 1),
+    Endpoint("api:orders-revenue-series", 1, query="?bucket=hour"),
+    Endpoint("api:orders-revenue-cache-stats", 0),
+    Endpoint("api:dishes-list", 2),
+    Endpoint("api:dishes-detail", 1, pk="dish"),
+    # Под WSGI лента событий отвечает 501 без запросов к БД
+    Endpoint("api:orders-events", 0, status=501),
+    Endpoint("api:orders-export", 2),
+    Endpoint("api:orders-export", 2, query="?format=ndjson&status=PAID"),
+    Endpoint("api:async-orders-list", 3),
+    Endpoint("api:async-orders-list", 1, query="?items=false"),
+    Endpoint("api:async-orders-detail", 4, pk="order"),
+    Endpoint("api:async-orders-revenue", 1),
+    Endpoint("api:async-dishes-list", 2),
+)
+
+
+def get_url_names(namespace: str, urlconf: str) -> set[str]:
+    """Имена всех адресов модуля маршрутов, включая вложенные"""
+    names = set()
+
+    def walk(patterns):
+        for pattern in patterns:
+            if isinstance(pattern, URLResolver):
+                walk(pattern.url_patterns)
+            elif pattern.name:
+                names.add(f"{namespace}:{pattern.name}")
+
+    walk(import_module(urlconf).urlpatterns)
+    return names
+
+
+def normalize_sql(sql: str) -> str:
+    """Шаблон запроса: числа и строки заменены на ?, списки IN свёрнуты"""
+    sql = re.sub(r"'(?:[^']|'')*'", "?", sql)
+    sql = re.sub(r"\b\d+(?:\.\d+)?\b", "?", sql)
+    return re.sub(r"\bIN \((?:\?, )*\?\)", "IN (...)", sql)
+
+
+def get_duplicates(queries: list[str]) -> dict[str, int]:
+    """Шаблоны запросов, выполненных больше одного раза"""
+    counts = Counter(normalize_sql(sql) for sql in queries)
+    return {sql: count for sql, count in counts.items() if count > 1}
+
+
+def format_queries(queries: list[str]) -> str:
+    """Отчёт о запросах для сообщения об ошибке: сначала повторы"""
+    lines = [
+        f"повторяется {count} раз: {sql}"
+        for sql, count in get_duplicates(queries).items()
+    ]
+    lines += [f"{number}. {sql}" for number, sql in enumerate(queries, 1)]
+    return "\n".join(lines)
+
+
+class TestQueryBudget(TestCase):
+    """
+    Тестирование количества запросов к БД каждого адреса на 10 и 1000
+    заказах: запросов не больше бюджета, их количество не зависит
+    от количества заказов, одинаковые запросы не повторяются
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        dishes = Dish.objects.bulk_create(
+            [Dish(name=f"dish_{i:02}", price=i * 10) for i in range(1, 21)]
+        )
+        cls.dish = dishes[0]
+        # Заказ, с которым работают запросы на изменение
+        cls.order = create_order(
+            Order(table_number="1"),
+            [{"dish": dish, "quantity": 1} for dish in dishes[:3]],
+        )
+        # Остальные заказы создаются генератором с id после этого заказа
+        cls.plan = LoadPlan.build(
+            seed=0,
+            orders=LARGE_DATASET - 1,
+            days=30,
+            end_date=get_business_date(timezone.now()) - timedelta(days=1),
+            dishes=[(dish.pk, dish.price) for dish in dishes],
+            tables=20,
+            start_id=cls.order.pk + 1,
+        )
+        write_chunk(cls.plan, 0, SMALL_DATASET - 1)
+
+    def add_orders(self):
+        """Дополняет набор данных до LARGE_DATASET заказов"""
+        write_chunk(
+            self.plan, SMALL_DATASET - 1, LARGE_DATASET - SMALL_DATASET
+        )
+        self.assertEqual(Order.objects.count(), LARGE_DATASET)
+
+    def get_url(self, endpoint: Endpoint) -> str:
+        args = None
+        if endpoint.pk:
+            args = [getattr(self, endpoint.pk).pk]
+        return reverse(endpoint.name, args=args) + endpoint.query
+
+    def capture(self, endpoint: Endpoint) -> list[str]:
+        """
+        SQL запросов, выполненных при обращении к адресу с пустым кэшем.
+        Изменения данных откатываются, чтобы набор данных не менялся.
+        """
+        cache.clear()
+        request = getattr(self.client, endpoint.method)
+        kwargs = {}
+        if endpoint.data:
+            kwargs["data"] = endpoint.data(self.order, self.dish)
+            if endpoint.name.startswith("api:"):
+                kwargs["content_type"] = "application/json"
+        with transaction.atomic():
+            with CaptureQueriesContext(connection) as context:
+                response = request(self.get_url(endpoint), **kwargs)
+                if response.streaming:
+                    b"".join(response.streaming_content)
+            transaction.set_rollback(True)
+        self.assertEqual(response.status_code, endpoint.status)
+        return [
+            query["sql"]
+            for query in context.captured_queries
+            if not SAVEPOINT_PATTERN.match(query["sql"])
+        ]
+
+    def test_every_url_has_budget(self):
+        """Для каждого адреса приложений объявлен бюджет запросов"""
+        names = set()
+        for namespace, urlconf in URLCONFS.items():
+            names |= get_url_names(namespace, urlconf)
+        budgeted = {endpoint.name for endpoint in ENDPOINTS}
+        self.assertEqual(names - budgeted, set(), "Адреса без бюджета")
+        self.assertEqual(budgeted - names, set(), "Бюджеты без адресов")
+
+    def test_query_budget(self):
+        """Количество запросов в пределах бюджета и не зависит от данных"""
+        small = [self.capture(endpoint) for endpoint in ENDPOINTS]
+        self.add_orders()
+        for endpoint, small_queries in zip(ENDPOINTS, small):
+            with self.subTest(
+                endpoint=endpoint.name,
+                method=endpoint.method,
+                query=endpoint.query,
+            ):
+                queries = self.capture(endpoint)
+                self.assertEqual(
+                    len(queries),
+                    len(small_queries),
+                    "Количество запросов растёт с количеством заказов:\n"
+                    + format_queries(queries),
+                )
+                self.assertLessEqual(
+                    len(queries),
+                    endpoint.budget,
+                    "Превышен бюджет запросов:\n" + format_queries(queries),
+                )
+                self.assertEqual(
+                    get_duplicates(queries),
+                    {},
+                    "Повторяющиеся запросы:\n" + format_queries(queries),
+                )
+
+    def test_duplicates_are_reported(self):
+        """Запросы N+1 различаются только параметрами и считаются повтором"""
+        orders = Order.objects.order_by("pk")[:5]
+        with CaptureQueriesContext(connection) as context:
+            for order in orders:
+                list(order.items.all())
+        queries = [query["sql"] for query in context.captured_queries]
+        duplicates = get_duplicates(queries)
+        self.assertEqual(list(duplicates.values()), [5])
+        self.assertIn("повторяется 5 раз", format_queries(queries))
@@ -0,0 +1,50 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from orders.models import Order
+from orders.query_plans import explain_queries, get_hot_queries
+
+
+class TestOrderQueryPlans(TestCase):
+    """Тестирование планов основных запросов к заказам"""
+
+    @classmethod
+    def setUpTestData(cls):
+        # Большая часть заказов оплачена, как в рабочей базе кафе
+        now = timezone.now()
+        statuses = [Order.Status.PAID] * 8 + [
+            Order.Status.PENDING,
+            Order.Status.READY,
+        ]
+        orders = []
+        for i in range(3000):
+            status = statuses[i % len(statuses)]
+            orders.append(
+                Order(
+                    table_number=str(i % 30),
+                    status=status,
+                    paid_at=(
+                        now - timedelta(hours=i)
+                        if status == Order.Status.PAID
+                        else None
+                    ),
+                )
+            )
+        Order.objects.bulk_create(orders)
+
+    def test_hot_queries_use_indexes(self):
+        """Основные запросы к заказам не просматривают таблицу целиком"""
+        call_command("check_query_plans", analyze=True, stdout=StringIO())
+        for query_plan in explain_queries(get_hot_queries()):
+            with self.subTest(query=query_plan.name):
+                self.assertFalse(query_plan.sequential_scan, query_plan.plan)
+
+    def test_sequential_scan_is_detected(self):
+        """Запрос по полю без индекса определяется как полный просмотр"""
+        queries = {"По сумме": Order.objects.filter(total_price=10).order_by()}
+        (query_plan,) = explain_queries(queries)
+        self.assertTrue(query_plan.sequential_scan, query_plan.plan)
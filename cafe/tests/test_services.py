@@ -0,0 +1,174 @@
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from menu.models import Dish
+from orders.models import Order, OrderEvent, OrderItem, RevenueDaily
+from orders.services import (
+    BulkResult,
+    bulk_change_status,
+    bulk_delete_orders,
+    create_order,
+    sync_items,
+)
+from orders.utils import get_business_date
+
+
+class TestOrderServices(TestCase):
+    """Тестирование сервисного слоя записи заказов"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.dishes = Dish.objects.bulk_create(
+            [Dish(name=f"dish_{i}", price=i * 10) for i in range(1, 121)]
+        )
+
+    def make_items(self, dishes, quantity=1):
+        return [{"dish": dish.id, "quantity": quantity} for dish in dishes]
+
+    def count_sync_queries(self, size: int) -> int:
+        """
+        Количество запросов при синхронизации заказа из size позиций:
+        часть количеств меняется, часть позиций удаляется и добавляется
+        """
+        dishes = self.dishes[: size * 2]
+        order = create_order(
+            Order(table_number="1"), self.make_items(dishes[:size])
+        )
+        order = Order.objects.get(pk=order.pk)
+        half = size // 2
+        items = self.make_items(dishes[:half], quantity=3)
+        items += self.make_items(dishes[size : size + half])
+        with CaptureQueriesContext(connection) as queries:
+            sync_items(order, items)
+        self.assertEqual(order.items.count(), half * 2)
+        return len(queries)
+
+    def test_sync_items_query_count_does_not_grow(self):
+        """Количество запросов синхронизации не зависит от числа позиций"""
+        self.assertEqual(
+            self.count_sync_queries(4), self.count_sync_queries(60)
+        )
+
+    def test_sync_items_is_scoped_to_order(self):
+        """Удаление позиций не затрагивает другие заказы с теми же блюдами"""
+        dish_1, dish_2 = self.dishes[:2]
+        order = create_order(
+            Order(table_number="1"), self.make_items([dish_1, dish_2])
+        )
+        other = create_order(
+            Order(table_number="2"), self.make_items([dish_2])
+        )
+        sync_items(order, self.make_items([dish_1], quantity=4))
+
+        self.assertEqual(
+            list(other.items.values_list("dish", flat=True)), [dish_2.id]
+        )
+        order.refresh_from_db()
+        self.assertEqual(order.item_count, 1)
+        self.assertEqual(order.total_price, dish_1.price * 4)
+        self.assertEqual(OrderItem.objects.get(order=order).quantity, 4)
+
+    def create_orders(self, count: int) -> list[Order]:
+        return [
+            create_order(Order(table_number=str(i)), self.make_items([dish]))
+            for i, dish in enumerate(self.dishes[:count])
+        ]
+
+    def count_bulk_status_queries(self, size: int) -> int:
+        pks = [order.pk for order in self.create_orders(size)]
+        with CaptureQueriesContext(connection) as queries:
+            bulk_change_status(pks, Order.Status.PAID)
+        return len(queries)
+
+    def test_bulk_change_status_query_count_does_not_grow(self):
+        """Количество запросов массовой смены статуса не зависит от числа"""
+        # День выручки создаётся заранее, чтобы оба замера его обновляли
+        RevenueDaily.add(get_business_date(timezone.now()), 0, 0)
+        self.assertEqual(
+            self.count_bulk_status_queries(3),
+            self.count_bulk_status_queries(40),
+        )
+
+    def count_bulk_delete_queries(self, size: int) -> int:
+        """
+        Количество запросов при удалении size оплаченных заказов вместе с
+        публикацией событий удаления
+        """
+        pks = [order.pk for order in self.create_orders(size)]
+        bulk_change_status(pks, Order.Status.PAID)
+        with CaptureQueriesContext(connection) as queries:
+            with self.captureOnCommitCallbacks(execute=True):
+                bulk_delete_orders(pks)
+        self.assertEqual(
+            OrderEvent.objects.filter(
+                order_id__in=pks, kind=OrderEvent.Kind.DELETED
+            ).count(),
+            size,
+        )
+        return len(queries)
+
+    def test_bulk_delete_orders_query_count_does_not_grow(self):
+        """
+        Количество запросов массового удаления оплаченных заказов не
+        зависит от их числа
+        """
+        self.assertEqual(
+            self.count_bulk_delete_queries(2),
+            self.count_bulk_delete_queries(20),
+        )
+
+    def test_bulk_change_status_updates_revenue(self):
+        """
+        Массовая оплата и отмена оплаты сохраняют время оплаты и итоги
+        заказов и переносятся в дневную выручку
+        """
+        orders = self.create_orders(3)
+        paid = [order.pk for order in orders[:2]]
+        results = bulk_change_status([*paid, 0], Order.Status.PAID)
+        self.assertEqual(
+            results,
+            {
+                paid[0]: BulkResult.UPDATED,
+                paid[1]: BulkResult.UPDATED,
+                0: BulkResult.NOT_FOUND,
+            },
+        )
+        revenue = RevenueDaily.objects.get()
+        self.assertEqual(revenue.order_count, 2)
+        self.assertEqual(revenue.total, sum(o.total_price for o in orders[:2]))
+        self.assertFalse(
+            Order.objects.filter(pk__in=paid, paid_at__isnull=True).exists()
+        )
+
+        results = bulk_change_status(paid[:1], Order.Status.PAID)
+        self.assertEqual(results, {paid[0]: BulkResult.UNCHANGED})
+        results = bulk_change_status(paid[:1], Order.Status.PENDING)
+        self.assertEqual(results, {paid[0]: BulkResult.NOT_ALLOWED})
+        bulk_change_status(paid, Order.Status.READY)
+        revenue.refresh_from_db()
+        self.assertEqual((revenue.total, revenue.order_count), (0, 0))
+
+    def test_bulk_delete_orders(self):
+        """
+        Массовое удаление удаляет заказы с позициями порциями и исключает
+        оплаченные заказы из выручки
+        """
+        orders = self.create_orders(5)
+        pks = [order.pk for order in orders]
+        bulk_change_status(pks[:2], Order.Status.PAID)
+        results = bulk_delete_orders([*pks[:4], 0], chunk_size=2)
+        self.assertEqual(
+            results,
+            {
+                **{pk: BulkResult.DELETED for pk in pks[:4]},
+                0: BulkResult.NOT_FOUND,
+            },
+        )
+        self.assertEqual(
+            list(Order.objects.values_list("pk", flat=True)), pks[4:]
+        )
+        self.assertEqual(OrderItem.objects.count(), 1)
+        revenue = RevenueDaily.objects.get()
+        self.assertEqual((revenue.total, revenue.order_count), (0, 0))
@@ -1,8 +1,29 @@
 #!/bin/bash
+# Показатели Prometheus всех воркеров gunicorn собираются в общем каталоге,
+# который очищается при запуске сервера
+prepare_metrics_dir() {
+    export PROMETHEUS_MULTIPROC_DIR=${PROMETHEUS_MULTIPROC_DIR:-/tmp/prometheus}
+    rm -rf "$PROMETHEUS_MULTIPROC_DIR"
+    mkdir -p "$PROMETHEUS_MULTIPROC_DIR"
+}
+
+# Воркеры должны использовать общий кэш (проверка orders.E001)
+python3 manage.py check --deploy --tag caches --fail-level ERROR || exit 1
+
+# ASGI-сервер (лента событий и асинхронные представления) запускается
+# без подготовки базы данных: её выполняет WSGI-сервис
+if [ "$APP_SERVER" = "asgi" ]; then
+    prepare_metrics_dir
+    exec gunicorn --bind 0:8000 \
+        --worker-class uvicorn_worker.UvicornWorker cafe.asgi
+fi
 sleep 2
 python3 manage.py migrate
 python3 manage.py collectstatic --no-input
 python3 manage.py loaddata fixtures/dishes.json
 python3 manage.py loaddata fixtures/orders.json
 python3 manage.py loaddata fixtures/order_items.json
+python3 manage.py recalculate_order_totals
+python3 manage.py rebuild_revenue
+prepare_metrics_dir
 exec gunicorn --bind 0:8000 cafe.wsgi
\ No newline at end of file